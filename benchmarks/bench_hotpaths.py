@@ -0,0 +1,254 @@
+import argparse, json, os, platform, random, statistics, subprocess, sys, time
+
+"""
+Benchmarks for the generation, solving and rendering hot paths
+
+Every benchmark collects per-operation samples and reports percentiles, so one slow outlier can't hide
+behind a good mean. Results can be saved as JSON and compared against a stored baseline; run the
+baseline on the commit before a change and the comparison on the change itself, on the same machine.
+
+Benchmarks:
+fill_values           time to fill one empty 9x9 board
+remove_cells_N        time for remove_cells (unique) to clear N cells from a filled board, N = 30, 40, 50
+uniqueness_N          time for sudoku_solver.count_solutions to prove a puzzle with N removed cells unique
+fill_remaining_calls  fill_remaining calls (search steps) made while filling one 9x9 board (a count, not a time)
+board_checks          one get_integer_array + is_full + check_board round
+refresh_board         one refresh_board after a scripted select / sketch / place / clear
+refresh_board_full    one refresh_board that redraws the whole board (new game / reset)
+session_replay        one headless 200-command game session replayed on sudoku_game.GameBoard (no pygame)
+
+The rendering benchmarks run headless on the SDL dummy video driver and are skipped if pygame is missing.
+
+Usage:
+python benchmarks/bench_hotpaths.py [--samples N] [--only NAME ...] [--output FILE]
+                                    [--baseline FILE] [--max-regression FRACTION]
+"""
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # must be set before pygame is imported
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import sudoku_game, sudoku_generator, sudoku_solver  # noqa: E402 (needs the path above)
+
+REMOVALS = (30, 40, 50)
+PERCENTILES = (50, 90, 99)
+
+
+# p50/p90/p99/min/max/mean of a list of samples
+def summarize(samples, unit):
+    ordered = sorted(samples)
+    cuts = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else ordered * 99
+    summary = {f"p{p}": cuts[p - 1] for p in PERCENTILES}
+    summary.update(min=ordered[0], max=ordered[-1], mean=statistics.fmean(ordered), n=len(ordered), unit=unit)
+    return summary
+
+
+# seconds taken by fn() (called once per sample)
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench_fill_values(samples, rng):
+    def one():
+        sudoku = sudoku_generator.SudokuGenerator(9, 0, seed=rng.getrandbits(64))
+        return timed(sudoku.fill_values)
+    return summarize([one() for _ in range(samples)], "s")
+
+
+def bench_remove_cells(samples, rng, removed):
+    def one():
+        sudoku = sudoku_generator.SudokuGenerator(9, removed, unique=True, seed=rng.getrandbits(64))
+        sudoku.fill_values()
+        return timed(sudoku.remove_cells)
+    return summarize([one() for _ in range(samples)], "s")
+
+
+def bench_uniqueness(samples, rng, removed):
+    puzzles = [sudoku_generator.generate_sudoku(9, removed, True, rng.getrandbits(64))[0] for _ in range(samples)]
+    return summarize([timed(lambda: sudoku_solver.count_solutions(puzzle)) for puzzle in puzzles], "s")
+
+
+class _CountingGenerator(sudoku_generator.SudokuGenerator):
+
+    calls = 0
+
+    # fill_remaining recurses through self, so every step of the search is counted
+    def fill_remaining(self, row, col):
+        self.calls += 1
+        return super().fill_remaining(row, col)
+
+
+def bench_fill_remaining_calls(samples, rng):
+    counts = []
+    for _ in range(samples):
+        sudoku = _CountingGenerator(9, 0, seed=rng.getrandbits(64))
+        sudoku.fill_values()
+        counts.append(sudoku.calls)
+    return summarize(counts, "calls")
+
+
+# a headless game Board, or None without pygame
+def _headless_board(rng):
+    try:
+        import pygame, sudoku
+    except ImportError:
+        return None, None
+    sudoku.screen = pygame.display.set_mode((sudoku.WIDTH, sudoku.HEIGHT))
+    sudoku.init()
+    puzzle, solution = sudoku_generator.generate_sudoku(9, 40, True, rng.getrandbits(64))
+    board = sudoku.Board(sudoku.WIDTH, sudoku.HEIGHT, sudoku.screen, puzzle, solution)
+    return sudoku, board
+
+
+def bench_board_checks(samples, rng):
+    _, board = _headless_board(rng)
+    if board is None:
+        return None
+    loops = 1000  # one round is far below the timer's resolution
+
+    def one():
+        start = time.perf_counter()
+        for _ in range(loops):
+            board.get_integer_array()
+            board.is_full()
+            board.check_board()
+        return (time.perf_counter() - start) / loops
+    return summarize([one() for _ in range(samples)], "s")
+
+
+# one scripted interaction, the same mix a player produces: move, sketch, place, clear
+def _interact(board, rng):
+    board.select(rng.randrange(9), rng.randrange(9))
+    if board.selected_cell.value == 0:
+        action = rng.random()
+        if action < 0.5:
+            board.number_input(rng.randint(1, 9))
+        elif action < 0.8:
+            board.place_number()
+    elif board.selected_cell.user_placed:
+        board.clear()
+
+
+def bench_refresh_board(samples, rng, full):
+    sudoku, board = _headless_board(rng)
+    if board is None:
+        return None
+    times = []
+    for _ in range(samples):
+        _interact(board, rng)
+        if full:
+            board.full_redraw = True
+        times.append(timed(board.refresh_board))
+    return summarize(times, "s")
+
+
+def bench_session_replay(samples, rng, moves=200):
+    puzzle, solution = sudoku_generator.generate_sudoku(9, 40, True, rng.getrandbits(64))
+
+    def one():
+        commands = sudoku_game.random_commands(9, moves, rng)
+        board = sudoku_game.GameBoard(puzzle, solution)
+        return timed(lambda: sudoku_game.replay(board, commands))
+    return summarize([one() for _ in range(samples)], "s")
+
+
+BENCHMARKS = {
+    "fill_values": bench_fill_values,
+    **{f"remove_cells_{n}": (lambda samples, rng, n=n: bench_remove_cells(samples, rng, n)) for n in REMOVALS},
+    **{f"uniqueness_{n}": (lambda samples, rng, n=n: bench_uniqueness(samples, rng, n)) for n in REMOVALS},
+    "fill_remaining_calls": bench_fill_remaining_calls,
+    "board_checks": bench_board_checks,
+    "refresh_board": lambda samples, rng: bench_refresh_board(samples, rng, False),
+    "refresh_board_full": lambda samples, rng: bench_refresh_board(samples, rng, True),
+    "session_replay": bench_session_replay,
+}
+
+
+# where and on what the results were measured, so comparisons across machines are easy to spot
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"python": platform.python_version(), "platform": platform.platform(), "machine": platform.machine(),
+            "commit": commit, "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+# human readable value for a summary field
+def show(value, unit):
+    if unit == "s":
+        return f"{value * 1e3:.3f} ms" if value >= 1e-4 else f"{value * 1e6:.2f} us"
+    return f"{value:.0f} {unit}"
+
+
+'''
+Compares results against a baseline by median (p50)
+
+Parameters:
+results and baseline are "results" dicts from a run (benchmark name -> summary)
+max_regression is the largest allowed slowdown as a fraction (0.1 = 10% slower), or None to only report
+
+Return: list of the names of benchmarks that regressed past max_regression
+'''
+def compare(results, baseline, max_regression):
+    regressed = []
+    print("\nagainst baseline (p50):")
+    for name, summary in results.items():
+        before = baseline.get(name)
+        if summary is None or before is None:
+            continue
+        change = summary["p50"] / before["p50"] - 1 if before["p50"] else 0.0
+        flag = ""
+        if max_regression is not None and change > max_regression:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(f"  {name:20} {show(before['p50'], before['unit']):>12} -> "
+              f"{show(summary['p50'], summary['unit']):>12}  {change:+.1%}{flag}")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the generation, solving and rendering hot paths.")
+    parser.add_argument("--samples", type=int, default=200, help="samples per benchmark (default 200)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the boards used (default 0)")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), metavar="NAME",
+                        help="run only these benchmarks")
+    parser.add_argument("--output", help="save the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file from an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=None,
+                        help="fail if a median got slower than the baseline by more than this fraction (e.g. 0.1)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        summary = BENCHMARKS[name](args.samples, random.Random(f"{args.seed}:{name}"))
+        results[name] = summary
+        if summary is None:
+            print(f"{name:20} skipped (pygame not installed)")
+            continue
+        unit = summary["unit"]
+        print(f"{name:20} " + "  ".join(f"p{p} {show(summary[f'p{p}'], unit):>12}" for p in PERCENTILES) +
+              f"  max {show(summary['max'], unit):>12}")
+
+    if args.output:
+        with open(args.output, "w") as out:
+            json.dump({"environment": environment(), "samples": args.samples, "results": results}, out, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("environment", {}).get("machine") != platform.machine():
+            print("warning: the baseline was measured on a different kind of machine")
+        regressed = compare(results, baseline["results"], args.max_regression)
+        if regressed:
+            print(f"FAIL: {', '.join(regressed)} got slower by more than {args.max_regression:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import argparse, os, statistics, subprocess, sys
+
+"""
+Import-time regression benchmark for the headless core
+
+Every sample imports the modules in a fresh interpreter (that's what a short-lived batch worker pays)
+and times only the import statement, so interpreter start-up itself is left out.
+It also fails if importing the core drags in pygame or requests.
+
+Usage:
+python benchmarks/bench_import.py [--runs N] [--max-ms MS]
+"""
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORE_MODULES = ["sudoku_generator", "sudoku_solver", "sudoku_batch", "sudoku_pool"]
+FORBIDDEN = ["pygame", "requests"]  # UI / network dependencies the core must never import
+
+
+# wall time (ms) of one fresh interpreter running code
+def time_interpreter(code):
+    probe = ("import time; start = time.perf_counter(); " + code +
+             "; print((time.perf_counter() - start) * 1000)")
+    result = subprocess.run([sys.executable, "-c", probe], cwd=REPO, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+# names of forbidden modules that end up in sys.modules after importing the core
+def leaked_modules():
+    code = ("import sys; import " + ", ".join(CORE_MODULES) +
+            "; print(' '.join(m for m in " + repr(FORBIDDEN) + " if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO, capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure how long importing the headless core takes.")
+    parser.add_argument("--runs", type=int, default=20, help="fresh interpreters per measurement (default 20)")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if the median import takes longer")
+    args = parser.parse_args(argv)
+
+    leaked = leaked_modules()
+    if leaked:
+        print(f"FAIL: importing the core also imports {', '.join(leaked)}")
+        return 1
+
+    samples = [time_interpreter("import " + ", ".join(CORE_MODULES)) for _ in range(args.runs)]
+    median = statistics.median(samples)
+    print(f"core import: median {median:.2f} ms, min {min(samples):.2f} ms, max {max(samples):.2f} ms "
+          f"over {args.runs} runs")
+    if args.max_ms is not None and median > args.max_ms:
+        print(f"FAIL: median import time {median:.2f} ms is over the {args.max_ms} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import argparse, asyncio, json, os, random, re, statistics, subprocess, sys, threading, time
+from urllib.parse import urlsplit
+
+"""
+Load test for the puzzle service (sudoku_server)
+
+Opens --concurrency keep-alive connections and sends --requests requests over them as fast as the server
+answers: GET /puzzle for a random difficulty, followed by a POST /verify of that puzzle for a --verify
+fraction of them. Every request's latency is recorded and the percentiles are printed at the end.
+
+Usage:
+python benchmarks/load_test.py --spawn [--workers N]    start a server on a free port and test it
+python benchmarks/load_test.py --url http://127.0.0.1:8000 [--concurrency 64] [--requests 5000] [--verify 0.2]
+"""
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PERCENTILES = (50, 90, 99)
+LEVELS = ("easy", "medium", "hard")
+
+
+class _Connection:
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    # sends one request and returns (status, parsed JSON body)
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+                          f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+'''
+Runs the load
+
+Parameters:
+host and port are where the server listens
+concurrency is the number of connections used at once
+total is the number of requests to send
+verify is the fraction of puzzles that are also submitted to /verify
+rng is the random.Random picking difficulties
+
+Return: tuple (latencies in seconds, status code -> count, seconds taken)
+'''
+async def run_load(host, port, concurrency, total, verify, rng):
+    latencies = []
+    statuses = {}
+    remaining = [total]
+
+    async def timed(connection, method, path, payload=None):
+        start = time.perf_counter()
+        try:
+            status, body = await connection.request(method, path, payload)
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+            status, body = "error", None
+            connection.close()
+            connection.writer = None  # reconnect for the next request
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+        return status, body
+
+    async def client():
+        connection = _Connection(host, port)
+        try:
+            while remaining[0] > 0:
+                remaining[0] -= 1  # claimed before sending, so exactly total requests go out
+                status, body = await timed(connection, "GET", f"/puzzle?difficulty={rng.choice(LEVELS)}")
+                if status == 200 and remaining[0] > 0 and rng.random() < verify:
+                    remaining[0] -= 1
+                    await timed(connection, "POST", "/verify", {"id": body["id"], "solution": body["puzzle"]})
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - start
+
+
+# starts python -m sudoku_generator serve on a free port, returns (process, host, port)
+def spawn_server(workers):
+    command = [sys.executable, "-m", "sudoku_generator", "serve", "--port", "0"]
+    if workers:
+        command += ["--workers", str(workers)]
+    process = subprocess.Popen(command, cwd=REPO, stderr=subprocess.PIPE, text=True)
+    for line in process.stderr:
+        match = re.search(r"http://([\d.]+):(\d+)", line)
+        if match:
+            # keep passing the server's log on, so a full pipe can never stall it
+            threading.Thread(target=lambda: sys.stderr.writelines(process.stderr), daemon=True).start()
+            return process, match.group(1), int(match.group(2))
+    raise RuntimeError("the server exited before it started listening")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the puzzle service.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="server to test (default %(default)s)")
+    parser.add_argument("--spawn", action="store_true", help="start a server on a free port for the test")
+    parser.add_argument("--workers", type=int, help="worker processes for --spawn (default: one per core)")
+    parser.add_argument("--concurrency", type=int, default=64, help="connections in use at once (default 64)")
+    parser.add_argument("--requests", type=int, default=5000, help="requests to send (default 5000)")
+    parser.add_argument("--verify", type=float, default=0.2,
+                        help="fraction of puzzles also sent to /verify (default 0.2)")
+    parser.add_argument("--warmup", type=float, default=1.0,
+                        help="seconds to let a spawned server fill its caches first (default 1)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the difficulty mix (default 0)")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1 or args.requests < 1:
+        parser.error("--concurrency and --requests must be >= 1")
+
+    process = None
+    if args.spawn:
+        process, host, port = spawn_server(args.workers)
+        time.sleep(args.warmup)
+    else:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    try:
+        latencies, statuses, elapsed = asyncio.run(
+            run_load(host, port, args.concurrency, args.requests, args.verify, random.Random(args.seed)))
+    finally:
+        if process is not None:
+            process.terminate()  # the server shuts its workers down on SIGTERM
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+    ordered = sorted(latencies)
+    cuts = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else ordered * 99
+    print(f"{len(latencies)} requests, concurrency {args.concurrency}, {elapsed:.2f} s, "
+          f"{len(latencies) / elapsed:.0f} requests/s")
+    print("  ".join(f"p{p} {cuts[p - 1] * 1e3:.2f} ms" for p in PERCENTILES) + f"  max {ordered[-1] * 1e3:.2f} ms")
+    print("status: " + ", ".join(f"{status} x{count}" for status, count in sorted(statuses.items(), key=str)))
+    return 0 if set(statuses) <= {200} else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
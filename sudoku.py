@@ -0,0 +1,760 @@
+import pygame, atexit, logging, math, os, sys, time
+import sudoku_metrics, sudoku_save
+from io import BytesIO
+from sudoku_generator import DIFFICULTIES_BY_SIZE, SudokuBoard, generate_sudoku
+from sudoku_game import GameBoard, GameCell
+
+# CONSTANTS
+
+WIDTH = 594  # 603 is evenly divisible by 9
+HEIGHT = WIDTH + 80  # add 95 pixels to the bottom for reset/restart/quit buttons
+LINE_WIDTH = 3
+LINE_WIDTH_2 = 5
+WIN_LINE_WIDTH = 15
+BOARD_ROWS = 9
+BOARD_COLS = 9
+SQUARE_SIZE = 66
+CIRCLE_RADIUS = 60
+CIRCLE_WIDTH = 15
+CROSS_WIDTH = 25
+SPACE = 55
+RED = (255, 0, 0)
+WHITE = (255, 255, 255)
+BG_COLOR = (255, 255, 245)
+LINE_COLOR = (0, 0, 0)
+SKETCH_COLOR = (155, 155, 155)
+PLACED_COLOR = (50, 90, 175)
+VALUE_COLOR = (50, 50, 50)
+BOARD_SIZE = int(os.environ.get("SUDOKU_SIZE", BOARD_ROWS))  # 9, or 16 / 25 for the large-board modes
+DIFFICULTIES = DIFFICULTIES_BY_SIZE[BOARD_SIZE]  # removed cells for easy, medium, hard
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"  # how each value is shown and typed -- values past 9 are letters
+POOL_CAPACITY = 5  # ready puzzles kept per difficulty
+POOL_LOW_WATERMARK = 2  # refill a difficulty once fewer than this many are ready
+GLYPHS = {}  # (board size, digit, style) -> pre-rendered surface, style is "given", "placed" or "sketch" -- see build_glyph_cache
+GRID_SURFACES = {}  # board size -> transparent surface with every grid line drawn on it -- see build_grid_surface
+HISTORY_CAPACITY = int(os.environ.get("SUDOKU_HISTORY", 1000))  # moves undo can go back, older ones are forgotten
+TARGET_FPS = 30  # most event batches handled per second
+IDLE_TIMEOUT_MS = 1000  # longest an event loop sleeps before waking up with no events
+BG_IMAGE_URL = 'https://live.staticflickr.com/52/150983118_21b4093a61.jpg'
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "sudoku")
+BG_IMAGE_CACHE = os.path.join(CACHE_DIR, "background.jpg")  # downloaded once, then read from disk
+SEEN_INDEX = os.path.join(CACHE_DIR, "seen.idx")  # every puzzle handed out so far -- see sudoku_dedup
+SAVE_FILE = os.environ.get("SUDOKU_SAVE") or os.path.join(CACHE_DIR, "game.sav")  # game in progress, resumed on startup -- see sudoku_save
+PUZZLE_BANK = os.environ.get("SUDOKU_BANK")  # sudoku_bank file to draw puzzles from, None to generate them
+BG_IMAGE_TIMEOUT = 3  # seconds to wait for the download before falling back to a plain background
+background_surface = None  # decoded & scaled background, kept for every later visit -- see get_background
+LOG_LEVEL = os.environ.get("SUDOKU_LOG_LEVEL", "WARNING").upper()  # DEBUG prints the board after every input
+PROFILE_PATH = os.environ.get("SUDOKU_PROFILE") or "sudoku.prof"  # where F9 saves a cProfile run -- see sudoku_metrics
+logger = logging.getLogger("sudoku")
+
+"""
+The pygame front end -- run with python3 sudoku.py
+The puzzles themselves come from sudoku_generator.py
+
+REFERENCES
+1. ankthon. (2022, September 7). Python: Display images with pygame. GeeksforGeeks. https://www.geeksforgeeks.org/python-display-images-with-pygame/ 
+2. Starbuck5. (n.d.). pygame module to transform surfaces. Pygame.transform - pygame v2.6.0 documentation. https://www.pygame.org/docs/ref/transform.html 
+3. marios-pz. (n.d.). pygame module for loading and rendering fonts. pygame.font - pygame v2.6.0 documentation. https://www.pygame.org/docs/ref/font.html 
+4. pygame.image - pygame v2.6.0 documentation. (n.d.). https://www.pygame.org/docs/ref/image.html 
+5. How to load image from web URL in pygame. CodersLegacy. (2023, April 13). https://coderslegacy.com/python/load-image-from-web-url-pygame/ 
+6. Purple Slog. (2006, May 22). Sudoku Template. https://www.flickr.com/photos/93453114@N00/150983118. 
+"""
+
+class Cell(GameCell):
+
+    # grid is the SudokuBoard the value is stored in (Board shares one between all its cells)
+    def __init__(self, value, row, col, dimensions, screen, grid=None):
+        super().__init__(value, row, col, grid if grid is not None else SudokuBoard(BOARD_ROWS))
+        self.width, self.height = dimensions  # dimensions is a tuple (width, height)
+        self.screen = screen
+
+    def draw(self):  # value --> cell.value, sketch --> cell.sketched_value
+        # glyphs are pre-rendered by build_glyph_cache, drawing is just a blit
+        size = self.grid.size
+        square = WIDTH // size
+        # un-editable values -- black
+        if self.value != 0 and not self.user_placed:
+            glyph = GLYPHS[(size, self.value, "given")]
+            center = (square // 2 + square * self.col, square // 2 + square * self.row)
+
+        # user-placed values -- blue
+        elif self.value != 0 and self.user_placed:
+            glyph = GLYPHS[(size, self.value, "placed")]
+            center = (square // 2 + square * self.col, square // 2 + square * self.row)
+
+        # sketched values -- gray & top left
+        elif self.sketched_value != 0:
+            glyph = GLYPHS[(size, self.sketched_value, "sketch")]
+            center = (square // 4 + square * self.col, square // 4 + square * self.row)
+
+        else:  # empty cell
+            return
+        rect = glyph.get_rect(center=center)
+        # the cell minus the margin redraw_cell repaints around its neighbours -- glyphs that stay inside it
+        # look the same whether one cell or the whole board is redrawn
+        inside = pygame.Rect(square * self.col + LINE_WIDTH, square * self.row + LINE_WIDTH,
+                             square - 2 * LINE_WIDTH, square - 2 * LINE_WIDTH)
+        if inside.contains(rect):
+            self.screen.blit(glyph, rect)
+            return
+        clip = self.screen.get_clip()  # large board glyphs can reach past it, cut them off
+        self.screen.set_clip(inside.clip(clip))
+        self.screen.blit(glyph, rect)
+        self.screen.set_clip(clip)
+
+
+# the game model (sudoku_game.GameBoard) drawn with pygame -- all the rules live in GameBoard
+class Board(GameBoard):
+
+    def __init__(self, width, height, screen, unsolved_board, solved_board, history_capacity=HISTORY_CAPACITY):
+        self.width = width  # screen width
+        self.height = height  # screen height
+        self.screen = screen  # window from PyGame
+        super().__init__(unsolved_board, solved_board, history_capacity)
+        self.board_rect = pygame.Rect(0, 0, WIDTH, WIDTH + LINE_WIDTH_2)  # board area incl. the bottom grid line
+        self.square = WIDTH // self.size  # side of one cell in pixels
+        build_glyph_cache(self.size)
+        build_grid_surface(self.size)
+
+    def make_cell(self, value, row, col):
+        return Cell(
+            value,
+            row,
+            col,
+            (self.width, self.height),  # info for cell.draw()
+            self.screen,  # info for cell.draw()
+            self.values  # cell values are stored here
+        )
+
+    # draw board components that changed since the last call
+    # returns the list of screen rectangles that changed, for pygame.display.update
+    def refresh_board(self):
+
+        # refresh game window info
+        full_redraw, dirty_cells = self.take_changes()
+        if full_redraw:
+            self.screen.fill(WHITE, self.board_rect)  # incl. the strip under the grid redraw_cell also clears
+            self.draw_selected()
+            self.draw()
+            dirty_rects = [self.board_rect]
+        else:
+            dirty_rects = [self.redraw_cell(row, col) for row, col in dirty_cells]
+
+        # print info to console for debug purposes -- only formatted when debug logging is on
+        if logger.isEnabledFor(logging.DEBUG):
+            selected = self.selected_cell
+            logger.debug("GAME BOARD:\n%s\nSelected Cell: %s", format_array(self.get_integer_array()),
+                         f"({selected.col}, {selected.row})" if selected is not None else "(None)")
+
+        return dirty_rects
+
+    # draws board and all selected cells
+    def draw(self):
+        # draw grid lines (pre-rendered once by build_grid_surface)
+        self.screen.blit(GRID_SURFACES[self.size], (0, 0))
+
+        # draw cells
+        for i in range(self.size):
+            for j in range(self.size):
+                self.cell_array[i][j].draw()
+
+    # redraw a single cell and the grid segments around it (same layering as a full redraw)
+    # returns the screen rectangle that was redrawn
+    def redraw_cell(self, row, col):
+        square = self.square
+        rect = pygame.Rect(col * square - LINE_WIDTH, row * square - LINE_WIDTH,
+                           square + 2 * LINE_WIDTH, square + 2 * LINE_WIDTH).clip(self.board_rect)
+        self.screen.set_clip(rect)  # keep the selection border from spilling outside the rectangle
+        self.screen.fill(WHITE, rect)
+        self.draw_selected()
+        self.screen.blit(GRID_SURFACES[self.size], rect, rect)
+        self.cell_array[row][col].draw()
+        self.screen.set_clip(None)
+        return rect
+
+    def draw_selected(self):
+        if self.selected_cell is not None:
+            # center the rectangles based on position (to account for line offset)
+            square, box = self.square, self.box_length
+            rect_center = (self.selected_cell.col * square + 2, self.selected_cell.row * square + 2)
+
+            # create more offsets to account for line cutting it off
+            # "up offset" means giving it one pixel of breathing room on top
+            top_offset = 0
+            bottom_offset = 0
+            left_offset = 0
+            right_offset = 0
+            if self.selected_cell.row % box == 0:  # cells on the top of boxes
+                top_offset = 1
+            if self.selected_cell.row % box == box - 1:  # cells on the bottom of boxes
+                bottom_offset = 1
+            if self.selected_cell.col % box == 0:  # cells on the left of boxes
+                left_offset = 1
+                right_offset = 1
+            if self.selected_cell.col % box == box - 1:  # cells on the right of boxes
+                right_offset = 1
+
+            # red background
+            pygame.draw.rect(self.screen, RED, (
+                rect_center[0], rect_center[1], square - 3, square - 3))
+
+            # white inner (to make it look like a border)
+            pygame.draw.rect(self.screen, WHITE, (
+                rect_center[0] + 3 + left_offset, rect_center[1] + 3 + top_offset,
+                square - 10 - right_offset, square - 10 - bottom_offset))
+
+    # turn click coordinates into tuple of sudoku cell coordinates (either (row, col) or None)
+    def click(self, x, y):
+        if y <= WIDTH:
+            return y // self.square, x // self.square
+        return None
+
+
+puzzle_pool = None  # PuzzlePool set up in main -- generate_game generates directly without one
+puzzle_bank = None  # PuzzleBank opened in main when PUZZLE_BANK is set
+
+def generate_game(width, height, screen, size, removed):
+    if puzzle_bank is not None and size == puzzle_bank.size and puzzle_bank.count(removed):
+        unsolved_board, solved_board = puzzle_bank.draw(removed)[:2]  # one record read, however big the bank
+    elif puzzle_pool is not None and size == puzzle_pool.size:  # ready-made puzzle, no generation on the UI thread
+        unsolved_board, solved_board = puzzle_pool.take(removed)
+    else:
+        # unique puzzles so check_board's comparison against solved_board can't reject a valid alternative solution
+        unsolved_board, solved_board = generate_sudoku(size, removed, unique=True)
+    return Board(width, height, screen, unsolved_board, solved_board)
+
+# the saved game in SAVE_FILE as a Board, or None if there is none (or it can't be resumed)
+def resume_game(width, height, screen, size):
+    try:
+        saved = sudoku_save.load(SAVE_FILE)
+    except (OSError, ValueError):  # no save, or a damaged one
+        return None
+    if saved.puzzle.size != size:  # saved in another board size mode
+        return None
+    board = Board(width, height, screen, saved.puzzle, saved.solution)
+    board.restore_state(saved)
+    return board
+
+# arrow key -> (row step, col step) for the "move" command
+ARROW_STEPS = {pygame.K_UP: (-1, 0), pygame.K_DOWN: (1, 0), pygame.K_LEFT: (0, -1), pygame.K_RIGHT: (0, 1)}
+
+# turns a KEYDOWN event into a sudoku_game command, or None for keys the board doesn't use
+def key_command(event):
+    # undo / redo -- ctrl+z, ctrl+y (or ctrl+shift+z)
+    if event.mod & pygame.KMOD_CTRL and event.key in (pygame.K_z, pygame.K_y):
+        return ("undo",) if event.key == pygame.K_z and not event.mod & pygame.KMOD_SHIFT else ("redo",)
+    if event.key == pygame.K_BACKSPACE:  # clearing cells
+        return ("clear",)
+    if event.key == pygame.K_RETURN:  # solidfying sketched guesses
+        return ("place",)
+    if event.key in ARROW_STEPS:  # arrow key movements
+        return ("move", *ARROW_STEPS[event.key])
+    # sketching selected cell -- keys 1 - 9, then letters for the values past 9 (SYMBOLS)
+    number = SYMBOLS.find(event.unicode.upper()) + 1 if event.unicode else 0
+    if number:
+        return ("input", number)
+    return None
+
+def format_array(array):  # debug, 2d array as text
+    lines = ["___" * len(array)]
+    for row in array:
+        lines.append("".join(f"{cell}  " for cell in row) + "|")
+    lines.append("___" * len(array) + "|")
+    return "\n".join(lines)
+
+def print_array(array):  # debug, prints 2d array
+    print(format_array(array))
+
+def init():
+    pygame.init()
+    pygame.display.set_caption("Sudoku")
+    build_glyph_cache(BOARD_SIZE)
+    build_grid_surface(BOARD_SIZE)
+    pygame.event.set_blocked(pygame.MOUSEMOTION)  # nothing uses it, and it would wake the event loops
+
+# drives every event loop: sleeps in pygame.event.wait until something happens instead of spinning,
+# and caps how often a loop can run at fps
+class LoopDriver:
+
+    def __init__(self, fps=TARGET_FPS, idle_timeout=IDLE_TIMEOUT_MS):
+        self.fps = fps
+        self.idle_timeout = idle_timeout  # ms
+        self.clock = pygame.time.Clock()
+
+    # blocks until at least one event arrives (or idle_timeout passes) and returns every pending event
+    # an empty list means the loop woke up idle and has nothing to redraw
+    def events(self):
+        self.clock.tick(self.fps)
+        event = pygame.event.wait(self.idle_timeout)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
+loop_driver = LoopDriver()
+
+# renders every value of a board size once in each style Cell.draw needs (fonts need pygame.init)
+# fonts shrink with the cells, and values past 9 are drawn as letters (SYMBOLS)
+def build_glyph_cache(size=BOARD_ROWS):
+    if (size, size, "sketch") in GLYPHS:  # already built
+        return
+    cell_font = pygame.font.Font(None, 60 * BOARD_ROWS // size)
+    sketch_font = pygame.font.Font(None, 40 * BOARD_ROWS // size)
+    for digit in range(1, size + 1):
+        symbol = SYMBOLS[digit - 1]
+        GLYPHS[(size, digit, "given")] = cell_font.render(symbol, 0, VALUE_COLOR)
+        GLYPHS[(size, digit, "placed")] = cell_font.render(symbol, 0, PLACED_COLOR)
+        GLYPHS[(size, digit, "sketch")] = sketch_font.render(symbol, 0, SKETCH_COLOR)
+
+# draws the static grid lines once onto a transparent surface that Board blits instead of redrawing them
+def build_grid_surface(size=BOARD_ROWS):
+    if size in GRID_SURFACES:
+        return
+    square = WIDTH // size
+    extent = square * size  # WIDTH, unless the cells don't divide it evenly
+    box = math.isqrt(size)
+    surface = GRID_SURFACES[size] = pygame.Surface((WIDTH, WIDTH + LINE_WIDTH_2), pygame.SRCALPHA)
+    # draw horizontal lines
+    for i in range(1, size):
+        pygame.draw.line(surface, LINE_COLOR, (0, square * i),
+                         (extent, square * i), LINE_WIDTH)
+    # draw vertical lines
+    for i in range(1, size):
+        pygame.draw.line(surface, LINE_COLOR, (square * i, 0),
+                         (square * i, extent), LINE_WIDTH)
+
+    # draw thicker horizontal lines
+    for i in range(0, size + 1, box):
+        pygame.draw.line(surface, LINE_COLOR, (0, square * i),
+                         (extent, square * i), LINE_WIDTH_2)
+
+    # draw thicker vertical lines
+    for i in range(0, size + 1, box):
+        pygame.draw.line(surface, LINE_COLOR, (square * i, 0),
+                         (square * i, extent), LINE_WIDTH_2)
+
+# returns the raw background image bytes from the disk cache, downloading them into the cache first if needed
+# returns None if there is no cached copy and the download fails (e.g. no network)
+def load_background_bytes():
+    try:
+        with open(BG_IMAGE_CACHE, "rb") as cached:
+            return cached.read()
+    except OSError:
+        pass
+    try:
+        import requests  # only needed the first time, so importing this module never touches the network
+        response = requests.get(BG_IMAGE_URL, timeout=BG_IMAGE_TIMEOUT)
+        response.raise_for_status()
+    except Exception:
+        return None
+    try:  # write to a temp file and rename, so a half-written image is never picked up
+        os.makedirs(os.path.dirname(BG_IMAGE_CACHE), exist_ok=True)
+        with open(BG_IMAGE_CACHE + ".tmp", "wb") as cached:
+            cached.write(response.content)
+        os.replace(BG_IMAGE_CACHE + ".tmp", BG_IMAGE_CACHE)
+    except OSError:
+        pass  # a read-only cache directory just means downloading again next run
+    return response.content
+
+# returns the background scaled to the window, decoding it only on the first call
+# falls back to a plain BG_COLOR background when the image can't be loaded
+def get_background():
+    global background_surface
+    if background_surface is None:
+        data = load_background_bytes()
+        image = None
+        if data is not None:
+            try:
+                image = pygame.image.load(BytesIO(data)).convert() # [4]
+                image = pygame.transform.smoothscale(image, (WIDTH, HEIGHT)) # [2]
+            except pygame.error:  # corrupt cache file or an error page instead of an image
+                image = None
+        if image is None:
+            image = pygame.Surface((WIDTH, HEIGHT)).convert()
+            image.fill(BG_COLOR)
+        background_surface = image
+    return background_surface
+
+def welcome():
+    screen.fill(BG_COLOR)
+
+def draw_game_start(screen):
+    # initialize font
+    start_title_font = pygame.font.SysFont("Times New Roman", 60) # [3]
+    button_font = pygame.font.SysFont("Times New Roman", 40) # [3]
+    game_mode_font = pygame.font.SysFont("Times New Roman", 50) # [3]
+
+    # color background image
+    screen_display = pygame.display.set_mode((WIDTH, HEIGHT)) # [1]
+    screen_display.blit(get_background(), (0,0))
+    pygame.display.flip()
+
+    # initialize & draw title
+    title_surface = start_title_font.render("Welcome to Sudoku", 0, (0, 0, 0))
+    title_rectangle = title_surface.get_rect(
+        center=(WIDTH // 2, HEIGHT // 2 - 150))
+    screen.blit(title_surface, title_rectangle)
+
+    # initialize & draw game mode text
+    game_mode_surface = game_mode_font.render("Select Game Mode:", 0, (0, 0, 0))
+    game_mode_rectangle = title_surface.get_rect(
+        center=(WIDTH // 2 + 50, HEIGHT // 2 + 50))
+    screen.blit(game_mode_surface, game_mode_rectangle)
+
+    # initialize buttons ---
+    # initialize button text
+    easy_mode = button_font.render("Easy", 0, (255, 255, 255))
+    medium_mode = button_font.render("Medium", 0, (255, 255, 255))
+    hard_mode = button_font.render("Hard", 0, (255, 255, 255))
+
+    # initialize button background color and text
+    # easy mode
+    easy_surface = pygame.Surface((easy_mode.get_size()[0] + 20, easy_mode.get_size()[1] + 20))
+    easy_surface.fill((0, 204, 0))
+    easy_surface.blit(easy_mode, (10, 10))
+    # easy mode border
+    easy_surface_border = pygame.Surface((easy_mode.get_size()[0] + 30, easy_mode.get_size()[1] + 30))
+    easy_surface_border.fill((0, 102, 0))
+    easy_surface_border.blit(easy_mode, (10, 10))
+    # medium mode
+    medium_surface = pygame.Surface((medium_mode.get_size()[0] + 20, medium_mode.get_size()[1] + 20))
+    medium_surface.fill((229, 202, 33))
+    medium_surface.blit(medium_mode, (10, 10))
+    # medium mode border
+    medium_surface_border = pygame.Surface((easy_mode.get_size()[0] + 90, easy_mode.get_size()[1] + 30))
+    medium_surface_border.fill((210, 156, 30))
+    medium_surface_border.blit(medium_mode, (10, 10))
+    # hard mode
+    hard_surface = pygame.Surface((hard_mode.get_size()[0] + 20, hard_mode.get_size()[1] + 20))
+    hard_surface.fill((204, 0, 0))
+    hard_surface.blit(hard_mode, (10, 10))
+    # hard mode border
+    hard_surface_border = pygame.Surface((easy_mode.get_size()[0] + 32, easy_mode.get_size()[1] + 30))
+    hard_surface_border.fill((120, 0, 0))
+    hard_surface_border.blit(hard_mode, (10, 10))
+
+    # initialize button rectangle
+    easy_rectangle = easy_surface.get_rect(
+        center=(WIDTH // 2 - 150, HEIGHT // 2 + 150))
+    easy_rectangle_border = easy_surface.get_rect(
+        center=(WIDTH // 2 - 155, HEIGHT // 2 + 145))
+    medium_rectangle = medium_surface.get_rect(
+        center=(WIDTH // 2, HEIGHT // 2 + 150))
+    medium_rectangle_border = easy_surface.get_rect(
+        center=(WIDTH // 2 - 35, HEIGHT // 2 + 145))
+    hard_rectangle = hard_surface.get_rect(
+        center=(WIDTH // 2 + 150, HEIGHT // 2 + 150))
+    hard_rectangle_border = easy_surface.get_rect(
+        center=(WIDTH // 2 + 144, HEIGHT // 2 + 145))
+
+    # draw buttons
+    screen.blit(easy_surface_border, easy_rectangle_border)
+    screen.blit(easy_surface, easy_rectangle)
+    screen.blit(medium_surface_border, medium_rectangle_border)
+    screen.blit(medium_surface, medium_rectangle)
+    screen.blit(hard_surface_border, hard_rectangle_border)
+    screen.blit(hard_surface, hard_rectangle)
+    pygame.display.update()
+
+    # action loop
+    while True:
+
+        for event in loop_driver.events():
+            if event.type == pygame.QUIT:
+                sys.exit()
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if easy_rectangle.collidepoint(event.pos):  # check if mouse on easy button
+                    init()  # reinitialize start screen
+                    welcome()
+                    return generate_game(WIDTH, HEIGHT, screen, BOARD_SIZE, DIFFICULTIES[0])  # generate new easy board
+                elif medium_rectangle.collidepoint(event.pos):  # check if mouse on medium button
+                    init()  # reinitialize start screen
+                    welcome()
+                    return generate_game(WIDTH, HEIGHT, screen, BOARD_SIZE, DIFFICULTIES[1])  # generate new medium board
+                elif hard_rectangle.collidepoint(event.pos):  # check if mouse on hard button
+                    init()  # reinitialize start screen
+                    welcome()
+                    return generate_game(WIDTH, HEIGHT, screen, BOARD_SIZE, DIFFICULTIES[2])  # generate new hard board
+
+def draw_sudoku_buttons(screen):
+    # draws button games during sudoku
+
+    # initialize font
+    exit_font = pygame.font.SysFont("Times New Roman", 40) # [3]
+    restart_font = pygame.font.SysFont("Times New Roman", 40) # [3]
+    reset_font = pygame.font.SysFont("Times New Roman", 40) # [3]
+
+    # initialize & draw exit button
+    exit_surface = exit_font.render("Exit", 0, (0, 0, 0))
+    exit_rectangle = exit_surface.get_rect(
+        center=(WIDTH // 2, HEIGHT // 2 - 1000))
+    screen.blit(exit_surface, exit_rectangle)
+
+    # initialize & draw restart button
+    restart_surface = restart_font.render("Restart", 0, (0, 0, 0))
+    restart_rectangle = restart_surface.get_rect(
+        center=(WIDTH // 2, HEIGHT // 2 - 1000))
+    screen.blit(restart_surface, restart_rectangle)
+
+    # initialize & draw reset button
+    reset_surface = reset_font.render("Reset", 0, (0, 0, 0))
+    reset_rectangle = reset_surface.get_rect(
+        center=(WIDTH // 2, HEIGHT // 2 - 1000))
+    screen.blit(reset_surface, reset_rectangle)
+
+    # initialize text first
+    exit_mode = exit_font.render("Exit", 0, (255, 255, 255))
+    restart_mode = restart_font.render("Restart", 0, (255, 255, 255))
+    reset_mode = restart_font.render("Reset", 0, (255, 255, 255))
+
+    # initialize button background color and text
+    # exit
+    exit_surface = pygame.Surface((exit_mode.get_size()[0] + 20, exit_mode.get_size()[1] + 20))
+    exit_surface.fill((0, 0, 0))
+    exit_surface.blit(exit_mode, (10, 10))
+    # restart
+    restart_surface = pygame.Surface((restart_mode.get_size()[0] + 20, restart_mode.get_size()[1] + 20))
+    restart_surface.fill((0, 0, 0))
+    restart_surface.blit(restart_mode, (10, 10))
+    # reset
+    reset_surface = pygame.Surface((reset_mode.get_size()[0] + 20, reset_mode.get_size()[1] + 20))
+    reset_surface.fill((0, 0, 0))
+    reset_surface.blit(reset_mode, (10, 10))
+
+    # initialize button rectangle
+    exit_rectangle = exit_surface.get_rect(
+        center=(WIDTH // 2 + 150, HEIGHT // 2 + 300))
+    restart_rectangle = restart_surface.get_rect(
+        center=(WIDTH // 2, HEIGHT // 2 + 300))
+    reset_rectangle = reset_surface.get_rect(
+        center=(WIDTH // 2 - 150, HEIGHT // 2 + 300))
+
+    # draw buttons
+    screen.blit(exit_surface, exit_rectangle)
+    screen.blit(restart_surface, restart_rectangle)
+    screen.blit(reset_surface, reset_rectangle)
+
+    # check for button presses
+    try:
+        if restart_rectangle.collidepoint(event.pos):  # check if mouse is on restart button
+            #return draw_game_start(screen)
+            return "restart"
+        elif reset_rectangle.collidepoint(event.pos):  # check if mouse is on reset button
+            #return board, solved_board
+            return "reset"
+        elif exit_rectangle.collidepoint(event.pos):
+            return "exit"
+    except:
+        return None
+
+def draw_game_over(screen):
+
+    # initialize font & background color
+    game_over_font = pygame.font.SysFont("Times New Roman", 50) # [3]
+    screen.fill(BG_COLOR)
+
+    # color background image
+    screen_display = pygame.display.set_mode((WIDTH, HEIGHT)) # [1]
+    screen_display.blit(get_background(), (0,0))
+    pygame.display.flip()
+
+    if game_won:
+        # game won
+
+        # initialize & draw win text
+        game_won_surf = game_over_font.render("Game Won!", 0, (0, 0, 0))
+        game_won_rect = game_won_surf.get_rect(
+            center=(WIDTH // 2, HEIGHT // 2 - 100))
+        screen.blit(game_won_surf, game_won_rect)
+
+        # initialize & draw exit button
+        exit_surface = game_over_font.render("Exit", 0, (0, 0, 0))
+        exit_rectangle = exit_surface.get_rect(
+            center=(WIDTH // 2, HEIGHT // 2 - 500))
+        screen.blit(exit_surface, exit_rectangle)
+
+        # initialize buttons ---
+        # initialize button text
+        exit_mode = game_over_font.render("Exit", 0, (255, 255, 255))
+
+        # initialize exit button color & text
+        exit_surface = pygame.Surface((exit_mode.get_size()[0] + 20, exit_mode.get_size()[1] + 20))
+        exit_surface.fill((0, 0, 0))
+        exit_surface.blit(exit_mode, (10, 10))
+
+        # initialize button rectangle
+        exit_rectangle = exit_surface.get_rect(
+            center=(WIDTH // 2, HEIGHT // 2 + 100))
+
+        # draw button
+        screen.blit(exit_surface, exit_rectangle)
+        pygame.display.update()
+
+        # action loop
+        while True:
+            for event in loop_driver.events():
+                if event.type == pygame.QUIT:
+                    sys.exit()
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    if exit_rectangle.collidepoint(event.pos):
+                        # Checks if mouse is on exit button
+                        sys.exit()
+
+    else:
+        # game over
+
+        game_over_surf = game_over_font.render("Game Over :(", 0, (0, 0, 0))
+        game_over_rect = game_over_surf.get_rect(
+            center=(WIDTH // 2, HEIGHT // 2 - 100))
+        screen.blit(game_over_surf, game_over_rect)
+
+        # initialize & draw restart button
+        restart_surface = game_over_font.render("Restart", 0, (0, 0, 0))
+        restart_rectangle = restart_surface.get_rect(
+            center=(WIDTH // 2, HEIGHT // 2 - 500))
+        screen.blit(restart_surface, restart_rectangle)
+
+        # initialize button ---
+        # initialize button text
+        restart_mode = game_over_font.render("Restart", 0, (255, 255, 255))
+
+        # initialize button background color & text
+        restart_surface = pygame.Surface((restart_mode.get_size()[0] + 20, restart_mode.get_size()[1] + 20))
+        restart_surface.fill((0, 0, 0))
+        restart_surface.blit(restart_mode, (10, 10))
+
+        # initialize button rectangle
+        restart_rectangle = restart_surface.get_rect(
+            center=(WIDTH // 2, HEIGHT // 2 + 100))
+
+        # draw button
+        screen.blit(restart_surface, restart_rectangle)
+        pygame.display.update()
+
+        while True:
+            for event in loop_driver.events():
+                if event.type == pygame.QUIT:
+                    sys.exit()
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    if restart_rectangle.collidepoint(event.pos):  # checks if mouse is on restart button
+                        draw_game_start(screen)  # reload game
+                        return
+
+# main
+if __name__ == '__main__':
+    game_over = False
+    game_won = False
+    menu_button_press = None
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    logging.basicConfig(level=LOG_LEVEL, format="%(message)s")
+
+    # opt-in instrumentation (SUDOKU_METRICS / SUDOKU_PROFILE) -- nothing is wrapped unless it's on
+    sudoku_metrics.configure_from_env()
+    sudoku_metrics.instrument(Cell, "draw")
+    sudoku_metrics.instrument(Board, "refresh_board")
+
+    # keep puzzles for every difficulty ready in the background while the start screen is up
+    # never hand out a puzzle (or an equivalent one) twice, across sessions too -- 9x9 only, bigger boards
+    # can't be canonicalized (sudoku_transform.CANONICAL_SIZE) and repeats are unlikely there anyway
+    from sudoku_dedup import DedupIndex
+    from sudoku_pool import PuzzlePool
+    from sudoku_transform import CANONICAL_SIZE
+    seen_index = None
+    if BOARD_SIZE == CANONICAL_SIZE:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            seen_index = DedupIndex(SEEN_INDEX)
+        except (OSError, ValueError):  # unwritable or damaged cache, play without the check
+            pass
+    puzzle_pool = PuzzlePool(DIFFICULTIES, POOL_CAPACITY, POOL_LOW_WATERMARK, size=BOARD_SIZE, dedup=seen_index)
+    if PUZZLE_BANK:
+        from sudoku_bank import PuzzleBank
+        puzzle_bank = PuzzleBank(PUZZLE_BANK)  # only reads the header, so startup doesn't grow with the bank
+    puzzle_pool.start()
+
+    # the game in progress is saved after every change (off the UI thread) and picked up again on the next start
+    autosaver = sudoku_save.Autosaver(SAVE_FILE)
+    autosaver.start()
+    atexit.register(autosaver.stop)  # the last change still gets written when the game exits
+
+    # initialize welcome screen
+    init()
+    welcome()
+
+    # resume the saved game, or generate first game instance based on start screen (easy/med/hard)
+    current_game = resume_game(WIDTH, HEIGHT, screen, BOARD_SIZE) or draw_game_start(screen)
+    current_game.refresh_board()  # draw sudoku values initially
+    draw_sudoku_buttons(screen)
+    pygame.display.update()  # whole window once, after that only the rectangles that changed
+
+    # core gameplay loop
+    while True:
+        dirty_rects = []  # screen areas changed while handling this batch of events
+
+        # execute each user input (clicking, keystrokes, etc.) -- sleeps until there is one
+        events = loop_driver.events()
+        batch_start = time.perf_counter()
+        for event in events:
+
+            # draw menu buttons
+            draw_sudoku_buttons(screen)
+
+            # exiting game using X
+            if event.type == pygame.QUIT:
+                sys.exit()
+
+            # click actions
+            if event.type == pygame.MOUSEBUTTONDOWN and not game_over:
+                # select clicked cell, or clear selected if the click missed the board
+                current_game.apply(("select", *(current_game.click(event.pos[0], event.pos[1]) or (-1, -1))))
+
+                dirty_rects += current_game.refresh_board()
+
+                # check if clicked menu buttons
+                menu_button_press = draw_sudoku_buttons(screen)
+                if menu_button_press == "restart":
+                    current_game = draw_game_start(screen)  # generate fresh game instance (restart)
+                    current_game.refresh_board()
+                    draw_sudoku_buttons(screen)
+                    dirty_rects.append(screen.get_rect())
+                elif menu_button_press == "reset":
+                    current_game.apply(("reset",))  # reset board to unsolved state
+                    dirty_rects += current_game.refresh_board()
+                elif menu_button_press == "exit":
+                    sys.exit()
+
+
+
+            # keyboard actions
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F9:  # start / stop profiling
+                    if sudoku_metrics.profile_toggle(PROFILE_PATH):
+                        logger.warning("profiling started")
+                    else:
+                        logger.warning("profile saved to %s", PROFILE_PATH)
+
+                # everything else is a game command (see key_command), the same ones sudoku_game replays
+                command = key_command(event)
+                if command is not None:
+                    current_game.apply(command)
+
+                dirty_rects += current_game.refresh_board()  # update sudoku values on screen
+                if current_game.is_full():  # check if board is full (game over)
+                    game_over = True
+                    game_won = current_game.check_board()  # boolean
+
+        # game is over
+        if game_over:
+            autosaver.discard()  # nothing left to resume
+            draw_game_over(screen)
+            pygame.display.update()
+            current_game = draw_game_start(screen)
+            current_game.refresh_board()
+            draw_sudoku_buttons(screen)
+            dirty_rects.append(screen.get_rect())
+            game_over = False
+
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+            autosaver.submit(current_game)  # only builds the bytes, the write happens on the autosave thread
+        if events and sudoku_metrics.enabled:
+            sudoku_metrics.observe("event_loop", time.perf_counter() - batch_start)
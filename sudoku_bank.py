@@ -0,0 +1,283 @@
+import argparse, json, mmap, os, random, struct, sys, tempfile
+from sudoku_generator import SudokuBoard
+from sudoku_grader import grade
+
+"""
+Puzzle bank: millions of puzzle/solution pairs in one binary file, drawn from at random through mmap
+
+Every pair is a fixed size record, so record i of a difficulty sits at a known offset and drawing one is
+a single slice of the mapped file -- opening a bank only reads its header, however many puzzles it holds.
+
+File layout (all integers little endian):
+header    magic "SUDOKUBK", version u16, board size u16, record size u16, section count u16
+sections  one entry per difficulty: label (16 bytes, utf-8, zero padded), record offset u64, record count u64,
+          lowest grade score u32, highest grade score u32, hardest techniques seen u32 (bit i set = some puzzle
+          needed sudoku_grader.TECHNIQUES[i])
+records   the records of each difficulty, one section after the other
+
+Record: the solution at 4 bits per cell (digit - 1, high nibble first), then a bit per cell saying whether
+it is a given (cell i = bit i of a little endian integer), then the grade score u16 (0xFFFF = not graded)
+and hardest technique i8 (-1 = not graded or nothing needed). A 9x9 record is 41 + 11 + 3 = 55 bytes.
+
+Build one from batch output:
+python -m sudoku_bank puzzles.jsonl --output puzzles.bank [--no-grade]
+"""
+
+MAGIC = b"SUDOKUBK"
+VERSION = 1
+HEADER = struct.Struct("<8sHHHH")
+SECTION = struct.Struct("<16sQQIII")
+GRADE = struct.Struct("<Hb")
+UNGRADED = 0xFFFF
+
+_NIBBLES = [bytes(((byte >> 4) + 1, (byte & 15) + 1)) for byte in range(256)]  # packed byte -> two digits
+
+
+# bytes per record for a board size
+def record_size(size):
+    cells = size * size
+    return (cells + 1) // 2 + (cells + 7) // 8 + GRADE.size
+
+
+'''
+Packs a pair into a record
+
+Parameters:
+board and solved_board are SudokuBoards (or 2D lists) of the same size, size <= 16
+score and hardest come from a sudoku_grader.Grade (None = not graded)
+
+Return: bytes (record_size(size) long)
+'''
+def pack_record(board, solved_board, score=None, hardest=None):
+    board = SudokuBoard.from_grid(board)
+    solution = SudokuBoard.from_grid(solved_board).cells
+    if board.size > 16:
+        raise ValueError("a bank only holds boards up to 16x16 (4 bits per cell)")
+    digits = bytes(num - 1 for num in solution) + (b"\0" if len(solution) % 2 else b"")
+    packed = bytes((digits[i] << 4) | digits[i + 1] for i in range(0, len(digits), 2))
+    givens = 0
+    for i, num in enumerate(board.cells):
+        if num:
+            givens |= 1 << i
+    graded = GRADE.pack(UNGRADED if score is None else min(score, UNGRADED - 1), -1 if hardest is None else hardest)
+    return packed + givens.to_bytes((len(solution) + 7) // 8, "little") + graded
+
+
+'''
+Unpacks a record made by pack_record
+
+Parameters:
+record is a bytes-like record
+size is the number of rows/columns of the board
+
+Return: tuple (board, solved_board, score, hardest) -- score and hardest are None if the pair wasn't graded
+'''
+def unpack_record(record, size):
+    cells = size * size
+    packed_length = (cells + 1) // 2
+    mask_length = (cells + 7) // 8
+    solution = b"".join([_NIBBLES[byte] for byte in record[:packed_length]])[:cells]
+    givens = int.from_bytes(record[packed_length:packed_length + mask_length], "little")
+    puzzle = bytes(num if givens >> i & 1 else 0 for i, num in enumerate(solution))
+    score, hardest = GRADE.unpack_from(record, packed_length + mask_length)
+    if score == UNGRADED:
+        score = hardest = None
+    return SudokuBoard(size, puzzle), SudokuBoard(size, solution), score, hardest
+
+
+class BankWriter:
+
+    '''
+    Writes a bank file; records are spooled to one temporary file per difficulty and only put together
+    (behind the header) on close, so any number of pairs can be added in any order
+
+    Parameters:
+    path is the bank file to create (replaced atomically on close)
+    size is the number of rows/columns of the boards
+
+    Return: None
+    '''
+    def __init__(self, path, size=9):
+        self.path = path
+        self.size = size
+        self.record_size = record_size(size)
+        self.sections = {}  # label -> [spool file, count, lowest score, highest score, hardest bits]
+
+    '''
+    Adds a pair to a difficulty
+
+    Parameters:
+    difficulty is the label to file the pair under (e.g. "40" or "hard", at most 16 bytes of utf-8)
+    board and solved_board are the puzzle and its solution, both of the bank's size
+    result is the sudoku_grader.Grade of the puzzle, or None
+
+    Return: None -- raises ValueError for boards of another size, every record has to be the same length
+    '''
+    def add(self, difficulty, board, solved_board, result=None):
+        label = str(difficulty)
+        if len(label.encode()) > 16:
+            raise ValueError(f"difficulty label {label!r} is longer than 16 bytes")
+        board, solved_board = SudokuBoard.from_grid(board), SudokuBoard.from_grid(solved_board)
+        if board.size != self.size or solved_board.size != self.size:
+            raise ValueError(f"a {self.size}x{self.size} bank can't hold a {board.size}x{board.size} pair")
+        if label not in self.sections:
+            self.sections[label] = [tempfile.TemporaryFile(), 0, None, None, 0]
+        section = self.sections[label]
+        score = hardest = None
+        if result is not None:
+            score, hardest = result.score, result.hardest
+            section[2] = score if section[2] is None else min(section[2], score)
+            section[3] = score if section[3] is None else max(section[3], score)
+            if hardest >= 0:
+                section[4] |= 1 << hardest
+        section[0].write(pack_record(board, solved_board, score, hardest))
+        section[1] += 1
+
+    def close(self):
+        labels = sorted(self.sections, key=lambda label: (len(label), label))  # "30" before "100"
+        offset = HEADER.size + SECTION.size * len(labels)
+        temp = self.path + ".tmp"
+        with open(temp, "wb") as out:
+            out.write(HEADER.pack(MAGIC, VERSION, self.size, self.record_size, len(labels)))
+            for label in labels:
+                spool, count, lowest, highest, hardest = self.sections[label]
+                out.write(SECTION.pack(label.encode(), offset, count, lowest or 0, highest or 0, hardest))
+                offset += count * self.record_size
+            for label in labels:
+                spool = self.sections[label][0]
+                spool.seek(0)
+                while chunk := spool.read(1 << 20):
+                    out.write(chunk)
+                spool.close()
+        os.replace(temp, self.path)
+        self.sections = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is None:
+            self.close()
+        else:  # don't replace a good bank with half of a new one
+            for section in self.sections.values():
+                section[0].close()
+
+
+class PuzzleBank:
+
+    '''
+    Opens a bank file for reading (only the header is read, records are paged in on demand)
+
+    Parameters:
+    path is the bank file
+
+    Return: None
+    '''
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)  # ValueError for an empty file
+        length = len(self.map)
+        header = self.map[:HEADER.size].ljust(HEADER.size, b"\0")  # a short file fails the magic check below
+        magic, version, self.size, self.record_size, count = HEADER.unpack(header)
+        if (magic != MAGIC or version != VERSION or self.record_size != record_size(self.size)
+                or HEADER.size + count * SECTION.size > length):
+            self.map.close()
+            raise ValueError(f"{path} is not a puzzle bank this version can read")
+        self.sections = {}  # label -> (offset, count, lowest score, highest score, hardest bits)
+        for i in range(count):
+            label, *info = SECTION.unpack_from(self.map, HEADER.size + i * SECTION.size)
+            self.sections[label.rstrip(b"\0").decode()] = tuple(info)
+            if info[0] + info[1] * self.record_size > length:  # cut off, e.g. by a full disk
+                self.map.close()
+                raise ValueError(f"{path} is truncated")
+
+    # difficulty labels in the bank
+    def difficulties(self):
+        return list(self.sections)
+
+    # number of pairs filed under a difficulty (0 if there is no such section)
+    def count(self, difficulty):
+        section = self.sections.get(str(difficulty))
+        return section[1] if section else 0
+
+    '''
+    Reads one pair
+
+    Parameters:
+    difficulty is a section label (ints like 40 are looked up as "40")
+    index is the record number inside that section
+
+    Return: tuple (board, solved_board, score, hardest), see unpack_record
+    '''
+    def get(self, difficulty, index):
+        offset, count = self.sections[str(difficulty)][:2]
+        if not 0 <= index < count:
+            raise IndexError(f"record {index} out of range for difficulty {difficulty}")
+        start = offset + index * self.record_size
+        return unpack_record(self.map[start:start + self.record_size], self.size)
+
+    # a random pair of a difficulty -- rng is the random.Random (or the random module) to draw from
+    def draw(self, difficulty, rng=random):
+        return self.get(difficulty, rng.randrange(self.count(difficulty)))
+
+    def close(self):
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+'''
+Builds a bank from sudoku_batch output (one JSON object per line), filed by each puzzle's number of empty
+cells (counted here, so output where "removed" was the requested count is filed correctly too)
+
+Parameters:
+lines is an iterable of JSON lines
+path is the bank file to create
+graded is whether to grade every puzzle (sudoku_grader.grade) and store the result
+
+Return: int (the number of pairs written)
+'''
+def build_from_jsonl(lines, path, graded=True):
+    writer = None
+    count = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        puzzle, solution = entry["puzzle"], entry["solution"]
+        board = SudokuBoard.from_string(puzzle)
+        solved_board = SudokuBoard.from_string(solution)
+        if writer is None:
+            writer = BankWriter(path, board.size)
+        writer.add(board.cells.count(0), board, solved_board, grade(board) if graded else None)
+        count += 1
+    if writer is None:
+        writer = BankWriter(path)
+    writer.close()
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sudoku_bank",
+                                     description="Build a puzzle bank from batch generation output.")
+    parser.add_argument("input", help="JSON lines from python -m sudoku_generator batch (- for stdin)")
+    parser.add_argument("--output", required=True, help="bank file to write")
+    parser.add_argument("--grade", action=argparse.BooleanOptionalAction, default=True,
+                        help="grade every puzzle and store the result (default: on)")
+    args = parser.parse_args(argv)
+
+    if args.input == "-":
+        count = build_from_jsonl(sys.stdin, args.output, args.grade)
+    else:
+        with open(args.input) as lines:
+            count = build_from_jsonl(lines, args.output, args.grade)
+    print(f"{count} puzzles written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import argparse, json, multiprocessing, os, random, sys
+from sudoku_dedup import DedupIndex
+from sudoku_id import generate_from_id, make_id
+from sudoku_transform import CANONICAL_SIZE, canonical_hash
+
+"""
+Headless batch generation of puzzle/solution pairs
+
+Usage:
+python -m sudoku_generator batch --count N --removed K --workers W [--output FILE] [--no-unique] [--dedup INDEX] [--size 16] [--seed S]
+
+Puzzles are spread over a process pool and every finished pair is written as soon as it arrives,
+one JSON object per line: {"id": "<puzzle ID>", "removed": K, "puzzle": "<81 digits>", "solution": "<81 digits>"}
+(0 marks an empty cell in the puzzle, values past 9 are letters -- see SudokuBoard.to_string).
+"removed" is the number of empty cells the puzzle really has. Unique puzzles can come out with fewer than
+--removed (from about 55 on a 9x9 board, see SudokuGenerator.remove_cells_unique); the ID keeps the
+requested count, which is what regenerating the puzzle needs.
+
+The parent process hands every task its own seed (sudoku_id), so workers need no shared state and any
+line can be regenerated from its ID alone. With --seed the same set of puzzles comes out on every run,
+whatever the number of workers (only the order of the lines can change).
+
+With --dedup every puzzle is checked against a sudoku_dedup.DedupIndex file first: puzzles equivalent to
+one already in the index (from this run or an earlier one) are dropped and replaced. Only 9x9 puzzles can
+be checked (see sudoku_transform.CANONICAL_SIZE).
+"""
+
+
+# generates one pair in a worker and returns it already encoded, so the parent only has to write it
+# the canonical hash (None unless asked for) is worked out here too, it costs more than the write
+def _generate_one(args):
+    size, removed, unique, want_key, seed = args
+    puzzle_id = make_id(size, removed, unique, seed)
+    board, solved_board = generate_from_id(puzzle_id)
+    line = json.dumps({
+        "id": puzzle_id,
+        "removed": board.cells.count(0),  # can be less than asked for, see the module notes
+        "puzzle": board.to_string(),
+        "solution": solved_board.to_string(),
+    })
+    return (canonical_hash(board) if want_key else None), line
+
+
+'''
+Generates count puzzles across a pool of worker processes and streams them to out
+
+Parameters:
+out is a writable text file
+count is the number of puzzles to generate
+removed is the number of cells to clear in each puzzle
+workers is the number of worker processes
+unique is whether every puzzle must have a single solution
+size is the number of rows/columns of the board
+dedup is a sudoku_dedup.DedupIndex to check puzzles against (and record them in), or None -- 9x9 boards only
+seed is the seed of the whole batch (None for a random one), see the module notes
+
+Return: int (the number of puzzles written)
+'''
+def generate_batch(out, count, removed, workers, unique=True, size=9, dedup=None, seed=None):
+    if dedup is not None and size != CANONICAL_SIZE:
+        raise ValueError(f"dedup only works for {CANONICAL_SIZE}x{CANONICAL_SIZE} boards")
+    # small chunks keep output flowing, but big enough that task hand-off doesn't dominate
+    chunksize = max(1, min(64, count // (workers * 8)))
+    seeds = random.Random(seed)
+    want_key = dedup is not None
+    written = 0
+    with multiprocessing.Pool(workers) as pool:
+        while written < count:  # another round only to replace duplicates
+            tasks = ((size, removed, unique, want_key, seeds.getrandbits(64)) for _ in range(count - written))
+            for key, line in pool.imap_unordered(_generate_one, tasks, chunksize):
+                if dedup is not None and not dedup.add(key):
+                    continue
+                out.write(line)
+                out.write("\n")
+                written += 1
+    out.flush()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sudoku_generator batch",
+                                     description="Generate sudoku puzzles in bulk.")
+    parser.add_argument("--count", type=int, required=True, help="number of puzzles to generate")
+    parser.add_argument("--removed", type=int, default=40, help="cells to clear per puzzle (default 40)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: one per core)")
+    parser.add_argument("--output", default="-", help="file to write to (default: stdout)")
+    parser.add_argument("--unique", action=argparse.BooleanOptionalAction, default=True,
+                        help="only emit puzzles with a single solution (default: on)")
+    parser.add_argument("--size", type=int, default=9, choices=(9, 16, 25), help="rows/columns per board (default 9)")
+    parser.add_argument("--seed", type=int, help="seed for a reproducible batch (default: random)")
+    parser.add_argument("--dedup", metavar="INDEX",
+                        help="skip puzzles already recorded in this index file (created if missing)")
+    args = parser.parse_args(argv)
+    if args.count < 0 or args.workers < 1:
+        parser.error("--count must be >= 0 and --workers must be >= 1")
+    if not 0 <= args.removed <= args.size ** 2:
+        parser.error(f"--removed must be between 0 and {args.size ** 2} for --size {args.size}")
+    if args.dedup and args.size != CANONICAL_SIZE:
+        parser.error(f"--dedup only works with --size {CANONICAL_SIZE}")
+
+    dedup = DedupIndex(args.dedup) if args.dedup else None
+    try:
+        if args.output == "-":
+            generate_batch(sys.stdout, args.count, args.removed, args.workers, args.unique, args.size, dedup,
+                           args.seed)
+        else:
+            with open(args.output, "w") as out:
+                generate_batch(out, args.count, args.removed, args.workers, args.unique, args.size, dedup,
+                               args.seed)
+    finally:
+        if dedup is not None:
+            dedup.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
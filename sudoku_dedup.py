@@ -0,0 +1,159 @@
+import mmap, os, struct, sys
+from sudoku_transform import canonical_hash
+
+"""
+Persistent index of puzzles that have already been handed out, keyed by sudoku_transform.canonical_hash
+
+The index is one file holding an open-addressing hash table of 64 bit keys, mapped into memory with mmap,
+so a lookup touches a handful of bytes no matter how many puzzles have been seen and the table survives
+restarts. Equivalent puzzles (relabelled, shuffled, transposed) share a key, so none of them is accepted
+twice. Only 9x9 puzzles can be keyed (see sudoku_transform.CANONICAL_SIZE); add_puzzle and seen raise
+ValueError for bigger boards.
+
+File layout: a 32 byte header (magic, byte order, capacity, count) followed by capacity 8 byte slots
+(0 = empty). The table doubles (rewritten to a temporary file, then swapped in with os.replace) when it
+gets more than half full.
+
+A DedupIndex is not thread safe and only one process should write to a file at a time.
+"""
+
+MAGIC = b"SUDOKUDX"
+HEADER = struct.Struct("<8s8sQQ")  # magic, byte order, capacity, count
+INITIAL_CAPACITY = 1 << 12
+MAX_LOAD = 0.5
+
+
+def _write_header(buffer, capacity, count):
+    HEADER.pack_into(buffer, 0, MAGIC, sys.byteorder.encode(), capacity, count)
+
+
+class DedupIndex:
+
+    '''
+    Opens the index at path, creating it if it doesn't exist
+
+    Parameters:
+    path is the index file
+
+    Return: None
+    '''
+    def __init__(self, path):
+        self.path = path
+        if not os.path.exists(path):
+            self._create(path + ".tmp", INITIAL_CAPACITY)
+            os.replace(path + ".tmp", path)  # never leave a half written index behind
+        self._open()
+
+    # writes an empty table of the given capacity (a power of 2)
+    @staticmethod
+    def _create(path, capacity):
+        with open(path, "wb") as f:
+            f.write(bytes(HEADER.size))
+            f.truncate(HEADER.size + 8 * capacity)
+        with open(path, "r+b") as f, mmap.mmap(f.fileno(), 0) as m:
+            _write_header(m, capacity, 0)
+
+    def _open(self):
+        self.file = open(self.path, "r+b")
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        magic, byteorder, self.capacity, self.count = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            self._close_map()
+            raise ValueError(f"{self.path} is not a puzzle index")
+        if byteorder.rstrip(b"\0").decode() != sys.byteorder:
+            self._close_map()
+            raise ValueError(f"{self.path} was written on a machine with a different byte order")
+        self.slots = memoryview(self.map)[HEADER.size:].cast("Q")
+        self.mask = self.capacity - 1
+
+    def _close_map(self):
+        if getattr(self, "slots", None) is not None:
+            self.slots.release()  # mmap refuses to close while a view is exported
+            self.slots = None
+        self.map.close()
+        self.file.close()
+
+    # slot holding key, or the empty slot where it would go
+    def _find(self, key):
+        slots, mask = self.slots, self.mask
+        i = key & mask
+        while True:
+            found = slots[i]
+            if found == key or found == 0:
+                return i
+            i = (i + 1) & mask
+
+    def _grow(self):
+        keys = [key for key in self.slots if key]
+        temp = self.path + ".tmp"
+        capacity = self.capacity * 2
+        self._create(temp, capacity)
+        with open(temp, "r+b") as f, mmap.mmap(f.fileno(), 0) as m:
+            slots = memoryview(m)[HEADER.size:].cast("Q")
+            mask = capacity - 1
+            for key in keys:
+                i = key & mask
+                while slots[i]:
+                    i = (i + 1) & mask
+                slots[i] = key
+            slots.release()
+            _write_header(m, capacity, len(keys))
+            m.flush()
+        self._close_map()
+        os.replace(temp, self.path)
+        self._open()
+
+    @staticmethod
+    def _key(key):
+        return key or 1  # 0 marks an empty slot
+
+    def __contains__(self, key):
+        key = self._key(key)
+        return self.slots[self._find(key)] == key
+
+    def __len__(self):
+        return self.count
+
+    '''
+    Records a key
+
+    Parameters:
+    key is a 64 bit int, normally canonical_hash of a puzzle
+
+    Return: bool (True if the key is new, False if it was already in the index)
+    '''
+    def add(self, key):
+        key = self._key(key)
+        i = self._find(key)
+        if self.slots[i] == key:
+            return False
+        if (self.count + 1) > self.capacity * MAX_LOAD:
+            self._grow()
+            i = self._find(key)
+        self.slots[i] = key
+        self.count += 1
+        _write_header(self.map, self.capacity, self.count)
+        return True
+
+    # records a 9x9 puzzle by its canonical hash, True if no equivalent puzzle was seen before (ValueError for other sizes)
+    def add_puzzle(self, board):
+        return self.add(canonical_hash(board))
+
+    # True if the puzzle, or one equivalent to it, is already in the index (doesn't record it)
+    def seen(self, board):
+        return canonical_hash(board) in self
+
+    # writes outstanding changes to disk (the OS does this on its own eventually)
+    def flush(self):
+        self.map.flush()
+
+    def close(self):
+        if self.slots is not None:
+            self.flush()
+            self._close_map()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
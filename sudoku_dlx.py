@@ -0,0 +1,251 @@
+import math, random
+from sudoku_generator import SudokuBoard
+
+"""
+Exact-cover (Knuth's Algorithm X with Dancing Links) solver for boards of any N^2 x N^2 size
+
+A sudoku is an exact cover problem: every (cell, num) placement covers four constraints -- the cell is
+filled, num is in its row, num is in its column, num is in its box -- and a solution picks placements that
+cover every constraint exactly once. Givens are applied before the matrix is built, so only empty cells
+and the nums their peers still allow become rows, and only unmet constraints become columns.
+
+The links live in flat lists (left, right, up, down, column of every node) rather than node objects, and
+the search is iterative, so 25x25 boards don't run into the recursion limit.
+"""
+
+
+FILL_BUDGET = 3  # placements tried per cell before fill restarts
+
+
+class _Matrix:
+
+    # ncolumns constraint columns, numbered 1..ncolumns (0 is the root header)
+    def __init__(self, ncolumns):
+        nodes = ncolumns + 1
+        self.left = [j - 1 for j in range(nodes)]
+        self.left[0] = ncolumns
+        self.right = [j + 1 for j in range(nodes)]
+        self.right[ncolumns] = 0
+        self.up = list(range(nodes))
+        self.down = list(range(nodes))
+        self.column = list(range(nodes))
+        self.sizes = [0] * nodes
+        self.row_of = [None] * nodes  # node -> the row id it was added with
+
+    # adds a row covering the given columns
+    def add_row(self, row_id, columns):
+        left, right, up, down, column = self.left, self.right, self.up, self.down, self.column
+        first = len(left)
+        for k, j in enumerate(columns):
+            x = first + k
+            left.append(x - 1 if k else first + len(columns) - 1)
+            right.append(x + 1 if k < len(columns) - 1 else first)
+            up.append(up[j])
+            down.append(j)
+            down[up[j]] = x
+            up[j] = x
+            column.append(j)
+            self.row_of.append(row_id)
+            self.sizes[j] += 1
+
+    '''
+    Finds exact covers
+
+    Parameters:
+    limit is the number of solutions after which the search stops
+    rng is a random.Random (or the random module) to shuffle the rows tried at every step, or None to try
+    them in order
+    budget is the most rows to try before giving up, or None for no limit
+
+    Return: list of solutions, each a list of row ids -- None if the budget ran out first
+    '''
+    def search(self, limit, rng=None, budget=None):
+        left, right, up, down, column, sizes = self.left, self.right, self.up, self.down, self.column, self.sizes
+
+        def cover(c):
+            left[right[c]] = left[c]
+            right[left[c]] = right[c]
+            i = down[c]
+            while i != c:
+                j = right[i]
+                while j != i:
+                    up[down[j]] = up[j]
+                    down[up[j]] = down[j]
+                    sizes[column[j]] -= 1
+                    j = right[j]
+                i = down[i]
+
+        def uncover(c):
+            i = up[c]
+            while i != c:
+                j = left[i]
+                while j != i:
+                    sizes[column[j]] += 1
+                    up[down[j]] = j
+                    down[up[j]] = j
+                    j = left[j]
+                i = up[i]
+            left[right[c]] = c
+            right[left[c]] = c
+
+        solutions = []
+        stack = []  # [column, rows to try, next row index] per level
+        chosen = []  # the row node picked at each level
+        while True:
+            if right[0] == 0:  # every constraint covered
+                solutions.append([self.row_of[r] for r in chosen])
+                if len(solutions) >= limit:
+                    return solutions
+            else:
+                # the column with the fewest rows left
+                best, best_size = 0, None
+                c = right[0]
+                while c:
+                    if best_size is None or sizes[c] < best_size:
+                        best, best_size = c, sizes[c]
+                        if best_size < 2:
+                            break
+                    c = right[c]
+                if best_size:
+                    cover(best)
+                    rows = []
+                    r = down[best]
+                    while r != best:
+                        rows.append(r)
+                        r = down[r]
+                    if rng is not None:
+                        rng.shuffle(rows)
+                    stack.append([best, rows, 0])
+
+            # move to the next untried row, backing out of exhausted levels
+            while stack:
+                level = stack[-1]
+                if len(chosen) == len(stack):  # undo the row tried last at this level
+                    r = chosen.pop()
+                    j = left[r]
+                    while j != r:
+                        uncover(column[j])
+                        j = left[j]
+                if level[2] < len(level[1]):
+                    if budget is not None:
+                        budget -= 1
+                        if budget < 0:
+                            return None
+                    r = level[1][level[2]]
+                    level[2] += 1
+                    chosen.append(r)
+                    j = right[r]
+                    while j != r:
+                        cover(column[j])
+                        j = right[j]
+                    break
+                uncover(level[0])
+                stack.pop()
+            else:
+                return solutions
+
+
+# builds the exact cover matrix for a board, or None if the givens contradict each other
+# exclude is an optional (index, num) placement to leave out
+def _build(grid, exclude=None):
+    board = SudokuBoard.from_grid(grid)
+    size = board.size
+    box_length = math.isqrt(size)
+    cells = board.cells
+    rows, cols, boxes = [0] * size, [0] * size, [0] * size
+    for i, num in enumerate(cells):
+        if num:
+            r, c = divmod(i, size)
+            b = (r // box_length) * box_length + c // box_length
+            bit = 1 << num
+            if (rows[r] | cols[c] | boxes[b]) & bit:
+                return None
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+
+    # number the unmet constraints: cell filled, (row, num), (col, num), (box, num)
+    ids = {}
+    for i, num in enumerate(cells):
+        if not num:
+            ids[("cell", i)] = len(ids) + 1
+    for kind, masks in (("row", rows), ("col", cols), ("box", boxes)):
+        for unit, mask in enumerate(masks):
+            for num in range(1, size + 1):
+                if not mask & (1 << num):
+                    ids[(kind, unit, num)] = len(ids) + 1
+
+    matrix = _Matrix(len(ids))
+    full = ((1 << size) - 1) << 1
+    for i, num in enumerate(cells):
+        if num:
+            continue
+        r, c = divmod(i, size)
+        b = (r // box_length) * box_length + c // box_length
+        free = full & ~(rows[r] | cols[c] | boxes[b])
+        while free:
+            bit = free & -free
+            free ^= bit
+            num = bit.bit_length() - 1
+            if (i, num) != exclude:
+                matrix.add_row((i, num), (ids[("cell", i)], ids[("row", r, num)],
+                                          ids[("col", c, num)], ids[("box", b, num)]))
+    return board, matrix
+
+
+'''
+Solves a board by exact cover
+
+Parameters:
+grid is a SudokuBoard or 2D list (0 = empty), it is not modified
+limit is the number of solutions after which the search stops
+rng is a random.Random (or the random module) to pick among solutions at random, or None
+exclude is an (index, num) placement to rule out, or None
+budget is the most placements to try before giving up, or None for no limit
+
+Return: list of SudokuBoards (at most limit, empty if there is no solution) -- None if the budget ran out
+'''
+def solve(grid, limit=1, rng=None, exclude=None, budget=None):
+    built = _build(grid, exclude)
+    if built is None:
+        return []
+    board, matrix = built
+    found = matrix.search(limit, rng, budget)
+    if found is None:
+        return None
+    solutions = []
+    for placements in found:
+        solved = board.copy()
+        for i, num in placements:
+            solved.cells[i] = num
+        solutions.append(solved)
+    return solutions
+
+
+# number of solutions of a board, stopping at limit (1 means the puzzle is unique)
+def count_solutions(grid, limit=2):
+    return len(solve(grid, limit))
+
+
+# True if the board can be solved without num at (row, col) -- see sudoku_solver.has_solution_without
+# with a budget, running out of it also counts as True (no proof that there is no such solution)
+def has_solution_without(grid, row, col, num, budget=None):
+    return solve(grid, 1, exclude=(row * len(grid) + col, num), budget=budget) != []
+
+
+'''
+A random completely filled board
+
+Parameters:
+size is the number of rows/columns (a perfect square: 4, 9, 16, 25, ...)
+rng is the random.Random (or the random module) to draw from
+
+Return: SudokuBoard
+'''
+def fill(size, rng=random):
+    # a random search sometimes wanders into a dead end that takes ages to back out of, but most runs
+    # need barely more than one placement per cell -- so give up early and start over instead
+    while True:
+        solutions = solve(SudokuBoard(size), 1, rng, budget=FILL_BUDGET * size * size)
+        if solutions:
+            return solutions[0]
@@ -0,0 +1,457 @@
+import argparse, math, random, sys, time
+from sudoku_generator import SudokuBoard, generate_sudoku
+from sudoku_history import DEFAULT_CAPACITY, History, pack, unpack
+
+"""
+The game model: board state and every rule of play, with no rendering and no pygame
+
+GameBoard holds the cells, the selection, the running counts behind is_full/check_board, conflicts and
+the undo history. Everything a player can do is a command (see GameBoard.apply):
+
+select ROW COL    select a cell (anything off the board clears the selection)
+move DROW DCOL    move the selection (arrow keys), stays put at the edge
+input NUM         sketch NUM into the selected cell (number keys)
+place             turn the selected sketch into a value (enter)
+clear             clear the selected cell if the player filled it (backspace)
+undo / redo / reset
+
+The pygame front end (sudoku.py) subclasses Cell/Board to draw them and turns events into the same
+commands, so a scripted command stream replays exactly what a player would have done -- headless, and as
+fast as the model runs. The model only records which cells changed (take_changes); drawing them is up to
+the front end.
+
+Replay a script, or run random sessions for load / regression testing:
+python -m sudoku_game --script moves.txt --puzzle-id ID
+python -m sudoku_game --sessions 1000 [--moves 200] [--seed 0]
+"""
+
+# command name -> number of (int) arguments
+COMMANDS = {"select": 2, "move": 2, "input": 1, "place": 0, "clear": 0, "undo": 0, "redo": 0, "reset": 0}
+
+
+class GameCell:
+
+    # grid is the SudokuBoard the value is stored in (GameBoard shares one between all its cells)
+    def __init__(self, value, row, col, grid=None):
+        self.grid = grid if grid is not None else SudokuBoard(9)
+        self.index = row * self.grid.size + col  # position in grid.cells
+        self.value = value
+        self.sketched_value = 0
+        self.user_placed = False
+        self.row = row
+        self.col = col
+
+    # the value lives in the shared board, so the board is always up to date without copying
+    @property
+    def value(self):
+        return self.grid.cells[self.index]
+
+    @value.setter
+    def value(self, value):
+        self.grid.cells[self.index] = value
+
+    # value = locked-in guess/unchangeable numbers
+    def set_cell_value(self, value):
+        self.value = value
+
+    # sketched value = user guess
+    def set_sketched_value(self, value):
+        self.sketched_value = value
+
+    # user placed means it's a solidified sketch value -- info not given to user initially
+    def set_user_placed(self):
+        self.user_placed = True
+
+
+class GameBoard:
+
+    '''
+    Parameters:
+    unsolved_board is the puzzle (SudokuBoard or 2D list, 0 = empty)
+    solved_board is its solution
+    history_capacity is the number of moves undo can go back
+
+    Return: None
+    '''
+    def __init__(self, unsolved_board, solved_board, history_capacity=DEFAULT_CAPACITY):
+        self.selected_cell = None  # cell object of currently selected cell
+        self.unsolved_board = SudokuBoard.from_grid(unsolved_board)  # unsolved board    -- (used for resetting)
+        self.solved_board = SudokuBoard.from_grid(solved_board)  # solved board              -- (used to check win)
+        self.values = self.unsolved_board.copy()  # current values, shared by every cell    -- (used for checks)
+        self.size = self.values.size  # rows/columns of the board
+        self.box_length = math.isqrt(self.size)
+        self.cell_array = [[self.make_cell(self.unsolved_board[row][col], row, col) for col in range(self.size)]
+                           for row in range(self.size)]  # 2d array of cell objects
+        self.dirty_cells = set()  # (row, col) of cells that changed since the last take_changes
+        self.full_redraw = True  # everything changed (new or reset board)
+        self.recount()  # empty_count, mismatch_count & conflict tracking -- kept up to date by set_value
+        self.history = History(history_capacity)  # moves for undo/redo, one packed int each -- see sudoku_history
+
+    # builds one cell -- front ends override this to build cells that can draw themselves
+    def make_cell(self, value, row, col):
+        return GameCell(value, row, col, self.values)
+
+    # rebuild the running counts from scratch (new or reset board), every later change goes through set_value
+    def recount(self):
+        size = self.values.size
+        values = self.values.cells
+        self.empty_count = values.count(0)  # is_full <=> no empty cells
+        self.mismatch_count = sum(value != solved for value, solved in zip(values, self.solved_board.cells))
+        # unit_cells[unit][num] = indices of cells holding num in that unit (rows, then columns, then boxes)
+        self.unit_cells = [[set() for _ in range(size + 1)] for _ in range(3 * size)]
+        self.conflict_counts = [0] * (size * size)  # per cell, how many same-valued cells share a unit with it
+        self.conflicted = set()  # indices of every cell that currently clashes with another
+        for index, value in enumerate(values):
+            if value != 0:
+                self.add_to_units(index, value)
+
+    # the row, column and box unit numbers for a cell index (see unit_cells)
+    def units_of(self, index):
+        size, box_length = self.values.size, self.box_length
+        row, col = divmod(index, size)
+        return row, size + col, 2 * size + (row // box_length) * box_length + col // box_length
+
+    def add_to_units(self, index, value):
+        for unit in self.units_of(index):
+            holders = self.unit_cells[unit][value]
+            for other in holders:  # every cell already holding value in this unit now clashes with index
+                self.conflict_counts[other] += 1
+                self.conflicted.add(other)
+            self.conflict_counts[index] += len(holders)
+            holders.add(index)
+        if self.conflict_counts[index]:
+            self.conflicted.add(index)
+
+    def remove_from_units(self, index, value):
+        for unit in self.units_of(index):
+            holders = self.unit_cells[unit][value]
+            holders.discard(index)
+            for other in holders:
+                self.conflict_counts[other] -= 1
+                if not self.conflict_counts[other]:
+                    self.conflicted.discard(other)
+            self.conflict_counts[index] -= len(holders)
+        self.conflicted.discard(index)  # no value left, nothing to clash with
+
+    # change a cell's value and update the empty/mismatch counts and conflicts to match -- O(1)
+    # every value change on the board should go through here
+    def set_value(self, cell, value):
+        old = cell.value
+        if old == value:
+            return
+        index = cell.index
+        if old != 0:
+            self.remove_from_units(index, old)
+        else:
+            self.empty_count -= 1
+        if value != 0:
+            self.add_to_units(index, value)
+        else:
+            self.empty_count += 1
+        solved = self.solved_board.cells[index]
+        self.mismatch_count += (value != solved) - (old != solved)
+        cell.set_cell_value(value)
+
+    # cells (row, col) holding the same value as (row, col) in its row, column or box
+    def get_conflicts(self, row, col):
+        index = row * self.values.size + col
+        value = self.values.cells[index]
+        if value == 0:
+            return set()
+        size = self.values.size
+        return {divmod(other, size) for unit in self.units_of(index)
+                for other in self.unit_cells[unit][value] if other != index}
+
+    # queue a cell to be redrawn (see take_changes)
+    def mark_dirty(self, cell):
+        if cell is not None:
+            self.dirty_cells.add((cell.row, cell.col))
+
+    # what changed since the last call: (everything changed, set of (row, col)) -- resets both
+    def take_changes(self):
+        changes = self.full_redraw, self.dirty_cells
+        self.full_redraw = False
+        self.dirty_cells = set()
+        return changes
+
+    # change currently selected cell
+    def select(self, row, col):
+        self.mark_dirty(self.selected_cell)  # old selection loses its border
+        if (not (0 <= row < self.size)) or (not (0 <= col < self.size)):  # clear selected if invalid coords
+            self.selected_cell = None
+        else:
+            self.selected_cell = self.cell_array[row][col]
+            self.mark_dirty(self.selected_cell)
+
+    # clear currently selected cell's values (if values entered by user)
+    def clear(self):  # clear selected
+        if self.selected_cell is not None:
+            if self.selected_cell.value == 0 or self.selected_cell.user_placed:
+                before = cell_state(self.selected_cell)
+                self.set_value(self.selected_cell, 0)
+                self.selected_cell.set_sketched_value(0)
+                self.mark_dirty(self.selected_cell)
+                self.record(self.selected_cell, before)
+
+    # place a sketched value onto selected cell
+    def sketch(self, value):
+        if self.selected_cell is not None:
+            before = cell_state(self.selected_cell)
+            self.selected_cell.set_sketched_value(value)
+            self.selected_cell.set_user_placed()
+            self.mark_dirty(self.selected_cell)
+            self.record(self.selected_cell, before)
+
+    # turn selected sketch into placed value
+    def place_number(self):
+        if self.selected_cell is not None:
+            if (self.selected_cell.sketched_value != 0) and (self.selected_cell.value == 0):  # check it can be placed
+                before = cell_state(self.selected_cell)
+                self.set_value(self.selected_cell, self.selected_cell.sketched_value)
+                self.selected_cell.set_user_placed()
+                self.mark_dirty(self.selected_cell)
+                self.record(self.selected_cell, before)
+
+    # takes keyboard intput of a number 1 - size and sketches it
+    def number_input(self, number):
+        if self.selected_cell.value == 0:  # check there's no value in cell already
+            self.sketch(number)
+
+    # add a move to the undo history if it changed anything (before is the cell_state from before the move)
+    def record(self, cell, before):
+        after = cell_state(cell)
+        if after != before:
+            self.history.record(pack(cell.index, before, after))
+
+    # put a cell into a (value, sketched_value, user_placed) state and select it, so the player sees what changed
+    def restore_cell(self, index, state):
+        cell = self.cell_array[index // self.size][index % self.size]
+        value, sketched_value, user_placed = state
+        self.set_value(cell, value)
+        cell.sketched_value = sketched_value
+        cell.user_placed = user_placed
+        self.select(cell.row, cell.col)
+        self.mark_dirty(cell)
+
+    # take back the last move, returns False if there was nothing to undo
+    def undo(self):
+        delta = self.history.undo()
+        if delta is None:
+            return False
+        index, before, _ = unpack(delta)
+        self.restore_cell(index, before)
+        return True
+
+    # make the last undone move again, returns False if there was nothing to redo
+    def redo(self):
+        delta = self.history.redo()
+        if delta is None:
+            return False
+        index, _, after = unpack(delta)
+        self.restore_cell(index, after)
+        return True
+
+    # reset board to initial (removed) puzzle state
+    # the cells are reused (values are copied back in bulk), so selected_cell stays valid
+    def reset_to_original(self):
+        self.values.cells[:] = self.unsolved_board.cells
+        for row in self.cell_array:
+            for cell in row:
+                cell.sketched_value = 0
+                cell.user_placed = False
+        self.history.clear()
+        self.full_redraw = True
+        self.recount()
+
+    # put the player's values, sketches and placed flags from a sudoku_save.SavedGame back on the board
+    def restore_state(self, saved):
+        self.values.cells[:] = saved.values.cells
+        cells = [cell for row in self.cell_array for cell in row]
+        for cell, sketched_value, user_placed in zip(cells, saved.sketches, saved.placed):
+            cell.sketched_value = sketched_value
+            cell.user_placed = user_placed
+        self.history.clear()
+        self.full_redraw = True
+        self.recount()
+
+    '''
+    Carries out one player command (see the module notes)
+    Commands that need a selected cell do nothing without one, like the keys they stand for.
+
+    Parameters:
+    command is a tuple (name, *args), e.g. ("select", 3, 4) or ("input", 7)
+
+    Return: None -- raises ValueError for unknown commands or the wrong number of arguments
+    '''
+    def apply(self, command):
+        name, *args = command
+        if COMMANDS.get(name) != len(args):
+            raise ValueError(f"bad command {command!r}")
+        selected = self.selected_cell
+        if name == "select":
+            self.select(*args)
+        elif name == "move":
+            if selected is not None:
+                row, col = selected.row + args[0], selected.col + args[1]
+                if 0 <= row < self.size and 0 <= col < self.size:
+                    self.select(row, col)
+        elif name == "input":
+            if selected is not None and 1 <= args[0] <= self.size:
+                self.number_input(args[0])
+        elif name == "place":
+            self.place_number()
+        elif name == "clear":
+            if selected is not None and selected.user_placed:
+                self.clear()
+        elif name == "undo":
+            self.undo()
+        elif name == "redo":
+            self.redo()
+        elif name == "reset":
+            self.reset_to_original()
+
+    # check if board is full or not
+    def is_full(self):  # returns boolean
+        return self.empty_count == 0
+
+    # check if board is solved
+    def check_board(self):
+        return self.mismatch_count == 0
+
+    # returns the current values -- a view, not a copy (index as [row][col], .to_list() for a real 2d list)
+    def get_integer_array(self):
+        return self.values
+
+
+# a cell's (value, sketched_value, user_placed), as stored in the undo history
+def cell_state(cell):
+    return cell.value, cell.sketched_value, cell.user_placed
+
+
+'''
+Turns script lines ("select 3 4", "input 7", "place", ...; # starts a comment) into commands
+
+Parameters:
+lines is an iterable of str
+
+Return: list of command tuples -- raises ValueError naming the line for unknown commands, the wrong number
+of arguments or arguments that aren't ints
+'''
+def parse_script(lines):
+    commands = []
+    for number, line in enumerate(lines, 1):
+        words = line.split("#", 1)[0].split()
+        if not words:
+            continue
+        name, args = words[0], words[1:]
+        if name not in COMMANDS:
+            raise ValueError(f"line {number}: unknown command {name!r}")
+        if len(args) != COMMANDS[name]:
+            raise ValueError(f"line {number}: {name} takes {COMMANDS[name]} argument(s), got {len(args)}")
+        try:
+            commands.append((name, *(int(arg) for arg in args)))
+        except ValueError:
+            raise ValueError(f"line {number}: arguments must be whole numbers: {line.strip()!r}") from None
+    return commands
+
+
+'''
+Replays commands on a board, stopping early once the board is full (the game would be over)
+
+Parameters:
+board is a GameBoard (or the pygame Board)
+commands is an iterable of command tuples (see GameBoard.apply)
+
+Return: int (the number of commands carried out)
+'''
+def replay(board, commands):
+    done = 0
+    for command in commands:
+        board.apply(command)
+        done += 1
+        if board.is_full():
+            break
+    return done
+
+
+'''
+Random commands in the mix a player produces: mostly moving, sketching and placing, some clears and undos
+
+Parameters:
+size is the number of rows/columns of the board
+count is the number of commands
+rng is the random.Random to draw from
+
+Return: list of command tuples
+'''
+def random_commands(size, count, rng):
+    commands = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.25:
+            commands.append(("select", rng.randrange(size), rng.randrange(size)))
+        elif roll < 0.4:
+            commands.append(("move", *rng.choice(((-1, 0), (1, 0), (0, -1), (0, 1)))))
+        elif roll < 0.7:
+            commands.append(("input", rng.randint(1, size)))
+        elif roll < 0.85:
+            commands.append(("place",))
+        elif roll < 0.92:
+            commands.append(("clear",))
+        elif roll < 0.98:
+            commands.append(("undo",))
+        else:
+            commands.append(("redo",))
+    return commands
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sudoku_game",
+                                     description="Replay or simulate games headless (no window, no pygame).")
+    parser.add_argument("--script", help="command script to replay (- for stdin)")
+    parser.add_argument("--puzzle-id", help="sudoku_id ID of the puzzle to play (default: a new random one)")
+    parser.add_argument("--sessions", type=int, default=0, help="random sessions to simulate")
+    parser.add_argument("--moves", type=int, default=200, help="commands per simulated session (default 200)")
+    parser.add_argument("--removed", type=int, default=40, help="cells removed for new puzzles (default 40)")
+    parser.add_argument("--seed", type=int, help="seed for the puzzle and the simulated sessions")
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+
+    if args.puzzle_id:
+        from sudoku_id import generate_from_id
+        try:
+            puzzle, solution = generate_from_id(args.puzzle_id)
+        except ValueError as error:
+            parser.error(str(error))
+    else:
+        puzzle, solution = generate_sudoku(9, args.removed, True, rng.getrandbits(64))
+
+    if args.script:
+        try:
+            if args.script == "-":
+                commands = parse_script(sys.stdin)
+            else:
+                with open(args.script) as lines:
+                    commands = parse_script(lines)
+        except (OSError, ValueError) as error:
+            parser.error(f"{args.script}: {error}")
+        board = GameBoard(puzzle, solution)
+        done = replay(board, commands)
+        for row in board.values.to_list():
+            print(" ".join(str(value) for value in row))
+        print(f"{done} commands, full: {board.is_full()}, solved: {board.is_full() and board.check_board()}, "
+              f"conflicts: {len(board.conflicted)}")
+
+    if args.sessions:
+        scripts = [random_commands(puzzle.size, args.moves, rng) for _ in range(args.sessions)]
+        start = time.perf_counter()
+        for commands in scripts:
+            replay(GameBoard(puzzle, solution), commands)
+        elapsed = time.perf_counter() - start
+        print(f"{args.sessions} sessions of {args.moves} commands in {elapsed:.3f} s: "
+              f"{args.sessions / elapsed:.0f} sessions/s, {args.sessions * args.moves / elapsed:.0f} commands/s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,42 +1,109 @@
-import pygame, math, random, copy, requests, sys
-from io import BytesIO
-
-# CONSTANTS
-
-WIDTH = 594  # 603 is evenly divisible by 9
-HEIGHT = WIDTH + 80  # add 95 pixels to the bottom for reset/restart/quit buttons
-LINE_WIDTH = 3
-LINE_WIDTH_2 = 5
-WIN_LINE_WIDTH = 15
-BOARD_ROWS = 9
-BOARD_COLS = 9
-SQUARE_SIZE = 66
-CIRCLE_RADIUS = 60
-CIRCLE_WIDTH = 15
-CROSS_WIDTH = 25
-SPACE = 55
-RED = (255, 0, 0)
-WHITE = (255, 255, 255)
-BG_COLOR = (255, 255, 245)
-LINE_COLOR = (0, 0, 0)
-SKETCH_COLOR = (155, 155, 155)
-PLACED_COLOR = (50, 90, 175)
-VALUE_COLOR = (50, 50, 50)
-BG_IMAGE_REQUEST = requests.get('https://live.staticflickr.com/52/150983118_21b4093a61.jpg')
+import math, random, sys
+from sudoku_solver import has_solution_without
 
 """
 This was adapted from a GeeksforGeeks article "Program for Sudoku Generator" by Aarti_Rathi and Ankur Trisal
 https://www.geeksforgeeks.org/program-sudoku-generator/
 
-REFERENCES
-1. ankthon. (2022, September 7). Python: Display images with pygame. GeeksforGeeks. https://www.geeksforgeeks.org/python-display-images-with-pygame/ 
-2. Starbuck5. (n.d.). pygame module to transform surfaces. Pygame.transform - pygame v2.6.0 documentation. https://www.pygame.org/docs/ref/transform.html 
-3. marios-pz. (n.d.). pygame module for loading and rendering fonts. pygame.font - pygame v2.6.0 documentation. https://www.pygame.org/docs/ref/font.html 
-4. pygame.image - pygame v2.6.0 documentation. (n.d.). https://www.pygame.org/docs/ref/image.html 
-5. How to load image from web URL in pygame. CodersLegacy. (2023, April 13). https://coderslegacy.com/python/load-image-from-web-url-pygame/ 
-6. Purple Slog. (2006, May 22). Sudoku Template. https://www.flickr.com/photos/93453114@N00/150983118. 
+Only the standard library is imported here, so the generator can be used headless (batch workers, the puzzle
+pool) without pulling in pygame. The game itself lives in sudoku.py.
 """
 
+EXACT_COVER_SIZE = 9  # boards bigger than this are filled (and checked for uniqueness) by sudoku_dlx
+SYMBOLS = "0123456789ABCDEFGHIJKLMNOP"  # one character per value in to_string/from_string, 0 = empty
+_TO_SYMBOL = {num: ord(symbol) for num, symbol in enumerate(SYMBOLS)}
+_FROM_SYMBOL = {ord(symbol): num for num, symbol in enumerate(SYMBOLS)}
+# removed cells for easy, medium, hard per board size -- large boards stay under a second to generate uniquely
+DIFFICULTIES_BY_SIZE = {9: (30, 40, 50), 16: (80, 100, 115), 25: (190, 220, 250)}
+
+
+class SudokuBoard:
+
+    '''
+	A compact board: every cell is one byte in a flat bytearray, row by row (0 = empty)
+	board[row][col] still works -- board[row] is a memoryview of that row, so it can be read, written and
+	iterated like a list without copying. Boards pickle as size + bytes, which keeps them cheap to send
+	between processes.
+
+	Parameters:
+	size is the number of rows/columns of the board
+	cells is an optional iterable of size * size ints to start from (copied)
+
+	Return:
+	None
+    '''
+    __slots__ = ("size", "cells")
+
+    def __init__(self, size=9, cells=None):
+        self.size = size
+        self.cells = bytearray(size * size) if cells is None else bytearray(cells)
+        if len(self.cells) != size * size:
+            raise ValueError(f"a {size}x{size} board needs {size * size} cells, got {len(self.cells)}")
+
+    '''
+	Builds a board from any 2D grid (list of lists, another SudokuBoard, ...)
+	A SudokuBoard is copied
+
+	Parameters:
+	grid is indexable as grid[row][col]
+
+	Return: SudokuBoard
+    '''
+    @classmethod
+    def from_grid(cls, grid):
+        if isinstance(grid, SudokuBoard):
+            return grid.copy()
+        return cls(len(grid), (num for row in grid for num in row))
+
+    # a string of digits row by row, e.g. for writing puzzles to a file
+    # values past 9 are letters (A = 10 ... P = 25), so every cell is still one character
+    def to_string(self):
+        return self.cells.decode("latin-1").translate(_TO_SYMBOL)
+
+    # the reverse of to_string -- the board size comes from the string's length
+    @classmethod
+    def from_string(cls, text):
+        return cls(math.isqrt(len(text)), text.upper().translate(_FROM_SYMBOL).encode("latin-1"))
+
+    # the board as a fresh 2D python list
+    def to_list(self):
+        size = self.size
+        return [list(self.cells[row * size:(row + 1) * size]) for row in range(size)]
+
+    def copy(self):
+        return SudokuBoard(self.size, self.cells)
+
+    def __getitem__(self, row):
+        size = self.size
+        return memoryview(self.cells)[row * size:(row + 1) * size]
+
+    def __iter__(self):
+        view = memoryview(self.cells)
+        size = self.size
+        for row in range(size):
+            yield view[row * size:(row + 1) * size]
+
+    def __len__(self):
+        return self.size
+
+    # boards compare by value; a 2D list compares equal when it holds the same numbers
+    def __eq__(self, other):
+        if isinstance(other, SudokuBoard):
+            return self.size == other.size and self.cells == other.cells
+        try:
+            return self.to_list() == [list(row) for row in other]
+        except TypeError:
+            return NotImplemented
+
+    __hash__ = None  # mutable
+
+    def __reduce__(self):
+        return SudokuBoard, (self.size, bytes(self.cells))
+
+    def __repr__(self):
+        return f"SudokuBoard({self.size}, {self.to_string()!r})"
+
+
 class SudokuGenerator:
 
     '''
@@ -44,31 +111,48 @@ class SudokuGenerator:
 	This should initialize:
 	self.row_length		- the length of each row
 	self.removed_cells	- the total number of cells to be removed
-	self.board			- a 2D list of ints to represent the board
+	self.unique			- whether remove_cells must keep the puzzle to a single solution
+	self.board			- a SudokuBoard (flat bytearray, indexable as board[row][col]) to represent the board
 	self.box_length		- the square root of row_length
+	self.row_masks		- a bitmask per row, bit num is set when num is used in that row
+	self.col_masks		- a bitmask per column, bit num is set when num is used in that column
+	self.box_masks		- a bitmask per box, bit num is set when num is used in that box
+	self.full_mask		- a bitmask with the bit of every legal num set
+	self.random			- where every random choice comes from
+	self.retries		- cells remove_cells picked but couldn't remove (already empty, or needed to stay unique)
 
 	Parameters:
-    row_length is the number of rows/columns of the board (always 9 for this project)
+    row_length is the number of rows/columns of the board (9, 16 or 25 -- any perfect square)
     removed_cells is an integer value - the number of cells to be removed
+    unique is a boolean - if True, only cells whose removal keeps a single solution are removed
+    seed is None (use the global random module), an int (same seed -> same board) or a random.Random
 
 	Return:
 	None
     '''
-    def __init__(self, row_length, removed_cells):
+    def __init__(self, row_length, removed_cells, unique=False, seed=None):
+        if seed is None:
+            self.random = random
+        elif isinstance(seed, random.Random):
+            self.random = seed
+        else:
+            self.random = random.Random(seed)
         self.row_length = row_length
         self.removed_cells = removed_cells
-        self.board = []  # creates a square 2D array of 0's
-        for i in range(0, row_length):
-            self.board.append([])
-            for j in range(0, row_length):
-                self.board[i].append(0)
+        self.unique = unique
+        self.board = SudokuBoard(row_length)  # creates a square board of 0's
         self.box_length = math.floor(math.sqrt(row_length))
+        self.row_masks = [0] * row_length  # occupancy bitmasks, kept in sync by set_value
+        self.col_masks = [0] * row_length
+        self.box_masks = [0] * row_length
+        self.full_mask = ((1 << row_length) - 1) << 1  # bits 1..row_length
+        self.retries = 0
 
     '''
-	Returns a 2D python list of numbers which represents the board
+	Returns the board (a SudokuBoard -- read it like a 2D list, board[row][col])
 
 	Parameters: None
-	Return: list[list]
+	Return: SudokuBoard
     '''
     def get_board(self):
         return self.board
@@ -99,10 +183,7 @@ class SudokuGenerator:
 	Return: boolean
     '''
     def valid_in_row(self, row, num):
-        for value in self.board[row]:  # check each value in given board
-            if value == num:
-                return False
-        return True  # if it gets through entire row
+        return not self.row_masks[row] & (1 << num)
 
     '''
 	Determines if num is contained in the specified column (vertical) of the board
@@ -115,30 +196,23 @@ class SudokuGenerator:
 	Return: boolean
     '''
     def valid_in_col(self, col, num):
-        for row in self.board:
-            if row[col] == num:  # checks given column value in each row
-                return False
-        return True  # if it gets through entire column
+        return not self.col_masks[col] & (1 << num)
 
     '''
-	Determines if num is contained in the 3x3 box specified on the board
+	Determines if num is contained in the box specified on the board
     If num is in the specified box starting at (row_start, col_start), return False.
     Otherwise, return True
 
 	Parameters:
 	row_start and col_start are the starting indices of the box to check
-	i.e. the box is from (row_start, col_start) to (row_start+2, col_start+2)
+	i.e. the box is from (row_start, col_start) to (row_start+box_length-1, col_start+box_length-1)
 	num is the value we are looking for in the box
 
 	Return: boolean
     '''
     def valid_in_box(self, row_start, col_start, num):
-        for i in range(row_start, row_start + 2 + 1):
-            for j in range(col_start, col_start + 2 + 1):  # '+ 1' is to offset the range excluding last number
-                if self.board[i][j] == num:  # compare each value in box to given num
-                    return False
-        return True  # if it gets through the 3x3 box
-    
+        return not self.box_masks[self.box_index(row_start, col_start)] & (1 << num)
+
     '''
     Determines if it is valid to enter num at (row, col) in the board
     This is done by checking that num is unused in the appropriate, row, column, and box
@@ -150,45 +224,79 @@ class SudokuGenerator:
 	Return: boolean
     '''
     def is_valid(self, row, col, num):
-        if (self.valid_in_row(row, num)
-                and self.valid_in_col(col, num)
-                and self.valid_in_box((row // 3) * 3,(col // 3) * 3, num)):
-            return True
-        return False
+        used = self.row_masks[row] | self.col_masks[col] | self.box_masks[self.box_index(row, col)]
+        return not used & (1 << num)
 
     '''
-    Fills the specified 3x3 box with values
+    Returns the index of the box containing (row, col)
+    Boxes are numbered left to right, top to bottom, starting at 0
+
+	Parameters:
+	row and col are the row index and col index of any cell in the box
+
+	Return: int
+    '''
+    def box_index(self, row, col):
+        return (row // self.box_length) * self.box_length + col // self.box_length
+
+    '''
+    Sets the cell at (row, col) to num and keeps the row, column and box bitmasks in sync
+    Setting num to 0 clears the cell
+
+	Parameters:
+	row and col are the row index and col index of the cell to set
+	num is the value to place in the cell (0 to clear it)
+
+	Return: None
+    '''
+    def set_value(self, row, col, num):
+        box = self.box_index(row, col)
+        index = row * self.row_length + col
+        old = self.board.cells[index]
+        if old != 0:  # release the old value from every mask
+            bit = ~(1 << old)
+            self.row_masks[row] &= bit
+            self.col_masks[col] &= bit
+            self.box_masks[box] &= bit
+        if num != 0:
+            bit = 1 << num
+            self.row_masks[row] |= bit
+            self.col_masks[col] |= bit
+            self.box_masks[box] |= bit
+        self.board.cells[index] = num
+
+    '''
+    Fills the specified box with values
     For each position, generates a random digit which has not yet been used in the box
 
 	Parameters:
 	row_start and col_start are the starting indices of the box to check
-	i.e. the box is from (row_start, col_start) to (row_start+2, col_start+2)
+	i.e. the box is from (row_start, col_start) to (row_start+box_length-1, col_start+box_length-1)
 
 	Return: None
     '''
     def fill_box(self, row_start, col_start):
         box_dict = {}
-        for i in range(row_start, (row_start + 2 + 1)):
-            for j in range(col_start, (col_start + 2 + 1)):  # '+ 1' is to offset the range excluding last number
+        for i in range(row_start, row_start + self.box_length):
+            for j in range(col_start, col_start + self.box_length):
                 while self.board[i][j] == 0:  # keep retrying until cell successfully filled
-                    num = random.randint(1, 9)  # random number 1 - 9
+                    num = self.random.randint(1, self.row_length)  # random number 1 - row_length
                     if num in box_dict.values():  # skip lengthy checks if value already used
                         continue
                     if self.is_valid(i, j, num):  # check if valid
-                        self.board[i][j] = num  # if valid, set & end while loop
+                        self.set_value(i, j, num)  # if valid, set & end while loop
                         box_dict[num] = num  # save used values
 
     '''
-    Fills the three boxes along the main diagonal of the board
-    These are the boxes which start at (0,0), (3,3), and (6,6)
+    Fills the boxes along the main diagonal of the board
+    For a 9x9 board these are the boxes which start at (0,0), (3,3), and (6,6)
 
 	Parameters: None
 	Return: None
     '''
     def fill_diagonal(self):
-        self.fill_box(0, 0)
-        self.fill_box(3, 3)
-        self.fill_box(6, 6)
+        for start in range(0, self.row_length, self.box_length):
+            self.fill_box(start, start)
 
     '''
     DO NOT CHANGE
@@ -221,25 +329,55 @@ class SudokuGenerator:
                 if row >= self.row_length:
                     return True
         
-        for num in range(1, self.row_length + 1):
-            if self.is_valid(row, col, num):
-                self.board[row][col] = num
-                if self.fill_remaining(row, col + 1):
-                    return True
-                self.board[row][col] = 0
+        # walk only the free bits of the masks instead of calling is_valid for every num
+        box = self.box_index(row, col)
+        row_masks, col_masks, box_masks = self.row_masks, self.col_masks, self.box_masks
+        free = self.full_mask & ~(row_masks[row] | col_masks[col] | box_masks[box])
+        cells, index = self.board.cells, row * self.row_length + col
+        while free:
+            bit = free & -free  # lowest free num first, same order as counting up from 1
+            free ^= bit
+            row_masks[row] |= bit
+            col_masks[col] |= bit
+            box_masks[box] |= bit
+            cells[index] = bit.bit_length() - 1
+            if self.fill_remaining(row, col + 1):
+                return True
+            row_masks[row] ^= bit
+            col_masks[col] ^= bit
+            box_masks[box] ^= bit
+        cells[index] = 0
         return False
 
     '''
     DO NOT CHANGE
     Provided for students
     Constructs a solution by calling fill_diagonal and fill_remaining
+    Boards bigger than 9x9 are filled by fill_exact_cover instead
 
 	Parameters: None
-	Return: None
+	Return: None, raises RuntimeError if the diagonal boxes can't be completed (this happens on 4x4 boards)
     '''
     def fill_values(self):
+        if self.row_length > EXACT_COVER_SIZE:
+            self.fill_exact_cover()
+            return
         self.fill_diagonal()
-        self.fill_remaining(0, self.box_length)
+        if not self.fill_remaining(0, self.box_length):
+            raise RuntimeError(f"no {self.row_length}x{self.row_length} solution fits the diagonal boxes")
+
+    '''
+    Constructs a random solution with the Dancing Links solver (sudoku_dlx)
+    fill_remaining backtracks cell by cell in a fixed order, which never finishes on 16x16 or 25x25 boards
+
+	Parameters: None
+	Return: None
+    '''
+    def fill_exact_cover(self):
+        from sudoku_dlx import fill  # sudoku_dlx imports this module
+        solved = fill(self.row_length, self.random)
+        for index, num in enumerate(solved.cells):
+            self.set_value(index // self.row_length, index % self.row_length, num)
 
     '''
     Removes the appropriate number of cells from the board
@@ -254,234 +392,50 @@ class SudokuGenerator:
 	Return: None
     '''
     def remove_cells(self):
+        if self.unique:
+            self.remove_cells_unique()
+            return
         removed = 0  # counter variable
         while removed < self.removed_cells:  # run until correct number removed
-            row = random.randint(0, 8)  # offset by 1 because indexes
-            col = random.randint(0, 8)
+            row = self.random.randint(0, self.row_length - 1)  # offset by 1 because indexes
+            col = self.random.randint(0, self.row_length - 1)
             if self.board[row][col] != 0:  # check cell isn't already removed
-                self.board[row][col] = 0
+                self.set_value(row, col, 0)
                 removed += 1
+            else:
+                self.retries += 1
 
+    '''
+    Removes cells like remove_cells, but only where the puzzle keeps exactly one solution
+    Every cell is tried at most once, in a random order. Removing cells only ever adds solutions,
+    so a cell that can't be removed now can't be removed later either and is never retried.
+    If every cell has been tried before removed_cells is reached, fewer cells are removed.
+    Boards bigger than 9x9 are checked by sudoku_dlx with a search budget, and a check that runs out of
+    budget keeps the cell -- on sparse 25x25 boards a single check can otherwise take minutes.
 
-class Cell:
-
-    def __init__(self, value, row, col, dimensions, screen):
-        self.value = value
-        self.sketched_value = 0
-        self.user_placed = False
-        self.row = row
-        self.col = col
-        self.width, self.height = dimensions  # dimensions is a tuple (width, height)
-        self.screen = screen
-
-    # value = locked-in guess/unchangeable numbers
-    def set_cell_value(self, value):
-        self.value = value
-
-    # sketched value = user guess
-    def set_sketched_value(self, value):
-        self.sketched_value = value
-
-    # user placed means it's a solidified sketch value -- info not given to user initially
-    def set_user_placed(self):
-        self.user_placed = True
-
-    def draw(self):  # value --> cell.value, sketch --> cell.sketched_value
-        cell_font = pygame.font.Font(None, 60)
-        sketch_font = pygame.font.Font(None, 40)
-        cell_value_surface = cell_font.render(str(self.value), 0, VALUE_COLOR)
-        cell_placed_surface = cell_font.render(str(self.value), 0, PLACED_COLOR)
-        cell_sketch_surface = sketch_font.render(str(self.sketched_value), 0, SKETCH_COLOR)
-
-        # un-editable values -- black
-        if self.value != 0 and not self.user_placed:
-            cell_value_rectangle = cell_value_surface.get_rect(
-                center=(self.width // 18 + self.width * self.col // 9, self.width // 18 + self.width * self.row // 9))
-            screen.blit(cell_value_surface, cell_value_rectangle)
-
-        # user-placed values -- blue
-        elif self.value != 0 and self.user_placed:
-            cell_placed_rectangle = cell_placed_surface.get_rect(
-                center=(self.width // 18 + self.width * self.col // 9, self.width // 18 + self.width * self.row // 9))
-            screen.blit(cell_placed_surface, cell_placed_rectangle)
-
-        # sketched values -- gray & top left
-        elif self.sketched_value != 0:
-            cell_sketch_rectangle = cell_sketch_surface.get_rect(
-                center=(self.width // 36 + self.width * self.col // 9, self.width // 36 + self.width * self.row // 9))
-            screen.blit(cell_sketch_surface, cell_sketch_rectangle)
-
-
-class Board:
-
-    def __init__(self, width, height, screen, unsolved_board, solved_board):
-        self.width = width  # screen width
-        self.height = height  # screen height
-        self.screen = screen  # window from PyGame
-        self.selected_cell = None  # cell object of currently selected cell
-        self.unsolved_board = unsolved_board  # 2d array of integers, unsolved board    -- (used for resetting)
-        self.solved_board = solved_board  # 2d array of integers, solved board          -- (used to check win)
-        self.cell_array = []  # 2d array of cell objects, unsolved board                -- (used for actual game loop)
-        for row in range(0, len(unsolved_board)):  # generate 2d array of cells
-            self.cell_array.append([])
-            for col in range(0, len(unsolved_board)):
-                self.cell_array[row].append(Cell(
-                    unsolved_board[row][col],  # gets cell value from board
-                    row,
-                    col,
-                    (width, height),  # info for cell.draw()
-                    screen  # info for cell.draw()
-                ))
-
-    # draw all board components in order
-    def refresh_board(self):
-
-        # refresh game window info
-        pygame.draw.rect(self.screen, WHITE, (0, 0, WIDTH, WIDTH))
-        self.draw_selected()
-        self.draw()
-
-        # print info to console for debug purposes
-        print("\n" * 10)
-        print("GAME BOARD:")
-        print_array(current_game.get_integer_array())  # print current board to console -- debug
-        if current_game.selected_cell is not None:
-            print(f'Selected Cell: ({current_game.selected_cell.col}, {current_game.selected_cell.row})')
-        if current_game.selected_cell is None:
-            print("Selected Cell: (None)")
-
-    # draws board and all selected cells
-    def draw(self):
-        # draw horizontal lines
-        for i in range(1, BOARD_ROWS):
-            pygame.draw.line(self.screen, LINE_COLOR, (0, SQUARE_SIZE * i),
-                             (WIDTH, SQUARE_SIZE * i), LINE_WIDTH)
-        # draw vertical lines
-        for i in range(1, BOARD_COLS):
-            pygame.draw.line(self.screen, LINE_COLOR, (SQUARE_SIZE * i, 0),
-                             (SQUARE_SIZE * i, WIDTH), LINE_WIDTH)
-
-        # draw thicker horizontal lines
-        for i in range(0, BOARD_ROWS + 6, 3):
-            pygame.draw.line(self.screen, LINE_COLOR, (0, SQUARE_SIZE * i),
-                             (WIDTH, SQUARE_SIZE * i), LINE_WIDTH_2)
-
-
-        # draw thicker vertical lines
-        for i in range(0, BOARD_COLS + 3, 3):
-            pygame.draw.line(self.screen, LINE_COLOR, (SQUARE_SIZE * i, 0),
-                             (SQUARE_SIZE * i, WIDTH), LINE_WIDTH_2)
-
-        # draw cells
-        for i in range(BOARD_ROWS):
-            for j in range(BOARD_COLS):
-                self.cell_array[i][j].draw()
-
-    def draw_selected(self):
-        if self.selected_cell is not None:
-            # center the rectangles based on position (to account for line offset)
-            rect_center = (self.selected_cell.col * 67 - 2 - (self.selected_cell.col - 4),
-                           self.selected_cell.row * 67 - 2 - (self.selected_cell.row - 4))
-
-            # create more offsets to account for line cutting it off
-            # "up offset" means giving it one pixel of breathing room on top
-            top_offset = 0
-            bottom_offset = 0
-            left_offset = 0
-            right_offset = 0
-            if (self.selected_cell.row % 3)     == 0:  # cells on the top of boxes
-                top_offset = 1
-            if (self.selected_cell.row - 2) % 3 == 0:  # cells on the bottom of boxes
-                bottom_offset = 1
-            if (self.selected_cell.col) % 3     == 0:  # cells on the left of boxes
-                left_offset = 1
-                right_offset = 1
-            if (self.selected_cell.col - 2) % 3 == 0:  # cells on the right of boxes
-                right_offset = 1
-
-            # red background
-            pygame.draw.rect(self.screen, RED, (
-                rect_center[0], rect_center[1], 63, 63))
-
-            # white inner (to make it look like a border)
-            pygame.draw.rect(self.screen, WHITE, (
-                rect_center[0] + 3 + left_offset, rect_center[1] + 3 + top_offset,
-                56 - right_offset, 56 - bottom_offset))
-
-    # change currently selected cell
-    def select(self, row, col):
-        if (not (0 <= row <= 8)) or (not (0 <= col <= 8)):  # clear selected if invalid coords
-            self.selected_cell = None
-        else:
-            self.selected_cell = self.cell_array[row][col]
-            self.draw_selected()
-
-    # turn click coordinates into tuple of sudoku cell coordinates (either (row, col) or None)
-    def click(self, x, y):
-        if y <= WIDTH:
-            return y // (WIDTH // 9), x // (WIDTH // 9)
-        return None
-
-    # clear currently selected cell's values (if values entered by user)
-    def clear(self):  # clear selected
-        if self.selected_cell is not None:
-            if self.selected_cell.value == 0 or self.selected_cell.user_placed:
-                self.selected_cell.set_cell_value(0)
-                self.selected_cell.set_sketched_value(0)
-
-    # place a sketched value onto selected cell
-    def sketch(self, value):
-        if self.selected_cell is not None:
-            self.selected_cell.set_sketched_value(value)
-            self.selected_cell.set_user_placed()
-
-    # turn selected sketch into placed value
-    def place_number(self):
-        if self.selected_cell is not None:
-            if (self.selected_cell.sketched_value != 0) and (self.selected_cell.value == 0):  # check it can be placed
-                self.selected_cell.set_cell_value(self.selected_cell.sketched_value)
-                self.selected_cell.set_user_placed()
-
-    # takes keyboard intput of a number 1 - 9 and sketches it
-    def number_input(self, number):
-        if self.selected_cell.value == 0:  # check there's no value in cell already
-            self.sketch(number)
-
-    # reset board to initial (removed) puzzle state
-    def reset_to_original(self):
-        self.cell_array = []  # reset cell array
-        for row in range(0, 9):  # generate 2d array of cells using original board
-            self.cell_array.append([])
-            for col in range(0, 9):
-                self.cell_array[row].append(Cell(
-                    self.unsolved_board[row][col],  # gets cell value from board
-                    row,
-                    col,
-                    (self.width, self.height),  # info for cell.draw()
-                    self.screen  # info for cell.draw()
-                ))
-
-    # check if board is full or not
-    def is_full(self):  # returns boolean
-        for row in self.get_integer_array():
-            if 0 in row:
-                return False
-        return True
-
-    # check if board is solved
-    def check_board(self):
-        if self.get_integer_array() == self.solved_board:
-            return True
-        return False
-
-    # takes 2d cell array & returns values in integer array
-    def get_integer_array(self):
-        integer_array = []
-        for row in range(0, len(self.cell_array)):
-            integer_array.append([])
-            for col in range(0, len(self.cell_array[row])):
-                integer_array[row].append(self.cell_array[row][col].value)
-        return integer_array
+	Parameters: None
+	Return: None
+    '''
+    def remove_cells_unique(self):
+        check = has_solution_without
+        if self.row_length > EXACT_COVER_SIZE:
+            from sudoku_dlx import has_solution_without as exact_check
+            budget = self.row_length * self.row_length
+            check = lambda board, row, col, num: exact_check(board, row, col, num, budget)
+        cells = [(row, col) for row in range(self.row_length) for col in range(self.row_length)]
+        self.random.shuffle(cells)
+        removed = 0
+        for row, col in cells:
+            if removed >= self.removed_cells:
+                break
+            num = self.board[row][col]
+            self.set_value(row, col, 0)
+            # the full solution has num here, so any solution without it is a second one
+            if check(self.board, row, col, num):
+                self.set_value(row, col, num)  # no longer unique -- put it back
+                self.retries += 1
+            else:
+                removed += 1
 
 
 '''
@@ -491,425 +445,41 @@ Given a number of rows and number of cells to remove, this function:
 1. creates a SudokuGenerator
 2. fills its values and saves this as the solved state
 3. removes the appropriate number of cells
-4. returns the representative 2D Python Lists of the board and solution
+4. returns the board and solution as SudokuBoards (use them like 2D lists, or .to_list() for real ones)
 
 Parameters:
-size is the number of rows/columns of the board (9 for this project)
+size is the number of rows/columns of the board (9, 16 or 25)
 removed is the number of cells to clear (set to 0)
+unique is whether the puzzle must keep a single solution -- then fewer cells can be cleared when no more can
+go without a second solution (see SudokuGenerator.remove_cells_unique), count the zeros for the real number
+seed is None, an int or a random.Random (see SudokuGenerator) -- the same int always gives the same pair,
+which is what sudoku_id builds its puzzle IDs on
 
-Return: list[list] (a 2D Python list to represent the board)
+Return: tuple (board, solved_board)
 '''
 # changed this function to return a tuple of removed board and solved board
 # original code didn't seem to have any way to access the original solved board (for checking wins)
-def generate_sudoku(size, removed):
-    sudoku = SudokuGenerator(size, removed)
+def generate_sudoku(size, removed, unique=False, seed=None):
+    sudoku = SudokuGenerator(size, removed, unique, seed)
 
     sudoku.fill_values()
-    solved_board = copy.deepcopy(sudoku.get_board())
+    solved_board = sudoku.get_board().copy()
     sudoku.remove_cells()
     board = sudoku.get_board()
     return board, solved_board  # use tuple unpacking, i.e.:  board, solved_board = generate_sudoku(size, removed)
 
-def generate_game(width, height, screen, size, removed):
-    unsolved_board, solved_board = generate_sudoku(size, removed)
-    return Board(width, height, screen, unsolved_board, solved_board)
-
-def print_array(array):  # debug, prints 2d array
-    print("___" * len(array))
-    for row in array:
-        for cell in row:
-            print(cell, end="  ")
-        print("|")
-    print("___" * len(array), end="|\n")
-
-def init():
-    pygame.init()
-    pygame.display.set_caption("Sudoku")
-
-def welcome():
-    screen.fill(BG_COLOR)
-
-def draw_game_start(screen):
-    # initialize font
-    start_title_font = pygame.font.SysFont("Times New Roman", 60) # [3]
-    button_font = pygame.font.SysFont("Times New Roman", 40) # [3]
-    game_mode_font = pygame.font.SysFont("Times New Roman", 50) # [3]
-
-    # color background image
-    screen_display = pygame.display.set_mode((WIDTH, HEIGHT)) # [1]
-    image = pygame.image.load(BytesIO(BG_IMAGE_REQUEST.content)).convert() # [4]
-    image = pygame.transform.smoothscale(image, (WIDTH, HEIGHT)) # [2]
-    screen_display.blit(image, (0,0))
-    pygame.display.flip()
-
-    # initialize & draw title
-    title_surface = start_title_font.render("Welcome to Sudoku", 0, (0, 0, 0))
-    title_rectangle = title_surface.get_rect(
-        center=(WIDTH // 2, HEIGHT // 2 - 150))
-    screen.blit(title_surface, title_rectangle)
-
-    # initialize & draw game mode text
-    game_mode_surface = game_mode_font.render("Select Game Mode:", 0, (0, 0, 0))
-    game_mode_rectangle = title_surface.get_rect(
-        center=(WIDTH // 2 + 50, HEIGHT // 2 + 50))
-    screen.blit(game_mode_surface, game_mode_rectangle)
-
-    # initialize buttons ---
-    # initialize button text
-    easy_mode = button_font.render("Easy", 0, (255, 255, 255))
-    medium_mode = button_font.render("Medium", 0, (255, 255, 255))
-    hard_mode = button_font.render("Hard", 0, (255, 255, 255))
-
-    # initialize button background color and text
-    # easy mode
-    easy_surface = pygame.Surface((easy_mode.get_size()[0] + 20, easy_mode.get_size()[1] + 20))
-    easy_surface.fill((0, 204, 0))
-    easy_surface.blit(easy_mode, (10, 10))
-    # easy mode border
-    easy_surface_border = pygame.Surface((easy_mode.get_size()[0] + 30, easy_mode.get_size()[1] + 30))
-    easy_surface_border.fill((0, 102, 0))
-    easy_surface_border.blit(easy_mode, (10, 10))
-    # medium mode
-    medium_surface = pygame.Surface((medium_mode.get_size()[0] + 20, medium_mode.get_size()[1] + 20))
-    medium_surface.fill((229, 202, 33))
-    medium_surface.blit(medium_mode, (10, 10))
-    # medium mode border
-    medium_surface_border = pygame.Surface((easy_mode.get_size()[0] + 90, easy_mode.get_size()[1] + 30))
-    medium_surface_border.fill((210, 156, 30))
-    medium_surface_border.blit(medium_mode, (10, 10))
-    # hard mode
-    hard_surface = pygame.Surface((hard_mode.get_size()[0] + 20, hard_mode.get_size()[1] + 20))
-    hard_surface.fill((204, 0, 0))
-    hard_surface.blit(hard_mode, (10, 10))
-    # hard mode border
-    hard_surface_border = pygame.Surface((easy_mode.get_size()[0] + 32, easy_mode.get_size()[1] + 30))
-    hard_surface_border.fill((120, 0, 0))
-    hard_surface_border.blit(hard_mode, (10, 10))
-
-    # initialize button rectangle
-    easy_rectangle = easy_surface.get_rect(
-        center=(WIDTH // 2 - 150, HEIGHT // 2 + 150))
-    easy_rectangle_border = easy_surface.get_rect(
-        center=(WIDTH // 2 - 155, HEIGHT // 2 + 145))
-    medium_rectangle = medium_surface.get_rect(
-        center=(WIDTH // 2, HEIGHT // 2 + 150))
-    medium_rectangle_border = easy_surface.get_rect(
-        center=(WIDTH // 2 - 35, HEIGHT // 2 + 145))
-    hard_rectangle = hard_surface.get_rect(
-        center=(WIDTH // 2 + 150, HEIGHT // 2 + 150))
-    hard_rectangle_border = easy_surface.get_rect(
-        center=(WIDTH // 2 + 144, HEIGHT // 2 + 145))
-
-    # draw buttons
-    screen.blit(easy_surface_border, easy_rectangle_border)
-    screen.blit(easy_surface, easy_rectangle)
-    screen.blit(medium_surface_border, medium_rectangle_border)
-    screen.blit(medium_surface, medium_rectangle)
-    screen.blit(hard_surface_border, hard_rectangle_border)
-    screen.blit(hard_surface, hard_rectangle)
-
-    # action loop
-    while True:
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                sys.exit()
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if easy_rectangle.collidepoint(event.pos):  # check if mouse on easy button
-                    init()  # reinitialize start screen
-                    welcome()
-                    return generate_game(WIDTH, HEIGHT, screen, 9, 30)  # generate new easy board
-                elif medium_rectangle.collidepoint(event.pos):  # check if mouse on medium button
-                    init()  # reinitialize start screen
-                    welcome()
-                    return generate_game(WIDTH, HEIGHT, screen, 9, 40)  # generate new medium board
-                elif hard_rectangle.collidepoint(event.pos):  # check if mouse on hard button
-                    init()  # reinitialize start screen
-                    welcome()
-                    return generate_game(WIDTH, HEIGHT, screen, 9, 50)  # generate new hard board
-
-        pygame.display.update()
-
-def draw_sudoku_buttons(screen):
-    # draws button games during sudoku
-
-    # initialize font
-    exit_font = pygame.font.SysFont("Times New Roman", 40) # [3]
-    restart_font = pygame.font.SysFont("Times New Roman", 40) # [3]
-    reset_font = pygame.font.SysFont("Times New Roman", 40) # [3]
-
-    # initialize & draw exit button
-    exit_surface = exit_font.render("Exit", 0, (0, 0, 0))
-    exit_rectangle = exit_surface.get_rect(
-        center=(WIDTH // 2, HEIGHT // 2 - 1000))
-    screen.blit(exit_surface, exit_rectangle)
-
-    # initialize & draw restart button
-    restart_surface = restart_font.render("Restart", 0, (0, 0, 0))
-    restart_rectangle = restart_surface.get_rect(
-        center=(WIDTH // 2, HEIGHT // 2 - 1000))
-    screen.blit(restart_surface, restart_rectangle)
-
-    # initialize & draw reset button
-    reset_surface = reset_font.render("Reset", 0, (0, 0, 0))
-    reset_rectangle = reset_surface.get_rect(
-        center=(WIDTH // 2, HEIGHT // 2 - 1000))
-    screen.blit(reset_surface, reset_rectangle)
-
-    # initialize text first
-    exit_mode = exit_font.render("Exit", 0, (255, 255, 255))
-    restart_mode = restart_font.render("Restart", 0, (255, 255, 255))
-    reset_mode = restart_font.render("Reset", 0, (255, 255, 255))
-
-    # initialize button background color and text
-    # exit
-    exit_surface = pygame.Surface((exit_mode.get_size()[0] + 20, exit_mode.get_size()[1] + 20))
-    exit_surface.fill((0, 0, 0))
-    exit_surface.blit(exit_mode, (10, 10))
-    # restart
-    restart_surface = pygame.Surface((restart_mode.get_size()[0] + 20, restart_mode.get_size()[1] + 20))
-    restart_surface.fill((0, 0, 0))
-    restart_surface.blit(restart_mode, (10, 10))
-    # reset
-    reset_surface = pygame.Surface((reset_mode.get_size()[0] + 20, reset_mode.get_size()[1] + 20))
-    reset_surface.fill((0, 0, 0))
-    reset_surface.blit(reset_mode, (10, 10))
-
-    # initialize button rectangle
-    exit_rectangle = exit_surface.get_rect(
-        center=(WIDTH // 2 + 150, HEIGHT // 2 + 300))
-    restart_rectangle = restart_surface.get_rect(
-        center=(WIDTH // 2, HEIGHT // 2 + 300))
-    reset_rectangle = reset_surface.get_rect(
-        center=(WIDTH // 2 - 150, HEIGHT // 2 + 300))
-
-    # draw buttons
-    screen.blit(exit_surface, exit_rectangle)
-    screen.blit(restart_surface, restart_rectangle)
-    screen.blit(reset_surface, reset_rectangle)
-
-    # check for button presses
-    try:
-        if restart_rectangle.collidepoint(event.pos):  # check if mouse is on restart button
-            #return draw_game_start(screen)
-            return "restart"
-        elif reset_rectangle.collidepoint(event.pos):  # check if mouse is on reset button
-            #return board, solved_board
-            return "reset"
-        elif exit_rectangle.collidepoint(event.pos):
-            return "exit"
-        pygame.display.update()
-    except:
-        return None
-
-def draw_game_over(screen):
-
-    # initialize font & background color
-    game_over_font = pygame.font.SysFont("Times New Roman", 50) # [3]
-    screen.fill(BG_COLOR)
-
-    # color background image
-    screen_display = pygame.display.set_mode((WIDTH, HEIGHT)) # [1]
-    image = pygame.image.load(BytesIO(BG_IMAGE_REQUEST.content)).convert() # [4]
-    image = pygame.transform.smoothscale(image, (WIDTH, HEIGHT)) # [2]
-    screen_display.blit(image, (0,0))
-    pygame.display.flip()
-
-    if game_won:
-        # game won
-
-        # initialize & draw win text
-        game_won_surf = game_over_font.render("Game Won!", 0, (0, 0, 0))
-        game_won_rect = game_won_surf.get_rect(
-            center=(WIDTH // 2, HEIGHT // 2 - 100))
-        screen.blit(game_won_surf, game_won_rect)
-
-        # initialize & draw exit button
-        exit_surface = game_over_font.render("Exit", 0, (0, 0, 0))
-        exit_rectangle = exit_surface.get_rect(
-            center=(WIDTH // 2, HEIGHT // 2 - 500))
-        screen.blit(exit_surface, exit_rectangle)
-
-        # initialize buttons ---
-        # initialize button text
-        exit_mode = game_over_font.render("Exit", 0, (255, 255, 255))
-
-        # initialize exit button color & text
-        exit_surface = pygame.Surface((exit_mode.get_size()[0] + 20, exit_mode.get_size()[1] + 20))
-        exit_surface.fill((0, 0, 0))
-        exit_surface.blit(exit_mode, (10, 10))
-
-        # initialize button rectangle
-        exit_rectangle = exit_surface.get_rect(
-            center=(WIDTH // 2, HEIGHT // 2 + 100))
-
-        # draw button
-        screen.blit(exit_surface, exit_rectangle)
-
-        # action loop
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    sys.exit()
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if exit_rectangle.collidepoint(event.pos):
-                        # Checks if mouse is on exit button
-                        sys.exit()
-
-            pygame.display.update()
-
-    else:
-        # game over
-
-        game_over_surf = game_over_font.render("Game Over :(", 0, (0, 0, 0))
-        game_over_rect = game_over_surf.get_rect(
-            center=(WIDTH // 2, HEIGHT // 2 - 100))
-        screen.blit(game_over_surf, game_over_rect)
-
-        # initialize & draw restart button
-        restart_surface = game_over_font.render("Restart", 0, (0, 0, 0))
-        restart_rectangle = restart_surface.get_rect(
-            center=(WIDTH // 2, HEIGHT // 2 - 500))
-        screen.blit(restart_surface, restart_rectangle)
-
-        # initialize button ---
-        # initialize button text
-        restart_mode = game_over_font.render("Restart", 0, (255, 255, 255))
-
-        # initialize button background color & text
-        restart_surface = pygame.Surface((restart_mode.get_size()[0] + 20, restart_mode.get_size()[1] + 20))
-        restart_surface.fill((0, 0, 0))
-        restart_surface.blit(restart_mode, (10, 10))
-
-        # initialize button rectangle
-        restart_rectangle = restart_surface.get_rect(
-            center=(WIDTH // 2, HEIGHT // 2 + 100))
-
-        # draw button
-        screen.blit(restart_surface, restart_rectangle)
-
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    sys.exit()
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if restart_rectangle.collidepoint(event.pos):  # checks if mouse is on restart button
-                        draw_game_start(screen)  # reload game
-                        return
-            pygame.display.update()
-
 # main
 if __name__ == '__main__':
-    game_over = False
-    game_won = False
-    menu_button_press = None
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-
-    # initialize welcome screen
-    init()
-    welcome()
-
-    # generate first game instance based on start screen (easy/med/hard)
-    current_game = draw_game_start(screen)
-    current_game.refresh_board()  # draw sudoku values initially
-
-    # core gameplay loop
-    while True:
-
-        # execute each user input (clicking, keystrokes, etc.)
-        for event in pygame.event.get():
-
-            # draw menu buttons
-            draw_sudoku_buttons(screen)
-
-            # exiting game using X
-            if event.type == pygame.QUIT:
-                sys.exit()
-
-            # click actions
-            if event.type == pygame.MOUSEBUTTONDOWN and not game_over:
-                # select clicked cell
-                if current_game.click(event.pos[0], event.pos[1]) is not None:  # if clicked cell, set as selected
-                    selected_row, selected_col = current_game.click(event.pos[0], event.pos[1])
-                    current_game.select(selected_row, selected_col)
-
-                elif current_game.click(event.pos[0], event.pos[1]) is None:  # if not, clear selected
-                    current_game.select(-1, -1)
-
-                current_game.refresh_board()
-
-                # check if clicked menu buttons
-                menu_button_press = draw_sudoku_buttons(screen)
-                if menu_button_press == "restart":
-                    current_game = draw_game_start(screen)  # generate fresh game instance (restart)
-                    current_game.refresh_board()
-                elif menu_button_press == "reset":
-                    current_game.reset_to_original()  # reset board to unsolved state
-                    current_game.refresh_board()
-                elif menu_button_press == "exit":
-                    sys.exit()
-
-
-
-            # keyboard actions
-            if event.type == pygame.KEYDOWN:
-                if current_game.selected_cell is not None:  # check a cell is selected
-
-                    # clearing cells
-                    if event.key == pygame.K_BACKSPACE and current_game.selected_cell.user_placed:
-                        current_game.clear()
-
-                    # solidfying sketched guesses
-                    elif event.key == pygame.K_RETURN:
-                        current_game.place_number()
-
-                    # sketching selected cell
-                    match event.key:  # check if button is keys 1 - 9 -- sketch value
-                        case pygame.K_1:
-                            current_game.number_input(1)
-                        case pygame.K_2:
-                            current_game.number_input(2)
-                        case pygame.K_3:
-                            current_game.number_input(3)
-                        case pygame.K_4:
-                            current_game.number_input(4)
-                        case pygame.K_5:
-                            current_game.number_input(5)
-                        case pygame.K_6:
-                            current_game.number_input(6)
-                        case pygame.K_7:
-                            current_game.number_input(7)
-                        case pygame.K_8:
-                            current_game.number_input(8)
-                        case pygame.K_9:
-                            current_game.number_input(9)
-
-                    # arrow key movements
-                    match event.key:
-                        case pygame.K_UP:
-                            if current_game.selected_cell.row > 0:
-                                current_game.select(current_game.selected_cell.row - 1, current_game.selected_cell.col)
-                        case pygame.K_DOWN:
-                            if current_game.selected_cell.row < 8:
-                                current_game.select(current_game.selected_cell.row + 1, current_game.selected_cell.col)
-                        case pygame.K_LEFT:
-                            if current_game.selected_cell.col > 0:
-                                current_game.select(current_game.selected_cell.row, current_game.selected_cell.col - 1)
-                        case pygame.K_RIGHT:
-                            if current_game.selected_cell.col < 8:
-                                current_game.select(current_game.selected_cell.row, current_game.selected_cell.col + 1)
-
-                current_game.refresh_board()  # update sudoku values on screen
-                if current_game.is_full():  # check if board is full (game over)
-                    game_over = True
-                    game_won = current_game.check_board()  # boolean
-
-        # game is over
-        if game_over:
-            draw_game_over(screen)
-            pygame.display.update()
-            current_game = draw_game_start(screen)
-            current_game.refresh_board()
-            game_over = False
-
-        pygame.display.update()
+    # headless batch mode -- python -m sudoku_generator batch --count N ...
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        import sudoku_batch
+        sys.exit(sudoku_batch.main(sys.argv[2:]))
+
+    # puzzle service -- python -m sudoku_generator serve --port 8000 ...
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        import sudoku_server
+        sys.exit(sudoku_server.main(sys.argv[2:]))
+
+    # anything else starts the game -- pygame is only imported by the UI module
+    import runpy
+    runpy.run_module("sudoku", run_name="__main__")
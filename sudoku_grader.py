@@ -0,0 +1,299 @@
+from collections import namedtuple
+from itertools import combinations
+from sudoku_generator import SudokuGenerator
+from sudoku_solver import board_layout
+
+"""
+Grades puzzles by the human solving techniques they need, not by how many cells are empty
+
+The grader solves the puzzle the way a person would: it always uses the easiest technique that makes
+progress, and starts again from the easiest one after every step. A technique that has to be used often
+adds a lot to the score; a harder technique adds more per use. If the ladder runs out, the puzzle needs
+guessing (trial and error).
+
+Each step finds every use of a technique on the current candidates first and only then applies them all
+(see commit), so the result doesn't depend on scan order -- a relabelled, permuted or transposed copy of a
+puzzle (sudoku_transform) gets exactly the same Grade.
+"""
+
+# the technique ladder, easiest first -- a Grade's hardest field is an index into this tuple
+TECHNIQUES = ("hidden single", "naked single", "locked candidates", "naked pair", "hidden pair",
+              "naked triple", "hidden triple", "x-wing", "guess")
+TECHNIQUE_COSTS = (1, 2, 6, 10, 14, 20, 26, 32, 100)  # score added every time a technique is used
+GUESS = TECHNIQUES.index("guess")
+
+# difficulty name -> (easiest, hardest) technique index the hardest step of a puzzle must fall between
+BANDS = {
+    "easy": (0, 0),     # hidden singles only
+    "medium": (1, 2),   # needs naked singles or locked candidates
+    "hard": (3, 7),     # needs subsets or an x-wing
+    "expert": (8, 8),   # can't be done without guessing
+}
+BAND_REMOVED = {"easy": 40, "medium": 50, "hard": 60, "expert": 64}  # cells removed per candidate puzzle
+
+'''
+score is the total cost of every step taken
+hardest is the index in TECHNIQUES of the hardest technique that was needed (-1 if nothing was needed)
+solved is False if grading stopped early (see grade's max_level) or the givens contradict each other
+'''
+Grade = namedtuple("Grade", ["score", "hardest", "solved"])
+
+
+class _GradingState:
+
+    # grid is a 2D board (SudokuBoard or list of lists)
+    def __init__(self, grid):
+        self.size = len(grid)
+        self.units, self.peers = board_layout(self.size)
+        self.full = ((1 << self.size) - 1) << 1
+        cells = getattr(grid, "cells", None)
+        if cells is None:
+            cells = [num for row in grid for num in row]
+        self.values = [0] * (self.size * self.size)
+        self.cands = [self.full] * (self.size * self.size)
+        self.unsolved = self.size * self.size
+        self.contradiction = False
+        self.placements = {}  # cell -> num found by the current step, applied by commit
+        self.eliminations = {}  # cell -> mask of nums to remove found by the current step, applied by commit
+        for i, num in enumerate(cells):
+            if num:
+                self.place(i, num)
+        n = self.size
+        self.rows, self.cols, self.boxes = self.units[:n], self.units[n:2 * n], self.units[2 * n:]
+        box_length = int(n ** 0.5)
+        self.box_of = [(i // n // box_length) * box_length + (i % n) // box_length for i in range(n * n)]
+
+    def place(self, i, num):
+        bit = 1 << num
+        if not self.cands[i] & bit:  # a peer already took num
+            self.contradiction = True
+        self.values[i] = num
+        self.cands[i] = bit
+        self.unsolved -= 1
+        for p in self.peers[i]:
+            self.cands[p] &= ~bit
+
+    # queues num for cell i (applied by commit)
+    def propose(self, i, num):
+        if self.placements.setdefault(i, num) != num:  # two different nums forced into one cell
+            self.contradiction = True
+
+    # queues removing the nums in mask from cell i (applied by commit), True if that removes anything
+    def eliminate(self, i, mask):
+        if self.values[i] == 0 and self.cands[i] & mask:
+            self.eliminations[i] = self.eliminations.get(i, 0) | mask
+            return True
+        return False
+
+    # applies everything the last step found
+    def commit(self):
+        for i, mask in self.eliminations.items():
+            self.cands[i] &= ~mask
+        for i, num in self.placements.items():
+            if self.values[i] == 0:
+                self.place(i, num)
+        self.eliminations.clear()
+        self.placements.clear()
+
+    # a cell with no candidates left means the givens contradict each other
+    def broken(self):
+        return self.contradiction or any(self.values[i] == 0 and not mask for i, mask in enumerate(self.cands))
+
+    # each technique only looks at the current candidates and queues what it finds (see commit)
+    # it returns how many times it could be applied (0 = no progress)
+
+    def hidden_single(self):
+        for unit in self.units:
+            once = twice = placed = 0
+            for i in unit:
+                mask = self.cands[i]
+                if self.values[i]:
+                    placed |= mask
+                else:
+                    twice |= once & mask
+                    once |= mask
+            singles = once & ~twice & ~placed
+            while singles:
+                bit = singles & -singles
+                singles ^= bit
+                for i in unit:
+                    if self.values[i] == 0 and self.cands[i] & bit:
+                        self.propose(i, bit.bit_length() - 1)
+                        break
+        return len(self.placements)  # a cell that is a hidden single in two units counts once
+
+    def naked_single(self):
+        for i, mask in enumerate(self.cands):
+            if self.values[i] == 0 and mask and not mask & (mask - 1):
+                self.propose(i, mask.bit_length() - 1)
+        return len(self.placements)
+
+    # pointing (box -> line) and claiming (line -> box)
+    def locked_candidates(self):
+        count = 0
+        n = self.size
+        for box in self.boxes:
+            for num in range(1, n + 1):
+                bit = 1 << num
+                where = [i for i in box if self.values[i] == 0 and self.cands[i] & bit]
+                if len(where) < 2:
+                    continue
+                for line_of, lines in ((lambda i: i // n, self.rows), (lambda i: i % n, self.cols)):
+                    line = line_of(where[0])
+                    if all(line_of(i) == line for i in where):
+                        changed = False
+                        for i in lines[line]:
+                            if i not in where and self.eliminate(i, bit):
+                                changed = True
+                        count += changed
+        for line in self.rows + self.cols:
+            for num in range(1, n + 1):
+                bit = 1 << num
+                where = [i for i in line if self.values[i] == 0 and self.cands[i] & bit]
+                if len(where) < 2:
+                    continue
+                box = self.box_of[where[0]]
+                if all(self.box_of[i] == box for i in where):
+                    changed = False
+                    for i in self.boxes[box]:
+                        if i not in where and self.eliminate(i, bit):
+                            changed = True
+                    count += changed
+        return count
+
+    # k cells in a unit that only hold k nums between them -- those nums can go nowhere else in the unit
+    def naked_subset(self, k):
+        count = 0
+        for unit in self.units:
+            open_cells = [i for i in unit if self.values[i] == 0]
+            small = [i for i in open_cells if 2 <= self.cands[i].bit_count() <= k]
+            for group in combinations(small, k):
+                union = 0
+                for i in group:
+                    union |= self.cands[i]
+                if union.bit_count() != k:
+                    continue
+                changed = False
+                for i in open_cells:
+                    if i not in group and self.eliminate(i, union):
+                        changed = True
+                count += changed
+        return count
+
+    # k nums that only fit in the same k cells of a unit -- those cells can't hold anything else
+    def hidden_subset(self, k):
+        count = 0
+        for unit in self.units:
+            open_cells = [i for i in unit if self.values[i] == 0]
+            open_nums = 0
+            for i in open_cells:
+                open_nums |= self.cands[i]
+            nums = [num for num in range(1, self.size + 1) if open_nums & (1 << num)]
+            if len(nums) <= k:
+                continue
+            for group in combinations(nums, k):
+                mask = 0
+                for num in group:
+                    mask |= 1 << num
+                where = [i for i in open_cells if self.cands[i] & mask]
+                if len(where) != k:
+                    continue
+                changed = False
+                for i in where:
+                    if self.eliminate(i, ~mask & self.full):
+                        changed = True
+                count += changed
+        return count
+
+    def x_wing(self):
+        count = 0
+        n = self.size
+        for lines, other_of in ((self.rows, lambda i: i % n), (self.cols, lambda i: i // n)):
+            crosses = self.cols if lines is self.rows else self.rows
+            for num in range(1, n + 1):
+                bit = 1 << num
+                pairs = {}  # (other line a, other line b) -> lines where num only fits in those two spots
+                for index, line in enumerate(lines):
+                    where = [other_of(i) for i in line if self.values[i] == 0 and self.cands[i] & bit]
+                    if len(where) == 2:
+                        pairs.setdefault(tuple(where), []).append(index)
+                for spots, found in pairs.items():
+                    if len(found) < 2:
+                        continue
+                    changed = False
+                    for spot in spots:
+                        for i in crosses[spot]:
+                            line = i // n if lines is self.rows else i % n
+                            if line not in found[:2] and self.eliminate(i, bit):
+                                changed = True
+                    count += changed
+        return count
+
+    # the ladder in TECHNIQUES order (without guess)
+    def ladder(self):
+        return (self.hidden_single, self.naked_single, self.locked_candidates,
+                lambda: self.naked_subset(2), lambda: self.hidden_subset(2),
+                lambda: self.naked_subset(3), lambda: self.hidden_subset(3), self.x_wing)
+
+
+'''
+Grades a puzzle by the techniques needed to solve it
+
+Parameters:
+grid is a 2D board (SudokuBoard or list of lists, 0 = empty), it is not modified
+max_level is the index of the hardest technique worth trying -- once something harder is needed, grading
+stops right away (solved=False, hardest set to max_level + 1), which lets generators reject early
+
+Return: Grade
+'''
+def grade(grid, max_level=GUESS):
+    state = _GradingState(grid)
+    techniques = state.ladder()
+    score = 0
+    hardest = -1
+    while state.unsolved:
+        for level, technique in enumerate(techniques):
+            if level > max_level:
+                return Grade(score, level, False)
+            used = technique()
+            state.commit()
+            if used:
+                score += used * TECHNIQUE_COSTS[level]
+                hardest = max(hardest, level)
+                break
+        else:  # nothing on the ladder helps
+            if state.broken() or max_level < GUESS:
+                return Grade(score, GUESS, False)
+            return Grade(score + TECHNIQUE_COSTS[GUESS], GUESS, True)
+        if state.broken():
+            return Grade(score, hardest, False)
+    return Grade(score, hardest, True)
+
+
+'''
+Generates a unique puzzle whose grade falls inside a difficulty band
+Candidates are graded with max_level set to the top of the band, so ones that are too hard are dropped
+as soon as that's clear instead of being graded to the end.
+
+Parameters:
+band is a key of BANDS ("easy", "medium", "hard", "expert")
+removed is the number of cells removed per candidate (default BAND_REMOVED[band])
+size is the number of rows/columns of the board
+max_attempts is the number of candidates to try before giving up
+
+Return: tuple (board, solved_board, grade)
+'''
+def generate_graded(band, removed=None, size=9, max_attempts=500):
+    lowest, highest = BANDS[band]
+    if removed is None:
+        removed = BAND_REMOVED[band]
+    for _ in range(max_attempts):
+        sudoku = SudokuGenerator(size, removed, unique=True)
+        sudoku.fill_values()
+        solved_board = sudoku.get_board().copy()
+        sudoku.remove_cells()
+        board = sudoku.get_board()
+        result = grade(board, highest)
+        if result.solved and lowest <= result.hardest <= highest:
+            return board, solved_board, result
+    raise RuntimeError(f"no {band} puzzle found in {max_attempts} attempts")
@@ -0,0 +1,90 @@
+from array import array
+
+"""
+Undo/redo history for a game board
+
+Every move changes one cell, so a move is stored as one packed 32 bit delta: the cell index plus the
+cell's (value, sketched value, user placed) before and after. The deltas live in a ring buffer that is
+allocated once with room for capacity moves; when it is full the oldest move is dropped, so a long
+session never uses more memory than that.
+
+bits  0-9    cell index (boards up to 25x25)
+bits 10-14   old value          bits 15-19   new value
+bits 20-24   old sketched value bits 25-29   new sketched value
+bit  30      old user placed    bit  31      new user placed
+"""
+
+INDEX_BITS = 10
+VALUE_BITS = 5
+VALUE_MASK = (1 << VALUE_BITS) - 1
+DEFAULT_CAPACITY = 1000  # moves kept
+
+
+'''
+Packs one move into an int
+
+Parameters:
+index is the cell's position (row * size + col)
+old and new are (value, sketched_value, user_placed) tuples for the cell before and after the move
+
+Return: int (fits in 32 bits)
+'''
+def pack(index, old, new):
+    delta = index
+    delta |= old[0] << 10 | new[0] << 15
+    delta |= old[1] << 20 | new[1] << 25
+    delta |= bool(old[2]) << 30 | bool(new[2]) << 31
+    return delta
+
+
+# the reverse of pack: (index, old, new)
+def unpack(delta):
+    index = delta & ((1 << INDEX_BITS) - 1)
+    old = (delta >> 10 & VALUE_MASK, delta >> 20 & VALUE_MASK, bool(delta >> 30 & 1))
+    new = (delta >> 15 & VALUE_MASK, delta >> 25 & VALUE_MASK, bool(delta >> 31 & 1))
+    return index, old, new
+
+
+class History:
+
+    # capacity is the number of moves kept, older ones are forgotten
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.deltas = array("I", bytes(4 * capacity))  # the ring buffer, allocated once
+        self.start = 0  # slot of the oldest move kept
+        self.cursor = 0  # moves that can be undone; moves past it (up to end) can be redone
+        self.end = 0  # moves recorded
+
+    # number of moves that can be undone
+    def __len__(self):
+        return self.cursor
+
+    # records a packed move (see pack) -- anything that could be redone is dropped
+    def record(self, delta):
+        self.deltas[(self.start + self.cursor) % self.capacity] = delta
+        if self.cursor == self.capacity:  # full, forget the oldest move
+            self.start = (self.start + 1) % self.capacity
+        else:
+            self.cursor += 1
+        self.end = self.cursor
+
+    # steps back one move and returns it (packed), or None if there is nothing to undo
+    def undo(self):
+        if self.cursor == 0:
+            return None
+        self.cursor -= 1
+        return self.deltas[(self.start + self.cursor) % self.capacity]
+
+    # steps forward one undone move and returns it (packed), or None if there is nothing to redo
+    def redo(self):
+        if self.cursor == self.end:
+            return None
+        delta = self.deltas[(self.start + self.cursor) % self.capacity]
+        self.cursor += 1
+        return delta
+
+    # forgets every move (the buffer itself is kept)
+    def clear(self):
+        self.start = self.cursor = self.end = 0
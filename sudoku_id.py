@@ -0,0 +1,104 @@
+import random
+from collections import namedtuple
+from sudoku_generator import DIFFICULTIES_BY_SIZE, generate_sudoku
+
+"""
+Compact puzzle IDs: everything generate_sudoku needs to rebuild a puzzle exactly, in 17 characters
+
+An ID packs the board size (9, 16 or 25 -- the sizes in DIFFICULTIES_BY_SIZE), the number of removed cells,
+the unique flag and a 64 bit seed. Generation is deterministic for a given seed, so any process can turn an
+ID back into the same puzzle/solution pair -- store or send the ID instead of the grid, cache by it, or hand
+out disjoint seeds to workers without them having to talk to each other.
+
+ID_VERSION is part of every ID and has to go up whenever a change to the generator makes the same seed
+produce a different board, so old IDs are rejected instead of silently meaning another puzzle.
+"""
+
+ID_VERSION = 1
+ALPHABET = "0123456789abcdefghjkmnpqrstvwxyz"  # base 32 without i, l, o, u (easy to read out and type)
+ID_LENGTH = 17  # 85 bits of fields, 5 bits per character
+
+'''
+size is the number of rows/columns of the board
+removed is the number of cells to clear (unique puzzles can end up with fewer, see generate_sudoku)
+unique is whether the puzzle has a single solution
+seed is the 64 bit seed passed to generate_sudoku
+'''
+PuzzleSpec = namedtuple("PuzzleSpec", ["size", "removed", "unique", "seed"])
+
+
+'''
+Builds the ID of a puzzle
+
+Parameters:
+size is the number of rows/columns of the board (9, 16 or 25)
+removed is the number of cells to clear
+unique is whether the puzzle must keep a single solution
+seed is a 64 bit int, or None for a random one
+
+Return: str
+'''
+def make_id(size, removed, unique=True, seed=None):
+    if size not in DIFFICULTIES_BY_SIZE:
+        raise ValueError(f"unsupported board size {size}")
+    box_length = int(size ** 0.5)
+    if not 0 <= removed <= size * size:
+        raise ValueError(f"can't remove {removed} cells from a {size}x{size} board")
+    if seed is None:
+        seed = random.getrandbits(64)
+    if not 0 <= seed < 1 << 64:
+        raise ValueError("seed must fit in 64 bits")
+    value = (((seed << 1 | bool(unique)) << 13 | removed) << 3 | (box_length - 2)) << 4 | ID_VERSION
+    chars = []
+    for _ in range(ID_LENGTH):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+'''
+Reads an ID made by make_id
+
+Parameters:
+puzzle_id is the ID (case doesn't matter)
+
+Return: PuzzleSpec -- raises ValueError for malformed IDs or IDs from another ID_VERSION
+'''
+def parse_id(puzzle_id):
+    text = puzzle_id.strip().lower()
+    if len(text) != ID_LENGTH or any(c not in ALPHABET for c in text):
+        raise ValueError(f"not a puzzle ID: {puzzle_id!r}")
+    value = 0
+    for c in text:
+        value = value * 32 + ALPHABET.index(c)
+    version = value & 0xF
+    if version != ID_VERSION:
+        raise ValueError(f"puzzle ID {puzzle_id!r} is from generator version {version}, not {ID_VERSION}")
+    box_length = (value >> 4 & 0x7) + 2
+    removed = value >> 7 & 0x1FFF
+    unique = bool(value >> 20 & 1)
+    seed = value >> 21
+    size = box_length * box_length
+    if size not in DIFFICULTIES_BY_SIZE or removed > size * size:
+        raise ValueError(f"not a puzzle ID: {puzzle_id!r}")
+    return PuzzleSpec(size, removed, unique, seed)
+
+
+# rebuilds the (board, solved_board) pair an ID stands for
+def generate_from_id(puzzle_id):
+    spec = parse_id(puzzle_id)
+    return generate_sudoku(spec.size, spec.removed, spec.unique, spec.seed)
+
+
+'''
+Generates a new puzzle along with its ID
+
+Parameters:
+size, removed and unique are passed on to generate_sudoku
+rng is the random.Random (or the random module) to draw the seed from
+
+Return: tuple (puzzle_id, board, solved_board)
+'''
+def new_puzzle(size, removed, unique=True, rng=random):
+    puzzle_id = make_id(size, removed, unique, rng.getrandbits(64))
+    return (puzzle_id,) + generate_from_id(puzzle_id)
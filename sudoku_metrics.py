@@ -0,0 +1,276 @@
+import atexit, cProfile, functools, json, os, pstats, threading, time
+from collections import Counter, deque
+
+"""
+Opt-in instrumentation: counters, timers and a cProfile switch for the hot paths
+
+Nothing is measured until enable() is called. enable() swaps timing/counting wrappers in for the
+instrumented methods and disable() puts the originals back, so the code paths are untouched while
+instrumentation is off -- there isn't even a flag check in fill_remaining or Cell.draw.
+
+What is recorded:
+counters  fill_remaining.calls (one per candidate tried, the search walks the free bits of the masks and
+          never calls is_valid), fill_remaining.backtracks, remove_cells.retries (cells picked but not
+          removed, see SudokuGenerator.retries), plus "<name>.calls" for every instrumented method
+maxima    fill_remaining.depth (deepest recursion seen)
+timers    fill_values, remove_cells, plus anything passed to instrument() or observe() -- the game adds
+          Cell.draw, Board.refresh_board and event_loop (time to handle one batch of events)
+
+Counts from several threads are approximate (updates aren't locked).
+
+Export with snapshot() / start_snapshots() (one JSON object per line, appended every interval seconds),
+or profile everything with profile_start() / profile_stop().
+
+The game turns this on with environment variables:
+SUDOKU_METRICS=metrics.jsonl      enable and append a snapshot every SUDOKU_METRICS_INTERVAL seconds (default 10)
+SUDOKU_PROFILE=game.prof          run under cProfile from the start (F9 toggles it in game either way)
+"""
+
+TIMER_SAMPLES = 1024  # recent samples kept per timer for percentiles
+
+enabled = False
+counters = Counter()
+maxima = {}
+timers = {}  # name -> _Timer
+
+_installed = []  # (owner, attribute, original) for everything enable()/instrument() replaced
+_local = threading.local()  # per-thread fill_remaining recursion depth
+_snapshot_thread = None
+_snapshot_stop = threading.Event()
+_profiler = None
+
+
+class _Timer:
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=TIMER_SAMPLES)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.recent.append(seconds)
+
+    def summary(self):
+        ordered = sorted(self.recent)
+        pick = lambda p: ordered[min(len(ordered) - 1, int(p * len(ordered)))] if ordered else 0.0
+        return {"count": self.count, "total": self.total, "mean": self.total / self.count if self.count else 0.0,
+                "max": self.max, "p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99)}
+
+
+# adds n to a counter
+def count(name, n=1):
+    counters[name] += n
+
+
+# records one timing in seconds
+def observe(name, seconds):
+    timer = timers.get(name)
+    if timer is None:
+        timer = timers[name] = _Timer()
+    timer.add(seconds)
+
+
+# keeps the largest value seen for name
+def peak(name, value):
+    if value > maxima.get(name, value - 1):
+        maxima[name] = value
+
+
+# clears everything recorded so far
+def reset():
+    counters.clear()
+    maxima.clear()
+    timers.clear()
+
+
+'''
+Wraps a method so every call is counted (kind "counter") or counted and timed (kind "timer")
+Only takes effect while instrumentation is enabled; disable() removes it again.
+
+Parameters:
+owner is the class (or module) the method lives on
+attribute is the method name
+name is what to record it as (default "<Owner>.<attribute>")
+kind is "timer" or "counter"
+
+Return: None
+'''
+def instrument(owner, attribute, name=None, kind="timer"):
+    if not enabled:
+        return
+    name = name or f"{owner.__name__}.{attribute}"
+    original = owner.__dict__[attribute]
+    calls = name + ".calls"
+    if kind == "counter":
+        def wrapper(*args, **kwargs):
+            counters[calls] += 1
+            return original(*args, **kwargs)
+    else:
+        def wrapper(*args, **kwargs):
+            counters[calls] += 1
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+    setattr(owner, attribute, functools.wraps(original)(wrapper))
+    _installed.append((owner, attribute, original))
+
+
+# fill_remaining: recursion depth and backtracks (a call that returns False undoes its guess)
+def _instrument_fill_remaining(generator_class):
+    original = generator_class.__dict__["fill_remaining"]
+
+    def fill_remaining(self, row, col):
+        depth = getattr(_local, "depth", 0) + 1
+        _local.depth = depth
+        counters["fill_remaining.calls"] += 1
+        peak("fill_remaining.depth", depth)
+        try:
+            solved = original(self, row, col)
+        finally:
+            _local.depth = depth - 1
+        if not solved:
+            counters["fill_remaining.backtracks"] += 1
+        return solved
+
+    generator_class.fill_remaining = functools.wraps(original)(fill_remaining)
+    _installed.append((generator_class, "fill_remaining", original))
+
+
+# remove_cells: timed, plus the retries it needed
+def _instrument_remove_cells(generator_class):
+    original = generator_class.__dict__["remove_cells"]
+
+    def remove_cells(self):
+        before = self.retries
+        counters["remove_cells.calls"] += 1
+        start = time.perf_counter()
+        try:
+            return original(self)
+        finally:
+            observe("remove_cells", time.perf_counter() - start)
+            counters["remove_cells.retries"] += self.retries - before
+
+    generator_class.remove_cells = functools.wraps(original)(remove_cells)
+    _installed.append((generator_class, "remove_cells", original))
+
+
+# turns instrumentation on for the generator (UI classes are added by the game with instrument())
+def enable():
+    global enabled
+    if enabled:
+        return
+    enabled = True
+    from sudoku_generator import SudokuGenerator
+    _instrument_fill_remaining(SudokuGenerator)
+    instrument(SudokuGenerator, "fill_values", "fill_values")
+    _instrument_remove_cells(SudokuGenerator)
+
+
+# turns instrumentation off and restores every original method (recorded values are kept)
+def disable():
+    global enabled
+    enabled = False
+    while _installed:
+        owner, attribute, original = _installed.pop()
+        setattr(owner, attribute, original)
+
+
+# everything recorded so far as a JSON-ready dict
+def snapshot():
+    return {
+        "time": time.time(),
+        "counters": dict(counters),
+        "maxima": dict(maxima),
+        "timers": {name: timer.summary() for name, timer in list(timers.items())},
+    }
+
+
+'''
+Appends a snapshot to path every interval seconds (and once more on stop_snapshots)
+
+Parameters:
+path is the file to append JSON lines to
+interval is the number of seconds between snapshots
+
+Return: None
+'''
+def start_snapshots(path, interval=10.0):
+    global _snapshot_thread
+    if _snapshot_thread is not None:
+        return
+    _snapshot_stop.clear()
+
+    def write():
+        with open(path, "a") as out:
+            out.write(json.dumps(snapshot()) + "\n")
+
+    def loop():
+        while not _snapshot_stop.wait(interval):
+            write()
+        write()
+
+    _snapshot_thread = threading.Thread(target=loop, name="metrics-snapshots", daemon=True)
+    _snapshot_thread.start()
+    atexit.register(stop_snapshots)  # the last snapshot still gets written when the game exits
+
+
+def stop_snapshots():
+    global _snapshot_thread
+    if _snapshot_thread is not None:
+        _snapshot_stop.set()
+        _snapshot_thread.join()
+        _snapshot_thread = None
+
+
+# starts profiling the calling thread with cProfile
+def profile_start():
+    global _profiler
+    if _profiler is None:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+
+'''
+Stops profiling
+
+Parameters:
+path is a file to dump the stats to (for pstats / snakeviz), or None
+
+Return: pstats.Stats, or None if the profiler wasn't running
+'''
+def profile_stop(path=None):
+    global _profiler
+    if _profiler is None:
+        return None
+    profiler, _profiler = _profiler, None
+    profiler.disable()
+    if path:
+        profiler.dump_stats(path)
+    return pstats.Stats(profiler)
+
+
+# starts or stops profiling, True if it is running afterwards
+def profile_toggle(path=None):
+    if _profiler is None:
+        profile_start()
+        return True
+    profile_stop(path)
+    return False
+
+
+# sets things up from SUDOKU_METRICS / SUDOKU_PROFILE (see the module notes)
+def configure_from_env(environ=os.environ):
+    path = environ.get("SUDOKU_METRICS")
+    if path:
+        enable()
+        start_snapshots(path, float(environ.get("SUDOKU_METRICS_INTERVAL", 10)))
+    if environ.get("SUDOKU_PROFILE"):
+        profile_start()
+        atexit.register(lambda: profile_stop(environ["SUDOKU_PROFILE"]))
@@ -0,0 +1,227 @@
+import math
+from sudoku_generator import SudokuBoard
+from sudoku_solver import solve
+
+try:
+    import numpy as np
+except ImportError as error:  # optional dependency, nothing else in the project needs it
+    raise ImportError("sudoku_numpy needs numpy (pip install numpy)") from error
+
+"""
+Bulk checking and solving for batches of boards held in one NumPy array
+
+Every function takes an integer array of shape (N, size, size) -- 0 = empty -- and works on all N boards
+at once with array operations instead of a Python loop per board. Big batches are cut into chunks of
+CHUNK boards so the temporary (N, size, size, size) arrays stay a few tens of MB.
+
+validate / is_solved     row, column and box constraints
+candidate_masks          bit num set = num can still go in the cell (the sudoku_solver representation)
+propagate                naked and hidden singles, repeated until nothing changes
+solve_batch              propagate, then sudoku_solver.solve for just the boards that are still open
+audit                    stored puzzle/solution pairs: valid, complete and agreeing, without solving anything
+"""
+
+CHUNK = 16384  # boards handled per step
+
+
+# turns puzzle strings (SudokuBoard.to_string / batch output) into an (N, size, size) uint8 array
+def from_strings(strings):
+    strings = list(strings)
+    if not strings:
+        return np.zeros((0, 9, 9), np.uint8)
+    size = math.isqrt(len(strings[0]))
+    cells = [SudokuBoard.from_string(text).cells for text in strings] if size > 9 else \
+        [text.encode("ascii") for text in strings]
+    data = b"".join(cells)
+    if len(data) != len(strings) * size * size:
+        raise ValueError(f"puzzle strings must all be {size * size} characters long")
+    grids = np.frombuffer(data, np.uint8).reshape(len(strings), size, size)
+    grids = grids - ord("0") if size <= 9 else grids.copy()  # symbols below "0" wrap past size here
+    _check_range(grids, size)
+    return grids
+
+
+# raises ValueError for cells outside 0..size, before they can be cast (and wrap) to uint8
+def _check_range(grids, size):
+    if grids.size and (grids.min() < 0 or grids.max() > size):
+        bad = grids[(grids < 0) | (grids > size)].flat[0]
+        raise ValueError(f"cell value {bad} is outside 0..{size}")
+
+
+def _as_grids(grids):
+    grids = np.asarray(grids)
+    if grids.ndim != 3 or grids.shape[1] != grids.shape[2]:
+        raise ValueError(f"expected an (N, size, size) array, got shape {grids.shape}")
+    size = grids.shape[1]
+    box = math.isqrt(size)
+    if box * box != size:
+        raise ValueError(f"board size {size} is not a perfect square")
+    _check_range(grids, size)
+    return grids.astype(np.uint8, copy=False), size, box
+
+
+# (N, size, size) -> (N, size, size) with the boxes laid out as rows
+def _boxes(grids, box):
+    n, size = grids.shape[0], grids.shape[1]
+    return grids.reshape(n, box, box, box, box).transpose(0, 1, 3, 2, 4).reshape(n, size, size)
+
+
+# True for boards with no repeated num in a row, column or box (and nothing outside 0..size)
+def _valid_chunk(grids, size, box):
+    units = np.concatenate((grids, grids.transpose(0, 2, 1), _boxes(grids, box)), axis=1)
+    ordered = np.sort(units, axis=2)
+    repeated = ((ordered[:, :, 1:] == ordered[:, :, :-1]) & (ordered[:, :, 1:] > 0)).any(axis=(1, 2))
+    return ~repeated & (grids <= size).all(axis=(1, 2))
+
+
+# (N, size, size, size) bool: [board, row, col, num - 1] is True if num can go in the (empty) cell
+def _candidate_planes(grids, size, box):
+    n = grids.shape[0]
+    placed = grids[..., None] == np.arange(1, size + 1, dtype=np.uint8)
+    in_row = placed.any(axis=2)[:, :, None, :]
+    in_col = placed.any(axis=1)[:, None, :, :]
+    in_box = placed.reshape(n, box, box, box, box, size).any(axis=(2, 4))
+    in_box = np.broadcast_to(in_box[:, :, None, :, None, :], (n, box, box, box, box, size)).reshape(n, size, size, size)
+    return ~(in_row | in_col | in_box) & (grids == 0)[..., None]
+
+
+def _chunks(count):
+    for start in range(0, count, CHUNK):
+        yield slice(start, min(start + CHUNK, count))
+
+
+'''
+Checks the row, column and box constraints of every board
+
+Parameters:
+grids is an integer array of shape (N, size, size), 0 = empty
+
+Return: bool array of shape (N,) -- empty cells are fine, repeated nums (or values past size) are not
+'''
+def validate(grids):
+    grids, size, box = _as_grids(grids)
+    valid = np.empty(len(grids), bool)
+    for part in _chunks(len(grids)):
+        valid[part] = _valid_chunk(grids[part], size, box)
+    return valid
+
+
+# bool array of shape (N,): True for boards that are completely and correctly filled
+def is_solved(grids):
+    grids, _, _ = _as_grids(grids)
+    return validate(grids) & (grids > 0).all(axis=(1, 2))
+
+
+'''
+Candidate bitmasks of every cell
+
+Parameters:
+grids is an integer array of shape (N, size, size), 0 = empty
+
+Return: int64 array of shape (N, size, size), bit num set if num can go in the cell (0 for filled cells)
+'''
+def candidate_masks(grids):
+    grids, size, box = _as_grids(grids)
+    weights = np.left_shift(np.int64(1), np.arange(1, size + 1, dtype=np.int64))
+    masks = np.empty(grids.shape, np.int64)
+    for part in _chunks(len(grids)):
+        masks[part] = _candidate_planes(grids[part], size, box) @ weights
+    return masks
+
+
+# singles propagation for one chunk, see propagate
+def _propagate_chunk(grids, size, box):
+    grids = grids.copy()
+    broken = ~_valid_chunk(grids, size, box)
+    active = np.flatnonzero(~broken)  # boards still changing
+    while active.size:
+        sub = grids[active]
+        n = len(sub)
+        planes = _candidate_planes(sub, size, box)
+        counts = planes.sum(axis=3)
+        empty = sub == 0
+        dead = (empty & (counts == 0)).any(axis=(1, 2))  # a cell nothing fits in
+
+        # naked singles: a cell with one candidate left
+        naked = empty & (counts == 1)
+        assign = np.where(naked, planes.argmax(axis=3) + 1, 0).astype(np.uint8)
+
+        # hidden singles: a num with one possible cell left in a row, column or box
+        once = (planes.sum(axis=2, keepdims=True) == 1) | (planes.sum(axis=1, keepdims=True) == 1)
+        in_box = planes.reshape(n, box, box, box, box, size).sum(axis=(2, 4)) == 1
+        once = once | np.broadcast_to(in_box[:, :, None, :, None, :],
+                                      (n, box, box, box, box, size)).reshape(n, size, size, size)
+        hidden = planes & once
+        hidden_counts = hidden.sum(axis=3)
+        hidden_num = (hidden.argmax(axis=3) + 1).astype(np.uint8)
+        clash = (hidden_counts > 1) | (naked & (hidden_counts == 1) & (hidden_num != assign))
+        assign = np.where(hidden_counts == 1, hidden_num, assign)
+
+        changed = (assign > 0).any(axis=(1, 2))
+        sub = np.where(assign > 0, assign, sub)
+        bad = dead | clash.any(axis=(1, 2)) | ~_valid_chunk(sub, size, box)  # e.g. one num placed twice in a unit
+        grids[active] = sub
+        broken[active[bad]] = True
+        active = active[changed & ~bad]
+    return grids, broken
+
+
+'''
+Fills every cell that naked and hidden singles force, on all boards at once, until nothing changes
+
+Parameters:
+grids is an integer array of shape (N, size, size), 0 = empty, it is not modified
+
+Return: tuple (grids, broken)
+grids is a new uint8 array with the forced cells filled in
+broken is a bool array of shape (N,), True for boards shown to have no solution (their grid is left as far
+as propagation got)
+'''
+def propagate(grids):
+    grids, size, box = _as_grids(grids)
+    out = np.empty_like(grids)
+    broken = np.empty(len(grids), bool)
+    for part in _chunks(len(grids)):
+        out[part], broken[part] = _propagate_chunk(grids[part], size, box)
+    return out, broken
+
+
+'''
+Solves every board: vectorized propagation first, then sudoku_solver.solve only for the boards it leaves open
+
+Parameters:
+grids is an integer array of shape (N, size, size), 0 = empty, it is not modified
+
+Return: tuple (solutions, solved, searched)
+solutions is a uint8 array of shape (N, size, size) (the propagated grid where there is no solution)
+solved is a bool array of shape (N,)
+searched is the number of boards that needed the per-board search
+'''
+def solve_batch(grids):
+    solutions, broken = propagate(grids)
+    solved = ~broken & (solutions > 0).all(axis=(1, 2))
+    open_boards = np.flatnonzero(~broken & ~solved)
+    for i in open_boards:
+        solution = solve(solutions[i].tolist())
+        if solution is not None:
+            solutions[i] = solution
+            solved[i] = True
+    return solutions, solved, len(open_boards)
+
+
+'''
+Checks stored puzzle/solution pairs without solving anything
+
+Parameters:
+puzzles and solutions are integer arrays of shape (N, size, size)
+
+Return: bool array of shape (N,), True where the puzzle is valid, the solution is complete and valid and
+agrees with every given of the puzzle
+'''
+def audit(puzzles, solutions):
+    puzzles, _, _ = _as_grids(puzzles)
+    solutions, _, _ = _as_grids(solutions)
+    if puzzles.shape != solutions.shape:
+        raise ValueError("puzzles and solutions must have the same shape")
+    agrees = ((puzzles == 0) | (puzzles == solutions)).all(axis=(1, 2))
+    return agrees & validate(puzzles) & is_solved(solutions)
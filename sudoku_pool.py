@@ -0,0 +1,116 @@
+import threading
+from collections import deque
+from sudoku_generator import generate_sudoku
+from sudoku_transform import CANONICAL_SIZE
+
+"""
+Pool of pre-generated puzzles, one queue per difficulty (number of removed cells)
+
+A background thread keeps every queue topped up, so taking a puzzle is just a pop.
+Refilling starts once a queue drops below low_watermark and stops when it holds capacity puzzles.
+With a dedup index, puzzles equivalent to one handed out before (in any session) are never pooled.
+"""
+
+
+class PuzzlePool:
+
+    '''
+    Parameters:
+    difficulties is an iterable of removed-cell counts to keep puzzles for, e.g. (30, 40, 50)
+    capacity is the number of puzzles kept ready per difficulty
+    low_watermark is the queue length below which the background thread starts refilling
+    size is the number of rows/columns of the board
+    unique is whether pooled puzzles must have a single solution
+    dedup is a sudoku_dedup.DedupIndex to check puzzles against (and record them in), or None -- 9x9 boards only
+
+    Return: None
+    '''
+    def __init__(self, difficulties, capacity=5, low_watermark=2, size=9, unique=True, dedup=None):
+        if not 1 <= low_watermark <= capacity:
+            raise ValueError("need 1 <= low_watermark <= capacity")
+        if dedup is not None and size != CANONICAL_SIZE:
+            raise ValueError(f"dedup only works for {CANONICAL_SIZE}x{CANONICAL_SIZE} boards")
+        self.capacity = capacity
+        self.low_watermark = low_watermark
+        self.size = size
+        self.unique = unique
+        self.dedup = dedup
+        self.dedup_lock = threading.Lock()  # the refill thread and take's fallback can both generate
+        self.queues = {removed: deque() for removed in difficulties}
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+
+    # start the background refill thread (daemon, so it never blocks interpreter exit)
+    def start(self):
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self._refill_loop, name="puzzle-pool", daemon=True)
+        self.thread.start()
+
+    # stop the refill thread and wait for it to finish the puzzle it is working on
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    '''
+    Takes a ready puzzle for the given difficulty
+    If none is ready (or the difficulty isn't pooled) one is generated on the calling thread
+
+    Parameters:
+    removed is the number of cells removed from the puzzle
+
+    Return: tuple (board, solved_board)
+    '''
+    def take(self, removed):
+        with self.condition:
+            queue = self.queues.get(removed)
+            puzzle = queue.popleft() if queue else None
+            if queue is not None and len(queue) < self.low_watermark:
+                self.condition.notify_all()  # wake the refill thread
+        if puzzle is None:
+            puzzle = self._generate(removed)
+        return puzzle
+
+    # generates a puzzle that isn't in the dedup index yet (and records it)
+    def _generate(self, removed):
+        while True:
+            puzzle = generate_sudoku(self.size, removed, self.unique)
+            if self.dedup is None:
+                return puzzle
+            with self.dedup_lock:
+                if self.dedup.add_puzzle(puzzle[0]):
+                    return puzzle
+
+    # number of ready puzzles for a difficulty
+    def ready(self, removed):
+        with self.condition:
+            return len(self.queues.get(removed, ()))
+
+    # the difficulty that most needs a puzzle, or None if nothing is below the low watermark
+    # once a queue has started refilling it keeps going up to capacity
+    def _next_to_fill(self, filling):
+        if filling is not None and len(self.queues[filling]) < self.capacity:
+            return filling
+        lowest = min(self.queues, key=lambda removed: len(self.queues[removed]), default=None)
+        if lowest is not None and len(self.queues[lowest]) < self.low_watermark:
+            return lowest
+        return None
+
+    def _refill_loop(self):
+        filling = None
+        while True:
+            with self.condition:
+                while self.running and (filling := self._next_to_fill(filling)) is None:
+                    self.condition.wait()
+                if not self.running:
+                    return
+            puzzle = self._generate(filling)  # outside the lock
+            with self.condition:
+                self.queues[filling].append(puzzle)
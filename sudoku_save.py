@@ -0,0 +1,165 @@
+import os, struct, threading, zlib
+from collections import namedtuple
+from sudoku_generator import SudokuBoard
+
+"""
+Saving and restoring a game in progress
+
+A save is one small binary file -- 351 bytes for a 9x9 game -- so writing it is a single write and reading
+it back is a single read plus a few slices:
+
+header    magic "SUDOKUSV", version u16, board size u16, crc32 of everything after the header u32
+body      puzzle, solution, current values and sketched values at one byte per cell,
+          then a bit per cell for user_placed (cell i = bit i of a little endian integer)
+
+Saves are written to a temp file and renamed over the old one (after an fsync), so a crash or power cut
+leaves either the old save or the new one, never half of one. Autosaver does the writing on a background
+thread so the game loop only pays for building the bytes.
+"""
+
+MAGIC = b"SUDOKUSV"
+VERSION = 1
+HEADER = struct.Struct("<8sHHI")
+_DISCARD = object()  # Autosaver.pending: delete the save instead of writing one
+
+'''
+puzzle, solution and values are SudokuBoards
+sketches is bytes, the sketched value of every cell (row by row, 0 = none)
+placed is a list of bools, user_placed of every cell (row by row)
+'''
+SavedGame = namedtuple("SavedGame", ["puzzle", "solution", "values", "sketches", "placed"])
+
+
+'''
+Serializes a game
+
+Parameters:
+board is a sudoku_game.GameBoard (or the pygame sudoku.Board built on it)
+
+Return: bytes
+'''
+def dumps(board):
+    size = board.values.size
+    cells = [cell for row in board.cell_array for cell in row]
+    placed = 0
+    for i, cell in enumerate(cells):
+        if cell.user_placed:
+            placed |= 1 << i
+    body = b"".join((board.unsolved_board.cells, board.solved_board.cells, board.values.cells,
+                     bytes([cell.sketched_value for cell in cells]),
+                     placed.to_bytes((size * size + 7) // 8, "little")))
+    return HEADER.pack(MAGIC, VERSION, size, zlib.crc32(body)) + body
+
+
+'''
+Reads a game back from dumps output
+
+Parameters:
+data is bytes
+
+Return: SavedGame, raises ValueError if data isn't a complete, undamaged save
+'''
+def loads(data):
+    if len(data) < HEADER.size:
+        raise ValueError("not a sudoku save (too short)")
+    magic, version, size, crc = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a sudoku save")
+    if version != VERSION:
+        raise ValueError(f"unsupported save version {version}")
+    cells = size * size
+    body = memoryview(data)[HEADER.size:]
+    if len(body) != 4 * cells + (cells + 7) // 8 or zlib.crc32(body) != crc:
+        raise ValueError("damaged sudoku save")
+    boards = [SudokuBoard(size, bytearray(body[i * cells:(i + 1) * cells])) for i in range(3)]
+    bits = int.from_bytes(body[4 * cells:], "little")
+    return SavedGame(*boards, bytes(body[3 * cells:4 * cells]), [bool(bits >> i & 1) for i in range(cells)])
+
+
+# writes data to path atomically (temp file, fsync, rename), creating the directory if needed
+def write_atomic(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as out:
+        out.write(data)
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp, path)
+
+
+# saves a board to path (atomically, see write_atomic)
+def save(board, path):
+    write_atomic(path, dumps(board))
+
+
+# reads a save from path -- OSError if it can't be read, ValueError if it isn't a valid save
+def load(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+class Autosaver:
+
+    '''
+    Writes saves on a background thread -- submit only hands over the bytes
+    Saves submitted while a write is in progress are coalesced: only the newest one is written next.
+
+    Parameters:
+    path is the save file
+
+    Return: None
+    '''
+    def __init__(self, path):
+        self.path = path
+        self.pending = None  # newest bytes not written yet, or _DISCARD
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+
+    # start the writer thread (daemon; stop() writes whatever is still pending)
+    def start(self):
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self._write_loop, name="autosave", daemon=True)
+        self.thread.start()
+
+    # queue a save of board -- the bytes are built here so later moves can't change what gets written
+    def submit(self, board):
+        data = dumps(board)
+        with self.condition:
+            self.pending = data
+            self.condition.notify()
+
+    # queue deleting the save (the game is over, nothing to resume)
+    def discard(self):
+        with self.condition:
+            self.pending = _DISCARD
+            self.condition.notify()
+
+    # write anything still pending and stop the thread
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def _write_loop(self):
+        while True:
+            with self.condition:
+                while self.running and self.pending is None:
+                    self.condition.wait()
+                data, self.pending = self.pending, None
+                if data is None:  # stopped with nothing left to write
+                    return
+            try:
+                if data is _DISCARD:
+                    os.remove(self.path)
+                else:
+                    write_atomic(self.path, data)
+            except OSError:
+                pass  # a missing save or a read-only directory just means no resume next time
+
@@ -0,0 +1,362 @@
+import argparse, asyncio, json, logging, os, random, signal, sys
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+from sudoku_generator import DIFFICULTIES_BY_SIZE, SYMBOLS, SudokuBoard
+from sudoku_id import generate_from_id, make_id, parse_id
+
+"""
+Puzzle service: a small HTTP/JSON server on localhost, standard library only
+
+GET  /puzzle?difficulty=easy|medium|hard   {"id": ..., "difficulty": ..., "size": 9, "removed": 40, "puzzle": "<81 chars>"}
+POST /verify  {"id": ..., "solution": "<81 chars>" or a 2D list}   {"id": ..., "complete": bool, "correct": bool}
+GET  /stats                                 ready puzzles per difficulty and request / generation counters
+
+Puzzles use the SudokuBoard.to_string format (0 = empty, values past 9 are letters) and are identified by
+their sudoku_id ID. The solution of every puzzle handed out is kept (the newest SOLUTIONS_KEPT of them);
+an older or unknown ID is regenerated from the ID itself, so verifying never depends on server memory.
+
+Generation runs in a process pool and never on the event loop. Every difficulty keeps a warm cache of
+ready puzzles, so most requests are answered straight from memory. Requests that find the cache empty
+wait for the next batch: requests arriving within coalesce_window of each other are collected and
+generated together in batches of up to batch_size per worker task, instead of one task per request.
+
+Run with:
+python -m sudoku_generator serve [--port 8000] [--size 9] [--workers N]
+"""
+
+LEVELS = ("easy", "medium", "hard")  # names for DIFFICULTIES_BY_SIZE[size], in order
+CACHE_CAPACITY = 32  # ready puzzles kept per difficulty
+CACHE_LOW_WATERMARK = 16  # start generating more once fewer than this many are ready (or being generated)
+BATCH_SIZE = 8  # most puzzles generated by one worker task
+COALESCE_WINDOW = 0.002  # seconds to collect requests before generating for them
+SOLUTIONS_KEPT = 100000  # solutions remembered for /verify, older ones are regenerated from the ID
+MAX_BODY = 64 * 1024  # largest request body accepted
+logger = logging.getLogger("sudoku.server")
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+
+
+# worker side: generates one puzzle per seed, returned as (id, puzzle string, solution string)
+def _generate_batch(size, removed, seeds):
+    batch = []
+    for seed in seeds:
+        puzzle_id = make_id(size, removed, True, seed)
+        board, solved_board = generate_from_id(puzzle_id)
+        batch.append((puzzle_id, board.to_string(), solved_board.to_string()))
+    return batch
+
+
+# worker side: the solution string an ID stands for
+def _solution_for(puzzle_id):
+    return generate_from_id(puzzle_id)[1].to_string()
+
+
+class _Supply:
+
+    # ready puzzles and waiting requests for one difficulty
+    def __init__(self, level, removed):
+        self.level = level
+        self.removed = removed
+        self.ready = deque()  # (id, puzzle string)
+        self.waiters = deque()  # futures of requests that found ready empty, oldest first
+        self.in_flight = 0  # puzzles being generated right now
+        self.scheduled = False  # a _dispatch is already queued
+
+
+class PuzzleServer:
+
+    '''
+    Parameters:
+    size is the number of rows/columns of the boards served (9, 16 or 25)
+    workers is the number of generator processes (default: one per core)
+    capacity is the number of ready puzzles kept per difficulty
+    low_watermark is the number of ready puzzles below which more are generated
+    batch_size is the most puzzles one worker task generates
+    coalesce_window is how long (seconds) to collect waiting requests before generating for them
+    seed makes the puzzles served reproducible (None for random ones)
+
+    Return: None
+    '''
+    def __init__(self, size=9, workers=None, capacity=CACHE_CAPACITY, low_watermark=CACHE_LOW_WATERMARK,
+                 batch_size=BATCH_SIZE, coalesce_window=COALESCE_WINDOW, seed=None):
+        if not 1 <= low_watermark <= capacity:
+            raise ValueError("need 1 <= low_watermark <= capacity")
+        self.size = size
+        self.workers = workers or os.cpu_count() or 1
+        self.capacity = capacity
+        self.low_watermark = low_watermark
+        self.batch_size = batch_size
+        self.coalesce_window = coalesce_window
+        self.rng = random.Random(seed)  # seeds for every generated puzzle
+        self.supplies = {level: _Supply(level, removed) for level, removed in zip(LEVELS, DIFFICULTIES_BY_SIZE[size])}
+        self.solutions = OrderedDict()  # id -> solution string, newest last
+        self.stats = {"requests": 0, "served": 0, "cache_hits": 0, "generated": 0, "batches": 0, "verified": 0}
+        self.executor = None
+        self.server = None
+        self.loop = None
+
+    # starts the worker processes, warms every cache and starts listening (localhost only by default)
+    async def start(self, host="127.0.0.1", port=8000):
+        self.loop = asyncio.get_running_loop()
+        self.executor = ProcessPoolExecutor(self.workers)
+        for supply in self.supplies.values():
+            self._dispatch(supply)
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server
+
+    # the (host, port) the server listens on
+    def address(self):
+        return self.server.sockets[0].getsockname()[:2]
+
+    # stops listening and shuts the worker processes down (waits for a generation in progress to finish)
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+    # number of ready puzzles for every difficulty
+    def ready(self):
+        return {level: len(supply.ready) for level, supply in self.supplies.items()}
+
+    '''
+    Takes a puzzle of a difficulty, from the cache if one is ready, otherwise from the next batch generated
+
+    Parameters:
+    level is one of LEVELS
+
+    Return: tuple (id, puzzle string)
+    '''
+    async def take(self, level):
+        supply = self.supplies[level]
+        if supply.ready:
+            self.stats["cache_hits"] += 1
+            puzzle = supply.ready.popleft()
+            self._refill(supply)
+            return puzzle
+        waiter = self.loop.create_future()
+        supply.waiters.append(waiter)
+        self._schedule(supply)
+        return await waiter
+
+    # generate more once the cache runs low
+    def _refill(self, supply):
+        if len(supply.ready) + supply.in_flight < self.low_watermark:
+            self._schedule(supply)
+
+    # queue a _dispatch, collecting everything that arrives within coalesce_window into it
+    def _schedule(self, supply):
+        if not supply.scheduled:
+            supply.scheduled = True
+            self.loop.call_later(self.coalesce_window, self._dispatch, supply)
+
+    # hands the worker pool enough batches for every waiting request plus a full cache
+    def _dispatch(self, supply):
+        supply.scheduled = False
+        wanted = len(supply.waiters) + self.capacity - len(supply.ready) - supply.in_flight
+        while wanted > 0:
+            count = min(wanted, self.batch_size)
+            seeds = [self.rng.getrandbits(64) for _ in range(count)]
+            future = self.loop.run_in_executor(self.executor, _generate_batch, self.size, supply.removed, seeds)
+            future.add_done_callback(lambda done, count=count: self._delivered(supply, count, done))
+            supply.in_flight += count
+            self.stats["batches"] += 1
+            wanted -= count
+
+    # a batch is back: waiting requests first, the rest goes into the cache
+    def _delivered(self, supply, count, done):
+        supply.in_flight -= count
+        if done.cancelled():
+            return
+        if done.exception() is not None:
+            logger.error("generating %s puzzles failed: %r", supply.level, done.exception())
+            for _ in range(min(count, len(supply.waiters))):
+                waiter = supply.waiters.popleft()
+                if not waiter.done():
+                    waiter.set_exception(done.exception())
+            return
+        for puzzle_id, puzzle, solution in done.result():
+            self.stats["generated"] += 1
+            self.remember(puzzle_id, solution)
+            while supply.waiters and supply.waiters[0].done():  # the client went away
+                supply.waiters.popleft()
+            if supply.waiters:
+                supply.waiters.popleft().set_result((puzzle_id, puzzle))
+            else:
+                supply.ready.append((puzzle_id, puzzle))
+        if supply.waiters and len(supply.waiters) > supply.in_flight:
+            self._schedule(supply)
+        self._refill(supply)
+
+    # keeps a solution for /verify, forgetting the oldest past SOLUTIONS_KEPT
+    def remember(self, puzzle_id, solution):
+        self.solutions[puzzle_id] = solution
+        if len(self.solutions) > SOLUTIONS_KEPT:
+            self.solutions.popitem(last=False)
+
+    '''
+    Checks a submitted solution against the stored one
+
+    Parameters:
+    puzzle_id is the ID the puzzle was served with
+    solution is the filled board as a string (SudokuBoard.to_string) or a 2D list
+
+    Return: dict with "complete" (no empty cells) and "correct" (matches the solution) -- raises ValueError
+    for malformed IDs or boards, and for IDs of puzzles this server doesn't hand out (another size or
+    difficulty), so a request can never make a worker generate a board the server wasn't started for
+    '''
+    async def verify(self, puzzle_id, solution):
+        if not isinstance(puzzle_id, str):
+            raise ValueError("id must be a string")
+        spec = parse_id(puzzle_id)
+        size = self.size
+        if spec.size != size or not spec.unique or spec.removed not in {s.removed for s in self.supplies.values()}:
+            raise ValueError(f"{puzzle_id} is not a puzzle served here")
+        if isinstance(solution, str):
+            if len(solution) != size * size:
+                raise ValueError(f"expected {size * size} cells")
+            if not set(solution.upper()) <= set(SYMBOLS[:size + 1]):
+                raise ValueError(f"cells must be one of {SYMBOLS[:size + 1]}")
+            board = SudokuBoard.from_string(solution)
+        else:
+            if len(solution) != size or any(len(row) != size for row in solution):
+                raise ValueError(f"expected a {size}x{size} board")
+            board = SudokuBoard.from_grid(solution)
+            if max(board.cells) > size:
+                raise ValueError(f"cells must be 0-{size}")
+        expected = self.solutions.get(puzzle_id)
+        if expected is None:  # from before a restart, or forgotten -- the ID is enough to rebuild it
+            expected = await self.loop.run_in_executor(self.executor, _solution_for, puzzle_id)
+            self.remember(puzzle_id, expected)
+        self.stats["verified"] += 1
+        submitted = board.to_string()
+        return {"id": puzzle_id, "complete": "0" not in submitted, "correct": submitted == expected}
+
+    # routes one request, returns (status, JSON-ready body)
+    async def respond(self, method, target, body):
+        url = urlsplit(target)
+        if url.path == "/puzzle":
+            if method != "GET":
+                return 405, {"error": "use GET"}
+            level = parse_qs(url.query).get("difficulty", ["medium"])[0]
+            if level not in self.supplies:
+                return 400, {"error": f"difficulty must be one of {', '.join(LEVELS)}"}
+            puzzle_id, puzzle = await self.take(level)
+            self.stats["served"] += 1
+            return 200, {"id": puzzle_id, "difficulty": level, "size": self.size,
+                         "removed": puzzle.count("0"), "puzzle": puzzle}  # the real number of empty cells
+        if url.path == "/verify":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            try:
+                request = json.loads(body)
+                if not isinstance(request, dict):
+                    raise ValueError("expected a JSON object")
+                return 200, await self.verify(request["id"], request["solution"])
+            except (ValueError, KeyError, TypeError) as error:
+                return 400, {"error": f"bad request: {error}"}
+        if url.path == "/stats":
+            return 200, {"ready": self.ready(), **self.stats}
+        return 404, {"error": "not found"}
+
+    # one client connection: HTTP/1.1 requests (keep-alive) until the client closes it
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    length = int(headers.get("content-length", 0))
+                    if length < 0:
+                        raise ValueError("negative content-length")
+                except ValueError:
+                    await self._send(writer, 400, {"error": "malformed request"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self._send(writer, 413, {"error": "body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                self.stats["requests"] += 1
+                try:
+                    status, payload = await self.respond(method, target, body)
+                except Exception:
+                    logger.exception("request %s %s failed", method, target)
+                    status, payload = 500, {"error": "internal error"}
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                await self._send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _send(writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                     .encode() + body)
+        await writer.drain()
+
+
+async def serve(args):
+    server = PuzzleServer(args.size, args.workers, args.capacity, max(1, args.capacity // 2),
+                          args.batch_size, seed=args.seed)
+    await server.start(args.host, args.port)
+    host, port = server.address()
+    print(f"serving {args.size}x{args.size} puzzles on http://{host}:{port}", file=sys.stderr, flush=True)
+    serving = asyncio.ensure_future(server.server.serve_forever())
+    # SIGTERM (kill, process.terminate) would otherwise end the process on the spot and orphan the workers
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, serving.cancel)
+        except NotImplementedError:  # Windows: Ctrl+C still raises KeyboardInterrupt
+            pass
+    try:
+        await serving
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sudoku_generator serve",
+                                     description="Serve puzzles over HTTP/JSON on localhost.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="port to listen on (default 8000, 0 = any free port)")
+    parser.add_argument("--size", type=int, default=9, choices=sorted(DIFFICULTIES_BY_SIZE),
+                        help="rows/columns per board (default 9)")
+    parser.add_argument("--workers", type=int, default=None, help="generator processes (default: one per core)")
+    parser.add_argument("--capacity", type=int, default=CACHE_CAPACITY,
+                        help=f"ready puzzles kept per difficulty (default {CACHE_CAPACITY})")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help=f"most puzzles per worker task (default {BATCH_SIZE})")
+    parser.add_argument("--seed", type=int, help="seed for reproducible puzzles (default: random)")
+    args = parser.parse_args(argv)
+    if args.capacity < 1 or args.batch_size < 1:
+        parser.error("--capacity and --batch-size must be >= 1")
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,233 @@
+import math
+
+"""
+Constraint-propagation solver for SudokuBoards (what SudokuGenerator.get_board() returns) or plain 2D lists
+(0 means an empty cell)
+
+Every cell keeps a bitmask of its remaining candidates (bit num set -> num is still possible).
+Naked singles (a cell with one candidate left) and hidden singles (a num with one possible cell left in a
+row/column/box) are propagated until nothing changes, then the search branches on the cell with the fewest
+candidates (minimum remaining values).
+"""
+
+_LAYOUTS = {}  # row_length -> (units, peers), built once per board size
+
+
+'''
+Builds (and caches) the units and peers for a board of the given size
+
+Parameters:
+row_length is the number of rows/columns of the board
+
+Return: tuple (units, peers)
+units is a list of the rows, columns and boxes, each a tuple of flat cell indices
+peers[i] is a tuple of every other cell index sharing a row, column or box with cell i
+'''
+def board_layout(row_length):
+    if row_length in _LAYOUTS:
+        return _LAYOUTS[row_length]
+    box_length = math.isqrt(row_length)
+    if box_length * box_length != row_length:
+        raise ValueError(f"board size {row_length} is not a perfect square")
+
+    rows = [tuple(r * row_length + c for c in range(row_length)) for r in range(row_length)]
+    cols = [tuple(r * row_length + c for r in range(row_length)) for c in range(row_length)]
+    boxes = []
+    for br in range(0, row_length, box_length):
+        for bc in range(0, row_length, box_length):
+            boxes.append(tuple((br + i) * row_length + bc + j
+                               for i in range(box_length) for j in range(box_length)))
+    units = rows + cols + boxes
+
+    peers = []
+    for i in range(row_length * row_length):
+        r, c = divmod(i, row_length)
+        box = (r // box_length) * box_length + c // box_length
+        peers.append(tuple(sorted((set(rows[r]) | set(cols[c]) | set(boxes[box])) - {i})))
+
+    _LAYOUTS[row_length] = (units, tuple(peers))
+    return _LAYOUTS[row_length]
+
+
+'''
+Eliminates solved cells from their peers and fills hidden singles until nothing changes
+cands is modified in place
+
+Parameters:
+cands is the flat list of candidate bitmasks
+queue is a list of indices of cells that became solved and have not been eliminated from their peers yet
+units, peers come from board_layout
+full is the bitmask with every legal num set
+
+Return: boolean (False if a contradiction was found)
+'''
+def _propagate(cands, queue, units, peers, full):
+    while True:
+        # naked singles
+        while queue:
+            i = queue.pop()
+            bit = cands[i]
+            for p in peers[i]:
+                mask = cands[p]
+                if mask & bit:
+                    mask ^= bit
+                    if not mask:
+                        return False
+                    cands[p] = mask
+                    if not mask & (mask - 1):  # peer is down to one candidate
+                        queue.append(p)
+
+        # hidden singles -- nums that appear exactly once in a unit
+        for unit in units:
+            once = twice = 0
+            for i in unit:
+                mask = cands[i]
+                twice |= once & mask
+                once |= mask
+            if once != full:  # some num has nowhere to go
+                return False
+            singles = once & ~twice
+            if singles:
+                for i in unit:
+                    mask = cands[i]
+                    hit = mask & singles
+                    if hit and hit != mask:
+                        if hit & (hit - 1):  # two nums can only go in this one cell
+                            return False
+                        cands[i] = hit
+                        queue.append(i)
+        if not queue:
+            return True
+
+
+'''
+Turns a 2D board into the flat candidate list used by the search, already propagated
+
+Parameters:
+grid is a 2D list of ints or a SudokuBoard (0 = empty)
+
+Return: tuple (cands, units, peers, full), cands is None if the givens contradict each other
+'''
+def _prepare(grid):
+    row_length = len(grid)
+    units, peers = board_layout(row_length)
+    full = ((1 << row_length) - 1) << 1
+    cells = getattr(grid, "cells", None)  # SudokuBoard keeps a flat bytearray, no need to go row by row
+    if cells is None:
+        cells = [num for row in grid for num in row]
+    cands = []
+    queue = []
+    for i, num in enumerate(cells):
+        if num:
+            queue.append(i)
+            cands.append(1 << num)
+        else:
+            cands.append(full)
+    if not _propagate(cands, queue, units, peers, full):
+        return None, units, peers, full
+    return cands, units, peers, full
+
+
+'''
+Depth first search over propagated candidate lists, branching on the cell with the fewest candidates
+
+Parameters:
+cands is a propagated candidate list
+units, peers, full come from _prepare
+solutions is a list that finished candidate lists are appended to
+limit is the number of solutions after which the search stops
+
+Return: None
+'''
+def _search(cands, units, peers, full, solutions, limit):
+    best = -1
+    best_count = 100
+    for i, mask in enumerate(cands):
+        if mask & (mask - 1):
+            count = mask.bit_count()
+            if count < best_count:
+                best, best_count = i, count
+                if count == 2:  # can't do better than two
+                    break
+    if best < 0:  # every cell has exactly one candidate
+        solutions.append(cands)
+        return
+
+    mask = cands[best]
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        trial = cands[:]
+        trial[best] = bit
+        if _propagate(trial, [best], units, peers, full):
+            _search(trial, units, peers, full, solutions, limit)
+            if len(solutions) >= limit:
+                return
+
+
+'''
+Solves a board
+
+Parameters:
+grid is a 2D list of ints (0 = empty), it is not modified
+
+Return: list[list] (a solved copy of the board) or None if the board has no solution
+'''
+def solve(grid):
+    cands, units, peers, full = _prepare(grid)
+    if cands is None:
+        return None
+    solutions = []
+    _search(cands, units, peers, full, solutions, 1)
+    if not solutions:
+        return None
+    row_length = len(grid)
+    values = [mask.bit_length() - 1 for mask in solutions[0]]
+    return [values[r * row_length:(r + 1) * row_length] for r in range(row_length)]
+
+
+'''
+Counts the solutions of a board, stopping as soon as limit solutions have been found
+count_solutions(grid) == 1 means the puzzle is unique
+
+Parameters:
+grid is a 2D list of ints (0 = empty), it is not modified
+limit is the number of solutions after which counting stops
+
+Return: int (between 0 and limit)
+'''
+def count_solutions(grid, limit=2):
+    cands, units, peers, full = _prepare(grid)
+    if cands is None:
+        return 0
+    solutions = []
+    _search(cands, units, peers, full, solutions, limit)
+    return len(solutions)
+
+
+'''
+Checks whether the board has a solution where (row, col) is NOT num
+If the board is known to have a solution with num at (row, col), this answers "is there a second solution?"
+with a single search that stops at the first hit, which is cheaper than count_solutions(grid, 2)
+
+Parameters:
+grid is a 2D list of ints (0 = empty), it is not modified
+row and col are the row index and col index of an empty cell
+num is the value ruled out at (row, col)
+
+Return: boolean
+'''
+def has_solution_without(grid, row, col, num):
+    cands, units, peers, full = _prepare(grid)
+    if cands is None:
+        return False
+    i = row * len(grid) + col
+    mask = cands[i] & ~(1 << num)
+    if not mask:
+        return False
+    cands[i] = mask
+    if not _propagate(cands, [i] if not mask & (mask - 1) else [], units, peers, full):
+        return False
+    solutions = []
+    _search(cands, units, peers, full, solutions, 1)
+    return len(solutions) > 0
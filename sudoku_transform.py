@@ -0,0 +1,234 @@
+import hashlib, math, random
+from itertools import permutations, product
+from sudoku_generator import SudokuBoard
+
+"""
+Validity-preserving transforms of sudoku boards
+
+Relabelling the digits, shuffling rows inside a band (and columns inside a stack), shuffling the bands
+(and stacks) and transposing all turn a valid puzzle into another valid puzzle with the same number of
+solutions and the same difficulty grade. One expensive generate_sudoku run can therefore be stretched into
+many distinct puzzles for the cost of a few byte shuffles each.
+
+canonical_form/canonical_hash go the other way: they map every equivalent puzzle to the same representative,
+which is what sudoku_dedup uses to spot repeats. They only handle 9x9 boards -- the search keeps every
+arrangement that ties so far, and on 16x16 and 25x25 boards that takes seconds or runs out of memory.
+"""
+
+CANONICAL_SIZE = 9  # the only board size canonical_form handles
+MAX_TIES = 100000  # tied arrangements canonical_form keeps at once (generated 9x9 puzzles stay under 40000)
+
+
+'''
+Picks a random transform for boards of the given size
+
+Parameters:
+size is the number of rows/columns of the board
+rng is the random.Random (or the random module) to draw from
+
+Return: tuple (cell_order, digit_map)
+cell_order[i] is the index of the cell that moves to position i
+digit_map is a 256 byte translation table for bytes.translate (0 always maps to 0)
+'''
+def random_transform(size, rng=random):
+    box_length = math.isqrt(size)
+
+    # rows: shuffle the bands, then the rows inside each band (same for columns / stacks)
+    def line_order():
+        bands = list(range(box_length))
+        rng.shuffle(bands)
+        order = []
+        for band in bands:
+            lines = list(range(band * box_length, (band + 1) * box_length))
+            rng.shuffle(lines)
+            order += lines
+        return order
+
+    rows, cols = line_order(), line_order()
+    if rng.random() < 0.5:  # transpose
+        cell_order = [cols[c] * size + rows[r] for r in range(size) for c in range(size)]
+    else:
+        cell_order = [rows[r] * size + cols[c] for r in range(size) for c in range(size)]
+
+    digits = list(range(1, size + 1))
+    rng.shuffle(digits)
+    digit_map = bytearray(range(256))
+    digit_map[1:size + 1] = bytes(digits)
+    return cell_order, bytes(digit_map)
+
+
+'''
+Applies a transform from random_transform to a board
+
+Parameters:
+board is a SudokuBoard
+transform is a (cell_order, digit_map) tuple
+
+Return: SudokuBoard (a new board, the original is not modified)
+'''
+def apply_transform(board, transform):
+    cell_order, digit_map = transform
+    cells = board.cells
+    moved = bytes([cells[i] for i in cell_order])
+    return SudokuBoard(board.size, moved.translate(digit_map))
+
+
+'''
+Derives n distinct puzzle/solution pairs from one generated pair
+Every derived puzzle has a single solution if the original does, and grades the same.
+
+Parameters:
+puzzle and solution are boards (SudokuBoard or 2D lists), as returned by generate_sudoku
+n is the number of pairs wanted
+rng is the random.Random (or the random module) to draw transforms from
+
+Return: list of (board, solved_board) tuples -- can be shorter than n only for puzzles with very few
+distinct transforms (e.g. an almost empty board)
+'''
+def derive(puzzle, solution, n, rng=random):
+    puzzle = SudokuBoard.from_grid(puzzle)
+    solution = SudokuBoard.from_grid(solution)
+    seen = {bytes(puzzle.cells)}  # never hand back the original
+    derived = []
+    attempts = 0
+    while len(derived) < n and attempts < 20 * n + 100:  # duplicates are rare, this only guards degenerate boards
+        attempts += 1
+        transform = random_transform(puzzle.size, rng)
+        board = apply_transform(puzzle, transform)
+        key = bytes(board.cells)
+        if key in seen:
+            continue
+        seen.add(key)
+        derived.append((board, apply_transform(solution, transform)))
+    return derived
+
+
+# column orders that put the blanks of row as early as possible (blanks first inside every stack, stacks
+# with more blanks first) -- every order that ties is returned, the later rows decide between them
+def _best_column_orders(row, box_length):
+    stacks = {}  # stack pattern (0 = blank, 1 = filled) -> list of possible column orders for each such stack
+    for stack in range(box_length):
+        cols = range(stack * box_length, (stack + 1) * box_length)
+        blanks = [c for c in cols if row[c] == 0]
+        filled = [c for c in cols if row[c] != 0]
+        pattern = (0,) * len(blanks) + (1,) * len(filled)
+        orders = [list(b) + list(f) for b in permutations(blanks) for f in permutations(filled)]
+        stacks.setdefault(pattern, []).append(orders)
+
+    # stacks with the same pattern can come in any order among themselves
+    choices = [list(_arrangements(stacks[pattern])) for pattern in sorted(stacks)]
+    return [sum(parts, []) for parts in product(*choices)]
+
+
+# every column order for a group of same-pattern stacks: any order of the stacks, any order inside each
+def _arrangements(group):
+    for stack_order in permutations(group):
+        for picked in product(*stack_order):
+            yield [c for order in picked for c in order]
+
+
+# relabels row (seen through col_order) with the labels in mapping, handing out new labels in order of
+# first appearance -- returns the relabelled tuple and the labels it added
+def _relabel(row, col_order, mapping):
+    added = {}
+    next_label = len(mapping) + 1
+    seq = []
+    for c in col_order:
+        num = row[c]
+        if num == 0:
+            seq.append(0)
+            continue
+        label = mapping.get(num) or added.get(num)
+        if label is None:
+            label = added[num] = next_label
+            next_label += 1
+        seq.append(label)
+    return tuple(seq), added
+
+
+'''
+Computes the canonical form of a board: the smallest (row by row) board reachable through the symmetry
+transforms, with digits relabelled 1, 2, 3, ... in order of first appearance. Two puzzles are equivalent
+(one can be turned into the other by relabelling, row/column/band/stack shuffles and transposition)
+exactly when their canonical forms are equal.
+
+Rows are fixed one at a time, keeping every partial arrangement that ties for the smallest row so far.
+A few blanks keep the number of ties small, and so does a filled board, but a nearly empty board ties
+almost everywhere (an empty one would need millions of arrangements), so the search gives up past MAX_TIES.
+
+Parameters:
+board is a 9x9 SudokuBoard or 2D list (0 = empty)
+
+Return: bytes (size * size labels), raises ValueError for other sizes or boards with more than MAX_TIES ties
+'''
+def canonical_form(board):
+    form = _canonical_form(board)
+    if form is None:
+        raise ValueError(f"board has more than {MAX_TIES} equivalent arrangements to compare")
+    return form
+
+
+# canonical_form, but None instead of ValueError when the ties go past MAX_TIES
+def _canonical_form(board):
+    board = SudokuBoard.from_grid(board)
+    size = board.size
+    if size != CANONICAL_SIZE:
+        raise ValueError(f"canonical forms are only worked out for {CANONICAL_SIZE}x{CANONICAL_SIZE} boards")
+    box_length = math.isqrt(size)
+    grids = [[board[r].tolist() for r in range(size)]]
+    grids.append([list(col) for col in zip(*grids[0])])  # transposed
+
+    # state: (grid, rows used so far, column order, digit -> label)
+    best = None
+    states = []
+    for grid in grids:
+        for r in range(size):
+            for col_order in _best_column_orders(grid[r], box_length):
+                seq, mapping = _relabel(grid[r], col_order, {})
+                if best is None or seq < best:
+                    best, states = seq, []
+                if seq == best:
+                    states.append((grid, (r,), col_order, mapping))
+    if len(states) > MAX_TIES:
+        return None
+    form = list(best)
+
+    for position in range(1, size):
+        best = None
+        next_states = []
+        for grid, rows, col_order, mapping in states:
+            if position % box_length:  # still inside the band the previous row came from
+                band = rows[-1] // box_length
+                options = [r for r in range(band * box_length, (band + 1) * box_length) if r not in rows]
+            else:  # start a new band
+                used_bands = {r // box_length for r in rows}
+                options = [r for r in range(size) if r // box_length not in used_bands]
+            for r in options:
+                seq, added = _relabel(grid[r], col_order, mapping)
+                if best is None or seq < best:
+                    best, next_states = seq, []
+                if seq == best:
+                    next_states.append((grid, rows + (r,), col_order, {**mapping, **added} if added else mapping))
+                    if len(next_states) > MAX_TIES:
+                        return None
+        states = next_states
+        form += best
+    return bytes(form)
+
+
+'''
+A 64 bit hash of a board's canonical form -- equivalent puzzles hash the same
+Boards with too many ties for canonical_form (nearly empty ones) are hashed as they are instead, so only
+exact repeats of those are spotted.
+
+Parameters:
+board is a 9x9 SudokuBoard or 2D list (0 = empty)
+
+Return: int (never 0, so 0 can mark an empty slot in sudoku_dedup.DedupIndex), raises ValueError for other sizes
+'''
+def canonical_hash(board):
+    form = _canonical_form(board)
+    if form is None:
+        form = b"as is" + SudokuBoard.from_grid(board).cells  # prefixed so it can't collide with a real form
+    key = int.from_bytes(hashlib.blake2b(form, digest_size=8).digest(), "little")
+    return key or 1
@@ -0,0 +1,82 @@
+import json
+import pytest
+from sudoku_bank import PuzzleBank, BankWriter, build_from_jsonl, pack_record, record_size, unpack_record
+from sudoku_generator import generate_sudoku
+from sudoku_grader import grade
+
+
+@pytest.mark.parametrize("size, removed", [(9, 40), (16, 100)])
+def test_record_round_trip(size, removed):
+    puzzle, solution = generate_sudoku(size, removed, seed=size)
+    record = pack_record(puzzle, solution, 1234, 2)
+    assert len(record) == record_size(size)
+    board, solved_board, score, hardest = unpack_record(record, size)
+    assert (board.cells, solved_board.cells, score, hardest) == (puzzle.cells, solution.cells, 1234, 2)
+    assert unpack_record(pack_record(puzzle, solution), size)[2:] == (None, None)
+
+
+def write_bank(path, pairs):
+    with BankWriter(str(path)) as writer:
+        for removed, puzzle, solution in pairs:
+            writer.add(removed, puzzle, solution, grade(puzzle))
+
+
+def test_bank_round_trip(tmp_path):
+    pairs = [(removed, *generate_sudoku(9, removed, True, seed)) for removed in (30, 50) for seed in range(5)]
+    write_bank(tmp_path / "p.bank", pairs)
+    with PuzzleBank(str(tmp_path / "p.bank")) as bank:
+        assert bank.difficulties() == ["30", "50"]
+        assert bank.count(30) == bank.count("50") == 5 and bank.count(40) == 0
+        for i, (removed, puzzle, solution) in enumerate(pairs):
+            board, solved_board, score, hardest = bank.get(removed, i % 5)
+            assert (board.cells, solved_board.cells) == (puzzle.cells, solution.cells)
+            assert (score, hardest) == (grade(puzzle).score, grade(puzzle).hardest)
+        with pytest.raises(IndexError):
+            bank.get(30, 5)
+
+
+def test_build_files_by_empty_cells(tmp_path):
+    lines = []
+    for seed, removed in enumerate((40, 40, 50)):
+        puzzle, solution = generate_sudoku(9, removed, True, seed)
+        # "removed" used to be the requested count, the bank counts for itself
+        lines.append(json.dumps({"removed": 60, "puzzle": puzzle.to_string(), "solution": solution.to_string()}))
+    assert build_from_jsonl(lines, str(tmp_path / "b.bank"), graded=False) == 3
+    with PuzzleBank(str(tmp_path / "b.bank")) as bank:
+        assert (bank.count(40), bank.count(50), bank.count(60)) == (2, 1, 0)
+        assert bank.get(50, 0)[2] is None
+
+
+@pytest.mark.parametrize("damage", ["magic", "version", "truncated", "short", "empty"])
+def test_damaged_banks_are_rejected(tmp_path, damage):
+    path = tmp_path / "p.bank"
+    write_bank(path, [(40, *generate_sudoku(9, 40, seed=seed)) for seed in range(3)])
+    data = bytearray(path.read_bytes())
+    if damage == "magic":
+        data[:8] = b"NOTABANK"
+    elif damage == "version":
+        data[8] = 99
+    elif damage == "truncated":
+        del data[-10:]
+    elif damage == "short":
+        del data[10:]
+    else:
+        data = b""
+    path.write_bytes(data)
+    with pytest.raises(ValueError):
+        PuzzleBank(str(path))
+
+
+def test_boards_of_another_size_are_refused(tmp_path):
+    puzzle, solution = generate_sudoku(9, 40, seed=1)
+    big_puzzle, big_solution = generate_sudoku(16, 100, seed=1)
+    with BankWriter(str(tmp_path / "p.bank")) as writer:
+        writer.add(40, puzzle, solution)
+        with pytest.raises(ValueError):
+            writer.add(100, big_puzzle, big_solution)
+        with pytest.raises(ValueError):
+            writer.add(40, puzzle, big_solution)
+    lines = [json.dumps({"puzzle": p.to_string(), "solution": s.to_string()})
+             for p, s in ((puzzle, solution), (big_puzzle, big_solution))]
+    with pytest.raises(ValueError):
+        build_from_jsonl(lines, str(tmp_path / "mixed.bank"), graded=False)
@@ -0,0 +1,64 @@
+import random
+import pytest
+import sudoku_dedup
+from sudoku_dedup import DedupIndex
+from sudoku_generator import SudokuBoard, generate_sudoku
+from sudoku_transform import canonical_form, canonical_hash, derive
+
+
+@pytest.mark.parametrize("removed", [0, 30, 50, 64])
+def test_equivalent_puzzles_share_a_canonical_form(removed):
+    puzzle, solution = generate_sudoku(9, removed, seed=removed)
+    form = canonical_form(puzzle)
+    assert len(form) == 81
+    for board, _ in derive(puzzle, solution, 10, random.Random(removed)):
+        assert canonical_form(board) == form
+
+
+def test_different_puzzles_have_different_forms():
+    forms = {canonical_form(generate_sudoku(9, 40, seed=seed)[0]) for seed in range(20)}
+    assert len(forms) == 20
+
+
+def test_canonical_form_limits():
+    with pytest.raises(ValueError):
+        canonical_form(generate_sudoku(16, 100, seed=1)[0])
+    empty = SudokuBoard(9)
+    with pytest.raises(ValueError):
+        canonical_form(empty)  # ties almost everywhere, more than MAX_TIES
+    assert canonical_hash(empty) == canonical_hash(SudokuBoard(9))  # still hashed, as it is
+    assert canonical_hash(empty) != 0
+
+
+def test_index_add_and_reopen(tmp_path):
+    path = str(tmp_path / "seen.idx")
+    rng = random.Random(0)
+    keys = list({rng.getrandbits(64) | 1 for _ in range(5000)})  # enough to make the table grow
+    with DedupIndex(path) as index:
+        assert all(index.add(key) for key in keys)
+        assert not any(index.add(key) for key in keys[:100])
+        assert len(index) == len(keys)
+        assert index.capacity > sudoku_dedup.INITIAL_CAPACITY
+    with DedupIndex(path) as index:
+        assert len(index) == len(keys)
+        assert all(key in index for key in keys)
+        assert 12345 not in index
+
+
+def test_index_spots_equivalent_puzzles(tmp_path):
+    puzzle, solution = generate_sudoku(9, 40, True, seed=7)
+    with DedupIndex(str(tmp_path / "seen.idx")) as index:
+        assert index.add_puzzle(puzzle)
+        for board, _ in derive(puzzle, solution, 5, random.Random(7)):
+            assert index.seen(board)
+            assert not index.add_puzzle(board)
+        assert not index.seen(generate_sudoku(9, 40, True, seed=8)[0])
+        with pytest.raises(ValueError):
+            index.add_puzzle(generate_sudoku(16, 80, seed=1)[0])
+
+
+def test_index_rejects_other_files(tmp_path):
+    path = tmp_path / "other.idx"
+    path.write_bytes(b"not an index" + bytes(100))
+    with pytest.raises(ValueError):
+        DedupIndex(str(path))
@@ -0,0 +1,71 @@
+import random
+import pytest
+import sudoku_dlx, sudoku_solver
+from sudoku_generator import SudokuBoard, generate_sudoku
+
+
+# True if every row, column and box of board holds each value once
+def is_complete_sudoku(board):
+    size = board.size
+    box_length = int(size ** 0.5)
+    units = [[(r, c) for c in range(size)] for r in range(size)] + [[(r, c) for r in range(size)] for c in range(size)]
+    units += [[(br + r, bc + c) for r in range(box_length) for c in range(box_length)]
+              for br in range(0, size, box_length) for bc in range(0, size, box_length)]
+    return all(sorted(board[r][c] for r, c in unit) == list(range(1, size + 1)) for unit in units)
+
+
+@pytest.mark.parametrize("size, removed, unique", [(9, 50, True), (9, 60, False), (16, 100, True), (16, 130, False)])
+def test_solve_and_count_match_the_constraint_solver(size, removed, unique):
+    for seed in range(5):
+        puzzle, _ = generate_sudoku(size, removed, unique, seed)
+        count = sudoku_dlx.count_solutions(puzzle, 3)
+        assert count == sudoku_solver.count_solutions(puzzle, 3)
+        if unique:
+            assert count == 1
+        solved = sudoku_dlx.solve(puzzle)[0]
+        assert is_complete_sudoku(solved)
+        assert all(num in (0, value) for num, value in zip(puzzle.cells, solved.cells))
+        assert puzzle.cells.count(0) == removed  # not modified
+
+
+def test_no_solution():
+    puzzle, solution = generate_sudoku(9, 40, True, seed=1)
+    index = puzzle.cells.index(0)
+    row, col = divmod(index, 9)
+    puzzle[row][col] = solution[row][(col + 1) % 9]  # a value that clashes with its row
+    assert sudoku_dlx.solve(puzzle) == []
+    assert sudoku_dlx.count_solutions(puzzle) == sudoku_solver.count_solutions(puzzle) == 0
+
+
+def test_has_solution_without():
+    puzzle, solution = generate_sudoku(9, 45, True, seed=2)
+    row, col = divmod(puzzle.cells.index(0), 9)
+    assert not sudoku_dlx.has_solution_without(puzzle, row, col, solution[row][col])
+
+    # a puzzle with several solutions: any cell where two of them differ can do without either value
+    seed = next(seed for seed in range(100) if sudoku_solver.count_solutions(generate_sudoku(9, 64, False, seed)[0]) > 1)
+    puzzle, _ = generate_sudoku(9, 64, False, seed)
+    first, second = sudoku_dlx.solve(puzzle, 2)
+    index = next(i for i in range(81) if first.cells[i] != second.cells[i])
+    row, col = divmod(index, 9)
+    assert sudoku_dlx.has_solution_without(puzzle, row, col, first.cells[index])
+    assert sudoku_solver.has_solution_without(puzzle, row, col, first.cells[index])
+
+
+def test_running_out_of_budget():
+    # an empty 25x25 board can't be filled in 10 placements
+    assert sudoku_dlx.solve(SudokuBoard(25), budget=10) is None
+    # no proof either way counts as having another solution, so a budget only ever errs towards True
+    puzzle, solution = generate_sudoku(9, 55, True, seed=3)
+    cut_short = 0
+    for index in (i for i in range(81) if puzzle.cells[i] == 0):
+        row, col = divmod(index, 9)
+        assert not sudoku_dlx.has_solution_without(puzzle, row, col, solution[row][col])
+        cut_short += sudoku_dlx.has_solution_without(puzzle, row, col, solution[row][col], budget=1)
+    assert cut_short > 0
+
+
+@pytest.mark.parametrize("size", [9, 16, 25])
+def test_fill(size):
+    board = sudoku_dlx.fill(size, random.Random(size))
+    assert board.size == size and is_complete_sudoku(board)
@@ -0,0 +1,68 @@
+import random
+import pytest
+from sudoku_game import GameBoard, parse_script, random_commands
+from sudoku_generator import generate_sudoku
+
+
+# empty cells, cells that differ from the solution and clashing cells, worked out from scratch
+def rescan(board):
+    size, box_length = board.size, board.box_length
+    values = board.values.cells
+    units = {}
+    for index, value in enumerate(values):
+        if value:
+            row, col = divmod(index, size)
+            for unit in (("row", row), ("col", col), ("box", row // box_length, col // box_length)):
+                units.setdefault((unit, value), []).append(index)
+    conflicted = {index for holders in units.values() if len(holders) > 1 for index in holders}
+    mismatches = sum(value != solved for value, solved in zip(values, board.solved_board.cells))
+    return values.count(0), mismatches, conflicted
+
+
+@pytest.mark.parametrize("size, removed", [(9, 40), (16, 100)])
+def test_incremental_counts_match_a_rescan(size, removed):
+    puzzle, solution = generate_sudoku(size, removed, seed=size)
+    board = GameBoard(puzzle, solution)
+    for command in random_commands(size, 1000, random.Random(size)):
+        board.apply(command)
+        assert (board.empty_count, board.mismatch_count, board.conflicted) == rescan(board)
+        assert board.is_full() == (board.empty_count == 0)
+
+
+def test_counts_after_reset_and_solving():
+    puzzle, solution = generate_sudoku(9, 30, seed=1)
+    board = GameBoard(puzzle, solution)
+    for command in random_commands(9, 200, random.Random(1)):
+        board.apply(command)
+    board.apply(("reset",))
+    assert (board.empty_count, board.mismatch_count, board.conflicted) == (30, 30, set())
+
+    for index in range(81):  # fill in the solution
+        if puzzle.cells[index] == 0:
+            board.apply(("select", *divmod(index, 9)))
+            board.apply(("input", solution.cells[index]))
+            board.apply(("place",))
+    assert board.is_full() and board.check_board() and not board.conflicted
+
+
+def test_undo_takes_every_move_back():
+    puzzle, solution = generate_sudoku(9, 40, seed=2)
+    board = GameBoard(puzzle, solution)
+    for command in random_commands(9, 300, random.Random(2)):
+        if command[0] not in ("undo", "redo"):
+            board.apply(command)
+    while board.undo():
+        pass
+    assert board.values.cells == puzzle.cells
+    assert rescan(board) == (40, 40, set())
+
+
+def test_parse_script():
+    lines = ["select 3 4  # a comment", "", "input 7", "place", "move -1 0", "undo"]
+    assert parse_script(lines) == [("select", 3, 4), ("input", 7), ("place",), ("move", -1, 0), ("undo",)]
+
+
+@pytest.mark.parametrize("line", ["bogus 1", "move 1", "input", "select 0", "place 1", "select a b"])
+def test_parse_script_names_the_bad_line(line):
+    with pytest.raises(ValueError, match="line 2"):
+        parse_script(["place", line])
@@ -0,0 +1,49 @@
+import random
+import pytest
+from sudoku_generator import SudokuBoard, generate_sudoku
+from sudoku_grader import BANDS, GUESS, TECHNIQUES, generate_graded, grade
+from sudoku_transform import apply_transform, random_transform
+
+# a classic newspaper puzzle that hidden singles alone solve
+SINGLES_PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+
+
+def test_solved_and_nearly_solved_boards():
+    _, solution = generate_sudoku(9, 0, seed=1)
+    assert grade(solution) == (0, -1, True)
+    board = solution.copy()
+    board.cells[40] = 0
+    assert grade(board) == (1, TECHNIQUES.index("hidden single"), True)
+
+
+def test_singles_only_puzzle():
+    puzzle = SudokuBoard.from_string(SINGLES_PUZZLE)
+    assert grade(puzzle) == grade(puzzle, max_level=0) == (51, 0, True)
+
+
+def test_contradiction_is_not_solved():
+    puzzle, solution = generate_sudoku(9, 40, True, seed=2)
+    col = puzzle[0].tolist().index(0)
+    puzzle[0][col] = solution[0][(col + 1) % 9]  # a digit already in row 0
+    assert not grade(puzzle).solved
+
+
+@pytest.mark.parametrize("removed", [40, 55, 64])
+def test_grade_ignores_symmetry_transforms(removed):
+    rng = random.Random(removed)
+    for seed in range(5):
+        puzzle, _ = generate_sudoku(9, removed, removed <= 55, seed)
+        expected = grade(puzzle)
+        for _ in range(5):
+            assert grade(apply_transform(puzzle, random_transform(9, rng))) == expected
+
+
+@pytest.mark.parametrize("band", ["easy", "medium", "hard"])
+def test_generate_graded_lands_in_the_band(band):
+    random.seed(band)
+    board, solved_board, result = generate_graded(band)
+    lowest, highest = BANDS[band]
+    assert result.solved and lowest <= result.hardest <= highest
+    assert grade(board) == result
+    assert all(num in (0, solved) for num, solved in zip(board.cells, solved_board.cells))
+    assert result.hardest < GUESS
@@ -0,0 +1,59 @@
+import itertools
+import pytest
+from sudoku_game import GameBoard
+from sudoku_generator import generate_sudoku
+from sudoku_history import History, pack, unpack
+
+
+def test_pack_round_trip():
+    states = [(value, sketch, placed) for value in (0, 1, 25) for sketch in (0, 7, 25) for placed in (False, True)]
+    for index in (0, 80, 624):
+        for old, new in itertools.product(states, repeat=2):
+            delta = pack(index, old, new)
+            assert 0 <= delta < 1 << 32  # fits the array("I") slots
+            assert unpack(delta) == (index, old, new)
+
+
+def test_ring_buffer_keeps_the_newest_moves():
+    history = History(3)
+    for delta in range(1, 6):
+        history.record(delta)
+    assert len(history) == 3
+    assert [history.undo() for _ in range(4)] == [5, 4, 3, None]
+    assert [history.redo() for _ in range(4)] == [3, 4, 5, None]
+    history.undo()
+    history.record(9)  # drops the move that could have been redone
+    assert history.redo() is None
+    assert [history.undo() for _ in range(4)] == [9, 4, 3, None]
+    with pytest.raises(ValueError):
+        History(0)
+
+
+# values, sketches and placed flags of every cell
+def state(board):
+    return [(cell.value, cell.sketched_value, cell.user_placed) for row in board.cell_array for cell in row]
+
+
+def test_board_undo_past_a_wrapped_history():
+    capacity = 5
+    puzzle, solution = generate_sudoku(9, 40, seed=3)
+    board = GameBoard(puzzle, solution, history_capacity=capacity)
+    blanks = [divmod(i, 9) for i in range(81) if puzzle.cells[i] == 0]
+    states = [state(board)]
+    for move in range(3 * capacity):  # sketch and place, far more moves than the history keeps
+        row, col = blanks[move % len(blanks)]
+        board.apply(("select", row, col))
+        board.apply(("input", solution[row][col]))
+        states.append(state(board))
+        board.apply(("place",))
+        states.append(state(board))
+
+    for back in range(1, capacity + 1):
+        assert board.undo()
+        assert state(board) == states[-1 - back]
+    assert not board.undo()
+    assert state(board) == states[-1 - capacity]
+    for forward in range(capacity):
+        assert board.redo()
+    assert state(board) == states[-1]
+    assert not board.redo()
@@ -0,0 +1,79 @@
+import os, random, subprocess, sys
+import pytest
+from sudoku_id import ALPHABET, ID_LENGTH, ID_VERSION, PuzzleSpec, generate_from_id, make_id, new_puzzle, parse_id
+
+
+# encodes raw fields the way make_id does, without its checks
+def raw_id(box_length, removed, unique=True, seed=1, version=ID_VERSION):
+    value = (((seed << 1 | unique) << 13 | removed) << 3 | (box_length - 2)) << 4 | version
+    chars = []
+    for _ in range(ID_LENGTH):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+@pytest.mark.parametrize("size, removed", [(9, 0), (9, 81), (16, 100), (25, 250)])
+def test_round_trip(size, removed):
+    for seed in (0, 1, (1 << 64) - 1, random.Random(size).getrandbits(64)):
+        for unique in (True, False):
+            puzzle_id = make_id(size, removed, unique, seed)
+            assert len(puzzle_id) == ID_LENGTH
+            assert parse_id(puzzle_id) == PuzzleSpec(size, removed, unique, seed)
+            assert parse_id(f" {puzzle_id.upper()} ") == parse_id(puzzle_id)
+
+
+def test_make_id_rejects_bad_fields():
+    for size, removed, seed in ((4, 5, 1), (36, 5, 1), (10, 5, 1), (9, 82, 1), (9, -1, 1), (9, 40, 1 << 64), (9, 40, -1)):
+        with pytest.raises(ValueError):
+            make_id(size, removed, True, seed)
+
+
+@pytest.mark.parametrize("puzzle_id", [
+    raw_id(3, 40, version=ID_VERSION + 1),  # another generator version
+    raw_id(3, 82),  # more cells removed than the board has
+    raw_id(2, 5),  # 4x4
+    raw_id(6, 5),  # 36x36
+    raw_id(3, 40)[:-1],  # too short
+    raw_id(3, 40) + "0",  # too long
+    raw_id(3, 40)[:-1] + "i",  # not in the alphabet
+    raw_id(3, 40)[:-1] + "!",
+    "",
+])
+def test_parse_id_rejects_bad_ids(puzzle_id):
+    with pytest.raises(ValueError):
+        parse_id(puzzle_id)
+
+
+def test_raw_id_matches_make_id():
+    assert raw_id(3, 40, True, 12345) == make_id(9, 40, True, 12345)
+
+
+@pytest.mark.parametrize("size, removed, unique", [(9, 40, True), (9, 60, False), (16, 100, True)])
+def test_generate_from_id_is_deterministic(size, removed, unique):
+    puzzle_id = make_id(size, removed, unique, 987654321)
+    board, solved_board = generate_from_id(puzzle_id)
+    for _ in range(2):
+        again = generate_from_id(puzzle_id)
+        assert (again[0].cells, again[1].cells) == (board.cells, solved_board.cells)
+    other = generate_from_id(make_id(size, removed, unique, 987654322))
+    assert other[1].cells != solved_board.cells
+
+
+def test_new_puzzle_matches_its_id():
+    puzzle_id, board, solved_board = new_puzzle(9, 40, rng=random.Random(3))
+    assert parse_id(puzzle_id).removed == 40
+    again = generate_from_id(puzzle_id)
+    assert (again[0].cells, again[1].cells) == (board.cells, solved_board.cells)
+
+
+# another interpreter, with other hash seeds, has to rebuild the same pair (that's what the IDs are for)
+def test_generate_from_id_in_another_process():
+    puzzle_id = make_id(9, 45, True, 42)
+    board, solved_board = generate_from_id(puzzle_id)
+    script = f"from sudoku_id import generate_from_id; print(*(b.to_string() for b in generate_from_id({puzzle_id!r})))"
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for hash_seed in ("1", "2"):
+        output = subprocess.run([sys.executable, "-c", script], cwd=repo, capture_output=True, text=True, check=True,
+                                env={**os.environ, "PYTHONHASHSEED": hash_seed}).stdout
+        assert output.split() == [board.to_string(), solved_board.to_string()]
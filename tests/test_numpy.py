@@ -0,0 +1,104 @@
+import pytest
+from sudoku_generator import generate_sudoku
+from sudoku_solver import count_solutions, solve
+
+np = pytest.importorskip("numpy")
+sudoku_numpy = pytest.importorskip("sudoku_numpy")
+
+
+# (puzzles, solutions) as (N, size, size) arrays, a mix of easy, hard and non-unique boards
+def batch(size=9, count=12):
+    removed = (30, 55, 64) if size == 9 else (80, 130, 160)  # the last one is not unique
+    pairs = [generate_sudoku(size, removed[seed % 3], seed % 3 < 2, seed) for seed in range(count)]
+    return (np.array([puzzle.to_list() for puzzle, _ in pairs]),
+            np.array([solution.to_list() for _, solution in pairs]))
+
+
+# the same check as validate, one board at a time in plain python
+def valid(grid):
+    size = len(grid)
+    box = int(size ** 0.5)
+    units = [grid[row] for row in range(size)] + [[grid[row][col] for row in range(size)] for col in range(size)]
+    units += [[grid[r][c] for r in range(br, br + box) for c in range(bc, bc + box)]
+              for br in range(0, size, box) for bc in range(0, size, box)]
+    return all(len([v for v in unit if v]) == len({v for v in unit if v}) for unit in units)
+
+
+def test_from_strings_round_trip():
+    puzzles, _ = batch()
+    strings = ["".join(str(v) for v in grid.flat) for grid in puzzles]
+    assert (sudoku_numpy.from_strings(strings) == puzzles).all()
+    assert sudoku_numpy.from_strings([]).shape == (0, 9, 9)
+
+    big, _ = generate_sudoku(16, 100, seed=0)
+    assert (sudoku_numpy.from_strings([big.to_string()])[0] == np.array(big.to_list())).all()
+
+
+@pytest.mark.parametrize("cells", [256, -1, 10])
+def test_out_of_range_values_are_refused(cells):
+    grids = np.zeros((2, 9, 9), np.int64)
+    grids[1, 4, 4] = cells
+    for check in (sudoku_numpy.validate, sudoku_numpy.is_solved, sudoku_numpy.candidate_masks,
+                  sudoku_numpy.propagate, sudoku_numpy.solve_batch):
+        with pytest.raises(ValueError):
+            check(grids)
+    with pytest.raises(ValueError):
+        sudoku_numpy.audit(grids, grids)
+
+
+@pytest.mark.parametrize("text", ["." + "0" * 80, "A" + "0" * 80, "0" * 80])
+def test_bad_strings_are_refused(text):
+    with pytest.raises(ValueError):
+        sudoku_numpy.from_strings(["0" * 81, text])
+
+
+def test_validate_matches_python():
+    puzzles, solutions = batch()
+    broken = puzzles.copy()
+    for i, grid in enumerate(broken):  # copy a given into another cell of its row on every other board
+        if i % 2:
+            col = int(np.flatnonzero(grid[0])[0])
+            grid[0, (col + 1) % 9] = grid[0, col]
+    grids = np.concatenate((puzzles, solutions, broken))
+    expected = [valid(grid.tolist()) for grid in grids]
+    assert sudoku_numpy.validate(grids).tolist() == expected
+    assert sudoku_numpy.is_solved(grids).tolist() == [ok and bool(grid.all()) for ok, grid in zip(expected, grids)]
+
+
+def test_solve_batch_matches_python():
+    for size in (9, 16):
+        puzzles, _ = batch(size, 6 if size == 16 else 12)
+        solutions, solved, searched = sudoku_numpy.solve_batch(puzzles)
+        assert solved.all()
+        assert 0 <= searched <= len(puzzles)
+        for puzzle, solution in zip(puzzles, solutions):
+            grid = puzzle.tolist()
+            if count_solutions(grid) == 1:
+                assert solution.tolist() == solve(grid)
+            assert valid(solution.tolist()) and solution.all()
+            assert ((puzzle == 0) | (puzzle == solution)).all()
+
+
+def test_solve_batch_reports_dead_boards():
+    puzzles, _ = batch(count=3)
+    dead = puzzles[:1].copy()
+    col = int(np.flatnonzero(dead[0, 0])[0])
+    dead[0, 0, (col + 1) % 9] = dead[0, 0, col]
+    grids = np.concatenate((dead, puzzles))
+    assert solve(dead[0].tolist()) is None
+    _, solved, _ = sudoku_numpy.solve_batch(grids)
+    assert solved.tolist() == [False, True, True, True]
+
+
+def test_audit_matches_python():
+    puzzles, solutions = batch()
+    wrong = solutions.copy()
+    wrong[:, 0, :2] = wrong[:, 0, 1::-1]  # swap two cells: the rows stay full but a column breaks
+    other = np.roll(solutions, 1, axis=0)  # a valid solution of a different puzzle
+    for answers in (solutions, wrong, other):
+        expected = [valid(p.tolist()) and valid(s.tolist()) and bool(s.all()) and bool(((p == 0) | (p == s)).all())
+                    for p, s in zip(puzzles, answers)]
+        assert sudoku_numpy.audit(puzzles, answers).tolist() == expected
+    assert sudoku_numpy.audit(puzzles, solutions).all()
+    with pytest.raises(ValueError):
+        sudoku_numpy.audit(puzzles, solutions[:3])
@@ -0,0 +1,91 @@
+import random
+import pytest
+import sudoku_save
+from sudoku_game import GameBoard, random_commands
+from sudoku_generator import generate_sudoku
+
+
+# a board with some moves played (values, sketches and placed flags all in use)
+def played_board(size=9, removed=40, seed=0):
+    puzzle, solution = generate_sudoku(size, removed, seed=seed)
+    board = GameBoard(puzzle, solution)
+    for command in random_commands(size, 300, random.Random(seed)):
+        board.apply(command)
+    return board
+
+
+# everything a save has to bring back
+def state(board):
+    cells = [cell for row in board.cell_array for cell in row]
+    return (bytes(board.unsolved_board.cells), bytes(board.solved_board.cells), bytes(board.values.cells),
+            [cell.sketched_value for cell in cells], [cell.user_placed for cell in cells])
+
+
+@pytest.mark.parametrize("size, removed", [(9, 40), (16, 100), (25, 200)])
+def test_save_round_trip(size, removed):
+    board = played_board(size, removed)
+    data = sudoku_save.dumps(board)
+    saved = sudoku_save.loads(data)
+    restored = GameBoard(saved.puzzle, saved.solution)
+    restored.restore_state(saved)
+    assert state(restored) == state(board)
+    assert (restored.empty_count, restored.mismatch_count, restored.conflicted) == \
+        (board.empty_count, board.mismatch_count, board.conflicted)
+
+
+def test_save_size():
+    assert len(sudoku_save.dumps(played_board())) == 351
+
+
+@pytest.mark.parametrize("damage", ["body", "crc", "magic", "version", "truncated", "short"])
+def test_damaged_saves_are_rejected(damage):
+    data = bytearray(sudoku_save.dumps(played_board()))
+    header = sudoku_save.HEADER.size
+    if damage == "body":
+        data[header + 100] ^= 1
+    elif damage == "crc":
+        data[header - 1] ^= 0xFF
+    elif damage == "magic":
+        data[:8] = b"NOTASAVE"
+    elif damage == "version":
+        data[8] = 99
+    elif damage == "truncated":
+        del data[-1:]
+    else:
+        del data[header - 2:]
+    with pytest.raises(ValueError):
+        sudoku_save.loads(bytes(data))
+
+
+def test_save_file_and_autosaver(tmp_path):
+    path = str(tmp_path / "game.sav")
+    board = played_board()
+    sudoku_save.save(board, path)
+    assert sudoku_save.load(path) == sudoku_save.loads(sudoku_save.dumps(board))
+
+    autosaver = sudoku_save.Autosaver(path)
+    autosaver.start()
+    board.apply(("reset",))
+    autosaver.submit(board)
+    autosaver.stop()  # writes what is still pending
+    assert sudoku_save.load(path).values.cells == board.unsolved_board.cells
+    assert not (tmp_path / "game.sav.tmp").exists()
+
+    autosaver.start()
+    autosaver.discard()
+    autosaver.stop()
+    assert not (tmp_path / "game.sav").exists()
+
+
+def test_saves_go_into_missing_directories(tmp_path):
+    board = played_board()
+    path = str(tmp_path / "new" / "dir" / "game.sav")
+    sudoku_save.save(board, path)
+    assert sudoku_save.load(path).values.cells == board.values.cells
+
+    path = str(tmp_path / "other" / "game.sav")
+    autosaver = sudoku_save.Autosaver(path)
+    autosaver.start()
+    autosaver.submit(board)
+    autosaver.stop()
+    assert sudoku_save.load(path).values.cells == board.values.cells
@@ -0,0 +1,110 @@
+import asyncio, json
+import pytest
+from sudoku_generator import DIFFICULTIES_BY_SIZE
+from sudoku_id import make_id
+from sudoku_server import LEVELS, PuzzleServer
+
+
+# starts a small server on a free port, runs scenario(server, request) against it and shuts it down
+def run(scenario):
+    async def main():
+        server = PuzzleServer(9, workers=1, capacity=2, low_watermark=1, batch_size=2, seed=0)
+        await server.start(port=0)
+        host, port = server.address()
+
+        # sends one raw HTTP request, returns (status, JSON body)
+        async def request(method, target, body=b"", headers=None):
+            if not isinstance(body, bytes):
+                body = json.dumps(body).encode()
+            headers = {"Content-Length": str(len(body)), "Connection": "close", **(headers or {})}
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(f"{method} {target} HTTP/1.1\r\n".encode()
+                         + "".join(f"{name}: {value}\r\n" for name, value in headers.items()).encode()
+                         + b"\r\n" + body)
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), 60)
+            writer.close()
+            head, _, payload = response.partition(b"\r\n\r\n")
+            return int(head.split()[1]), json.loads(payload)
+
+        try:
+            await scenario(server, request)
+        finally:
+            await server.close()
+    asyncio.run(main())
+
+
+def test_puzzles_at_every_difficulty():
+    async def scenario(server, request):
+        for level, removed in zip(LEVELS, DIFFICULTIES_BY_SIZE[9]):
+            for _ in range(3):  # more than the cache holds, so some wait for a batch
+                status, reply = await request("GET", f"/puzzle?difficulty={level}")
+                assert status == 200
+                assert reply["difficulty"] == level and reply["size"] == 9
+                assert len(reply["puzzle"]) == 81 and reply["removed"] == reply["puzzle"].count("0") == removed
+                assert reply["id"] in server.solutions
+        status, reply = await request("GET", "/puzzle")
+        assert status == 200 and reply["difficulty"] == "medium"
+        status, reply = await request("GET", "/puzzle?difficulty=extreme")
+        assert status == 400
+        status, reply = await request("GET", "/stats")
+        assert status == 200 and reply["served"] == 10 and set(reply["ready"]) == set(LEVELS)
+    run(scenario)
+
+
+def test_verify():
+    async def scenario(server, request):
+        _, reply = await request("GET", "/puzzle?difficulty=easy")
+        puzzle_id, puzzle = reply["id"], reply["puzzle"]
+        solution = server.solutions[puzzle_id]
+
+        status, reply = await request("POST", "/verify", {"id": puzzle_id, "solution": solution})
+        assert status == 200 and reply == {"id": puzzle_id, "complete": True, "correct": True}
+        grid = [[int(v) for v in solution[row * 9:row * 9 + 9]] for row in range(9)]
+        status, reply = await request("POST", "/verify", {"id": puzzle_id, "solution": grid})
+        assert status == 200 and reply["correct"]
+
+        status, reply = await request("POST", "/verify", {"id": puzzle_id, "solution": puzzle})
+        assert status == 200 and reply["complete"] is False and reply["correct"] is False
+        first, second = solution.index("1"), solution.index("2")
+        wrong = list(solution)
+        wrong[first], wrong[second] = "2", "1"
+        status, reply = await request("POST", "/verify", {"id": puzzle_id, "solution": "".join(wrong)})
+        assert status == 200 and reply["complete"] is True and reply["correct"] is False
+
+        server.solutions.clear()  # forgotten (or from before a restart): rebuilt from the ID
+        status, reply = await request("POST", "/verify", {"id": puzzle_id, "solution": solution})
+        assert status == 200 and reply["correct"]
+    run(scenario)
+
+
+def test_malformed_requests():
+    async def scenario(server, request):
+        _, reply = await request("GET", "/puzzle?difficulty=hard")
+        puzzle_id = reply["id"]
+        solution = server.solutions[puzzle_id]
+        for body in (b"not json", b"5", b"[]", {"id": 5, "solution": solution}, {"id": None, "solution": solution},
+                     {"id": puzzle_id}, {"solution": solution}, {"id": "nonsense", "solution": solution},
+                     {"id": make_id(16, 100, True, 1), "solution": solution},  # another size
+                     {"id": make_id(9, 35, True, 1), "solution": solution},  # a difficulty not served
+                     {"id": puzzle_id, "solution": solution[:80]}, {"id": puzzle_id, "solution": "." * 81},
+                     {"id": puzzle_id, "solution": [[1] * 9] * 8}, {"id": puzzle_id, "solution": [[10] * 9] * 9}):
+            status, reply = await request("POST", "/verify", body)
+            assert status == 400, body
+            assert reply["error"].startswith("bad request")
+
+        status, reply = await request("POST", "/verify", b"", {"Content-Length": "-1"})
+        assert status == 400 and reply == {"error": "malformed request"}
+        status, reply = await request("POST", "/verify", b"", {"Content-Length": "many"})
+        assert status == 400 and reply == {"error": "malformed request"}
+        status, reply = await request("POST", "/verify", b"", {"Content-Length": str(1 << 20)})
+        assert status == 413
+    run(scenario)
+
+
+@pytest.mark.parametrize("method, target, status", [("GET", "/", 404), ("GET", "/puzzles", 404),
+                                                     ("POST", "/puzzle", 405), ("GET", "/verify", 405)])
+def test_unknown_paths_and_methods(method, target, status):
+    async def scenario(server, request):
+        assert (await request(method, target))[0] == status
+    run(scenario)
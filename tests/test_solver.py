@@ -0,0 +1,74 @@
+from sudoku_generator import generate_sudoku
+from sudoku_solver import count_solutions, has_solution_without, solve
+
+
+# a unique 9x9 puzzle and its solution as 2D lists
+def unique_puzzle(removed=45, seed=0):
+    puzzle, solution = generate_sudoku(9, removed, True, seed)
+    return puzzle.to_list(), solution.to_list()
+
+
+def test_solve():
+    puzzle, solution = unique_puzzle()
+    before = [row[:] for row in puzzle]
+    assert solve(puzzle) == solution
+    assert puzzle == before  # not modified
+    assert solve(solution) == solution
+
+
+def test_unique_puzzle_counts_once():
+    for seed in range(5):
+        puzzle, _ = unique_puzzle(50, seed)
+        assert count_solutions(puzzle) == 1
+        assert count_solutions(puzzle, limit=10) == 1
+
+
+def test_puzzle_with_two_solutions():
+    # swap two digits that share two rows of a band and two columns: both grids are valid, so a puzzle
+    # missing those four cells has at least two solutions
+    _, solution = unique_puzzle()
+    for r1 in range(9):
+        for r2 in range(r1 + 1, (r1 // 3 + 1) * 3):
+            for c1 in range(9):
+                for c2 in range(c1 + 1, 9):
+                    a, b = solution[r1][c1], solution[r1][c2]
+                    if solution[r2][c1] == b and solution[r2][c2] == a:
+                        puzzle = [row[:] for row in solution]
+                        for row, col in ((r1, c1), (r1, c2), (r2, c1), (r2, c2)):
+                            puzzle[row][col] = 0
+                        assert count_solutions(puzzle) == 2
+                        assert count_solutions(puzzle, limit=5) == 2
+                        assert has_solution_without(puzzle, r1, c1, a)
+                        return
+    raise AssertionError("no swappable rectangle in this solution, pick another seed")
+
+
+def test_count_stops_at_the_limit():
+    empty = [[0] * 9 for _ in range(9)]
+    assert count_solutions(empty) == 2
+    assert count_solutions(empty, limit=7) == 7
+    puzzle, _ = unique_puzzle(64, 1)
+    assert count_solutions(puzzle, limit=1) == 1
+
+
+def test_contradictions_count_zero():
+    puzzle, solution = unique_puzzle()
+    clash = [row[:] for row in puzzle]
+    col = clash[0].index(0)
+    clash[0][col] = solution[0][(col + 1) % 9]  # a digit already in row 0
+    assert count_solutions(clash) == 0
+    assert solve(clash) is None
+
+    doubled = [row[:] for row in solution]
+    doubled[0][0] = doubled[0][1]  # a full grid with a repeat
+    assert count_solutions(doubled) == 0
+
+
+def test_has_solution_without():
+    puzzle, solution = unique_puzzle(55, 2)
+    for index in range(81):
+        row, col = divmod(index, 9)
+        if puzzle[row][col] == 0:
+            assert not has_solution_without(puzzle, row, col, solution[row][col])
+            other = solution[row][col] % 9 + 1
+            assert has_solution_without(puzzle, row, col, other)  # the unique solution doesn't have other there
@@ -0,0 +1,43 @@
+import math, random
+import pytest
+from sudoku_generator import generate_sudoku
+from sudoku_solver import count_solutions
+from sudoku_transform import apply_transform, derive, random_transform
+
+
+# True if every row, column and box of board holds each value once
+def is_complete_sudoku(board):
+    size, box_length = board.size, math.isqrt(board.size)
+    rows = [board.cells[r * size:(r + 1) * size] for r in range(size)]
+    cols = [bytes(row[c] for row in rows) for c in range(size)]
+    boxes = [bytes(rows[r][c] for r in range(br, br + box_length) for c in range(bc, bc + box_length))
+             for br in range(0, size, box_length) for bc in range(0, size, box_length)]
+    digits = set(range(1, size + 1))
+    return all(set(unit) == digits for unit in rows + cols + boxes)
+
+
+def test_derived_pairs_are_valid_and_distinct():
+    puzzle, solution = generate_sudoku(9, 45, True, seed=4)
+    pairs = derive(puzzle, solution, 50, random.Random(4))
+    assert len(pairs) == 50
+    assert len({board.to_string() for board, _ in pairs}) == 50
+    for board, solved_board in pairs:
+        assert is_complete_sudoku(solved_board)
+        assert all(num in (0, solved) for num, solved in zip(board.cells, solved_board.cells))
+        assert board.cells.count(0) == 45
+        assert count_solutions(board) == 1
+
+
+@pytest.mark.parametrize("size", [9, 16])
+def test_apply_transform_keeps_the_solution_a_sudoku(size):
+    _, solution = generate_sudoku(size, 0, seed=size)
+    rng = random.Random(size)
+    for _ in range(20):
+        assert is_complete_sudoku(apply_transform(solution, random_transform(size, rng)))
+
+
+def test_apply_transform_leaves_the_board_alone():
+    puzzle, _ = generate_sudoku(9, 40, seed=5)
+    before = bytes(puzzle.cells)
+    apply_transform(puzzle, random_transform(9, random.Random(5)))
+    assert puzzle.cells == before